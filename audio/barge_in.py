@@ -0,0 +1,26 @@
+class BargeInDetector:
+    """Detects the caller talking over a response that is being played.
+
+    It runs its own VAD engine, separate from the one used for normal
+    capture, so that the speaker echo heard while the bot talks becomes part
+    of this detector's noise floor rather than the capture one. Speech has to
+    last `min_speech_seconds` before it counts as an interruption, which
+    filters out coughs, clicks and short echo bursts.
+    """
+
+    def __init__(self, vad, samplerate=24000, block_size=1024, min_speech_seconds=0.3):
+        self.vad = vad
+        self.required_blocks = max(1, int(round(samplerate * min_speech_seconds / block_size)))
+        self._speech_blocks = 0
+
+    def reset(self):
+        self.vad.reset()
+        self._speech_blocks = 0
+
+    def process(self, block):
+        """Returns True once the caller has been speaking long enough to interrupt."""
+        if self.vad.process(block):
+            self._speech_blocks += 1
+        else:
+            self._speech_blocks = 0
+        return self._speech_blocks >= self.required_blocks
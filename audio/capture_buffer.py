@@ -0,0 +1,90 @@
+import numpy as np
+
+
+class CaptureBuffer:
+    """Preallocated sample buffer for one utterance of microphone capture.
+
+    Blocks are written straight into a NumPy array (converting float32 to
+    int16 in place when needed), so capturing a block allocates nothing on
+    the Python side. The array starts at `initial_seconds` of audio, doubles
+    when it fills up, and never grows past `max_seconds` - that is the hard
+    maximum utterance length. `reset()` rewinds the write position so the
+    same storage is reused turn after turn.
+    """
+
+    def __init__(self, samplerate=24000, max_seconds=30.0, initial_seconds=5.0, dtype=np.int16):
+        if dtype not in (np.int16, np.float32):
+            raise ValueError("CaptureBuffer dtype must be np.int16 or np.float32")
+        self.samplerate = samplerate
+        self.dtype = np.dtype(dtype)
+        self.max_samples = int(samplerate * max_seconds)
+        initial_samples = min(int(samplerate * initial_seconds), self.max_samples)
+        self._data = np.zeros(initial_samples, dtype=self.dtype)
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def capacity(self):
+        return len(self._data)
+
+    @property
+    def full(self):
+        return self._length >= self.max_samples
+
+    @property
+    def duration(self):
+        """Seconds of audio currently held."""
+        return self._length / self.samplerate
+
+    def reset(self):
+        """Forget the captured samples but keep the allocated storage."""
+        self._length = 0
+
+    def _reserve(self, count):
+        """Make room for `count` more samples, growing up to the hard limit.
+
+        Returns how many samples actually fit.
+        """
+        needed = self._length + count
+        if needed > len(self._data) and len(self._data) < self.max_samples:
+            new_size = min(max(needed, len(self._data) * 2), self.max_samples)
+            grown = np.zeros(new_size, dtype=self.dtype)
+            grown[:self._length] = self._data[:self._length]
+            self._data = grown
+        return min(count, len(self._data) - self._length)
+
+    def append(self, block):
+        """Append a block of float32 (-1..1) or int16 samples.
+
+        Returns False once the buffer is full and samples had to be dropped.
+        """
+        block = block.reshape(-1)
+        count = self._reserve(len(block))
+        out = self._data[self._length:self._length + count]
+        if block.dtype == self.dtype:
+            out[:] = block[:count]
+        elif self.dtype == np.int16:
+            # float32 -> int16 without an intermediate array
+            np.multiply(block[:count], 32767, out=out, casting="unsafe")
+        else:
+            np.multiply(block[:count], 1 / 32767, out=out, casting="unsafe")
+        self._length += count
+        return count == len(block)
+
+    def append_silence(self, count):
+        """Append `count` zero samples (used by the noise gate to keep timing)."""
+        fit = self._reserve(count)
+        self._data[self._length:self._length + fit] = 0
+        self._length += fit
+        return fit == count
+
+    def view(self):
+        """Zero-copy view of the captured samples.
+
+        The view aliases the buffer's storage, so it is only valid until the
+        next `reset()`/`append()` - hand it to `AudioInput(buffer=...)` and let
+        the pipeline finish transcribing before capturing the next turn.
+        """
+        return self._data[:self._length]
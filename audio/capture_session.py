@@ -0,0 +1,145 @@
+import numpy as np
+import sounddevice as sd
+
+from audio.barge_in import BargeInDetector
+from audio.capture_buffer import CaptureBuffer
+from audio.vad import make_vad
+
+
+class CaptureSession:
+    """Microphone input kept open for the duration of a call.
+
+    Opening a device and recalibrating on every turn costs close to half a
+    second, so the stream, the VAD engine (with its noise-floor estimate) and
+    the capture buffer live here and are reused by each
+    `capture_audio_until_silence` turn.
+    A short pre-roll ring holds the most recent blocks heard before speech
+    onset so the first syllable of an utterance is not clipped.
+
+    While a response is playing, `listen_for_barge_in()` keeps reading the
+    microphone; if the caller interrupts, the next utterance starts right
+    there, including the speech that triggered the interruption.
+    """
+
+    def __init__(self, samplerate=24000, block_size=1024, preroll_seconds=0.3,
+                 max_utterance_seconds=30.0, vad=None, barge_in_seconds=0.3):
+        self.samplerate = samplerate
+        self.block_size = block_size
+        self.stream = None
+        self.device = None
+        self.vad = make_vad(vad, samplerate)
+        self.buffer = CaptureBuffer(samplerate=samplerate, max_seconds=max_utterance_seconds)
+        self.barge_in = BargeInDetector(make_vad(self.vad.name, samplerate), samplerate, block_size,
+                                        min_speech_seconds=barge_in_seconds)
+        self._utterance_started = False
+
+        # Enough pre-roll to also hold the speech that had to be heard before a barge-in fired
+        preroll_blocks = max(1, int(round(samplerate * (preroll_seconds + barge_in_seconds) / block_size)))
+        self._preroll = np.zeros((preroll_blocks, block_size), dtype=np.float32)
+        self._preroll_pos = 0
+        self._preroll_count = 0
+
+    @property
+    def active(self):
+        return self.stream is not None and self.stream.active
+
+    def open(self, device):
+        """Open and start the input stream on `device` (once per call)."""
+        if self.active:
+            return
+        self.device = device
+        print(f"Using input device: {sd.query_devices(device)['name']}")
+        self.stream = sd.InputStream(samplerate=self.samplerate, device=device, channels=1,
+                                     dtype=np.float32, blocksize=self.block_size)
+        self.stream.start()
+
+    def close(self):
+        if self.stream is None:
+            return
+        try:
+            if self.stream.active:
+                self.stream.stop()
+            self.stream.close()
+            print("Audio input stream stopped")
+        except Exception as e:
+            print(f"Error closing stream: {e}")
+        self.stream = None
+
+    def read_block(self):
+        """Blocking read of one block. Returns a flat float32 array."""
+        data, overflowed = self.stream.read(self.block_size)
+        if overflowed:
+            print("Audio buffer overflowed")
+        return data.reshape(-1)
+
+    def start_utterance(self):
+        """Prepare for a new turn. Returns True if the caller is already speaking.
+
+        Audio that queued up while we were not listening (usually the bot
+        talking) is discarded, except for its tail which stays in the
+        pre-roll in case the caller started speaking right at the end.
+        After a barge-in the utterance is already under way, so the queued
+        audio is kept instead.
+        """
+        if self._utterance_started:
+            self._utterance_started = False
+            for _ in range(self.stream.read_available // self.block_size):
+                self.buffer.append(self.read_block())
+            return True
+
+        self.buffer.reset()
+        self.vad.reset()
+        stale_blocks = self.stream.read_available // self.block_size
+        skip = max(0, stale_blocks - len(self._preroll))
+        if skip:
+            self.stream.read(skip * self.block_size)
+        for _ in range(stale_blocks - skip):
+            self.push_preroll(self.read_block())
+        return False
+
+    def check_barge_in(self, block):
+        """Feed one block heard while a response plays. Returns True if the caller interrupted.
+
+        On an interruption the speech heard so far becomes the start of the next utterance.
+        """
+        self.push_preroll(block)
+        if not self.barge_in.process(block):
+            if not self.vad.ready:
+                # Let the capture detector calibrate too, so it doesn't calibrate on the interruption
+                self.vad.process(block)
+            return False
+        self.buffer.reset()
+        self.flush_preroll()
+        self.vad.start_speech()
+        self._utterance_started = True
+        return True
+
+    def listen_for_barge_in(self, stop_event):
+        """Blocking: watch the microphone while a response plays.
+
+        Returns True as soon as the caller interrupts, or False once
+        `stop_event` is set.
+        """
+        self.barge_in.reset()
+        while not stop_event.is_set():
+            if self.check_barge_in(self.read_block()):
+                return True
+        return False
+
+    def take_barge_in_audio(self):
+        """Hand over the interrupting speech (int16) instead of starting a buffered utterance."""
+        self._utterance_started = False
+        return self.buffer.view().copy()
+
+    def push_preroll(self, block):
+        """Remember a block heard before speech onset."""
+        self._preroll[self._preroll_pos, :len(block)] = block
+        self._preroll_pos = (self._preroll_pos + 1) % len(self._preroll)
+        self._preroll_count = min(self._preroll_count + 1, len(self._preroll))
+
+    def flush_preroll(self):
+        """Move the pre-roll blocks, oldest first, into the capture buffer."""
+        start = (self._preroll_pos - self._preroll_count) % len(self._preroll)
+        for i in range(self._preroll_count):
+            self.buffer.append(self._preroll[(start + i) % len(self._preroll)])
+        self._preroll_count = 0
@@ -0,0 +1,171 @@
+import asyncio
+import collections
+import time
+
+import numpy as np
+import sounddevice as sd
+
+
+class AudioPlayer:
+    """Output stream driven by the audio callback instead of blocking writes.
+
+    The event loop hands chunks to `write()`, which only appends them to a
+    deque; the `sd.OutputStream` callback pops them on the audio thread.
+    `deque.append`/`popleft` are atomic, so neither side takes a lock and a
+    slow TTS chunk never stalls other coroutines.
+
+    Playback of each turn starts once enough audio is queued to ride out the
+    gaps between chunks. That prebuffer is sized from the measured jitter of
+    chunk arrivals (between `min_prebuffer_ms` and `max_prebuffer_ms`)
+    instead of a fixed number of chunks. Underruns (the queue ran dry
+    mid-turn) and overruns (more than `max_queued_seconds` queued, oldest
+    audio dropped) are counted.
+    """
+
+    def __init__(self, samplerate=24000, blocksize=480, min_prebuffer_ms=40.0, max_prebuffer_ms=600.0,
+                 jitter_factor=3.0, max_queued_seconds=120.0, device=None):
+        self.samplerate = samplerate
+        self.device = device
+        self.blocksize = blocksize
+        self.min_prebuffer = int(samplerate * min_prebuffer_ms / 1000)
+        self.max_prebuffer = int(samplerate * max_prebuffer_ms / 1000)
+        self.jitter_factor = jitter_factor
+        self.max_queued = int(samplerate * max_queued_seconds)
+
+        self.stream = None
+        self._chunks = collections.deque()
+        self._current = None
+        self._offset = 0
+        self._prebuffering = True
+        self._ended = False
+        self._flush_pending = False
+
+        # Arrival statistics (updated by the producer side only)
+        self._last_arrival = None
+        self._last_duration = 0.0
+        self.jitter = 0.0
+
+        self.underruns = 0
+        self.overruns = 0
+
+    @property
+    def active(self):
+        return self.stream is not None and self.stream.active
+
+    def start(self):
+        if self.stream is None:
+            self.stream = sd.OutputStream(samplerate=self.samplerate, channels=1, dtype=np.int16,
+                                          blocksize=self.blocksize, callback=self._callback,
+                                          device=self.device)
+        self.stream.start()
+
+    def stop(self):
+        if self.stream is not None and self.stream.active:
+            self.stream.stop()
+
+    def close(self):
+        if self.stream is None:
+            return
+        self.flush()
+        self.stream.close()
+        self.stream = None
+
+    @property
+    def target_prebuffer(self):
+        """Samples to queue before a turn starts playing."""
+        target = self.min_prebuffer + self.jitter_factor * self.jitter * self.samplerate
+        return int(min(max(target, self.min_prebuffer), self.max_prebuffer))
+
+    def queued_samples(self):
+        # list() copies the deque in one step, so this is safe against the callback
+        current, offset = self._current, self._offset
+        current = len(current) - offset if current is not None and not self._flush_pending else 0
+        return current + sum(len(chunk) for chunk in list(self._chunks))
+
+    @property
+    def playing(self):
+        """True while there is audio queued or being played."""
+        if self._flush_pending:
+            return len(self._chunks) > 0
+        return self._current is not None or len(self._chunks) > 0
+
+    def write(self, chunk):
+        """Queue a chunk of int16 audio for playback. Never blocks."""
+        now = time.monotonic()
+        if self._last_arrival is not None:
+            # How late this chunk is compared with when the previous one finishes playing. Early
+            # chunks (faster-than-real-time TTS) can't cause an underrun, so they count as zero
+            lateness = (now - self._last_arrival) - self._last_duration
+            self.jitter += (max(lateness, 0.0) - self.jitter) / 16
+        self._last_arrival = now
+
+        chunk = np.asarray(chunk, dtype=np.int16).reshape(-1)
+        self._last_duration = len(chunk) / self.samplerate
+        self._ended = False
+        self._chunks.append(chunk)
+
+        if self.queued_samples() > self.max_queued:
+            self._chunks.popleft()
+            self.overruns += 1
+
+    def end_turn(self):
+        """No more audio is coming for now: play out what is queued without waiting for prebuffer."""
+        self._ended = True
+        self._last_arrival = None
+
+    async def drain(self, poll_interval=0.02):
+        """Wait until everything queued has been played (or flushed)."""
+        while self.playing and self.active:
+            await asyncio.sleep(poll_interval)
+
+    def flush(self):
+        """Drop all queued audio immediately (e.g. when the caller barges in)."""
+        self._chunks = collections.deque()
+        self._flush_pending = True
+        self._last_arrival = None
+
+    def stats(self):
+        return {
+            "queued_ms": round(self.queued_samples() * 1000 / self.samplerate),
+            "target_prebuffer_ms": round(self.target_prebuffer * 1000 / self.samplerate),
+            "jitter_ms": round(self.jitter * 1000, 1),
+            "underruns": self.underruns,
+            "overruns": self.overruns,
+        }
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = outdata.reshape(-1)
+        if self._flush_pending:
+            self._flush_pending = False
+            self._current = None
+            self._prebuffering = True
+
+        if self._prebuffering:
+            if not self._ended and self.queued_samples() < self.target_prebuffer:
+                out.fill(0)
+                return
+            self._prebuffering = False
+
+        # Work on locals; the event loop only ever replaces the deque or sets flags
+        chunks = self._chunks
+        current, offset = self._current, self._offset
+        written = 0
+        while written < frames:
+            if current is None:
+                if not chunks:
+                    break
+                current, offset = chunks.popleft(), 0
+            take = min(frames - written, len(current) - offset)
+            out[written:written + take] = current[offset:offset + take]
+            written += take
+            offset += take
+            if offset >= len(current):
+                current = None
+        self._current, self._offset = current, offset
+
+        if written < frames:
+            out[written:].fill(0)
+            if not self._ended:
+                self.underruns += 1
+            # Rebuild the prebuffer before resuming (or before the next turn)
+            self._prebuffering = True
@@ -0,0 +1,109 @@
+from math import gcd
+
+import numpy as np
+
+
+def frame_rms(audio, frame_size):
+    """RMS of consecutive non-overlapping frames (the last partial frame is included)."""
+    n_frames = -(-len(audio) // frame_size)
+    padded = np.zeros(n_frames * frame_size, dtype=np.float32)
+    padded[:len(audio)] = audio
+    frames = padded.reshape(n_frames, frame_size)
+    return np.sqrt(np.einsum("ij,ij->i", frames, frames) / frame_size)
+
+
+def trim_silence(audio, samplerate=24000, frame_ms=20.0, pad_ms=150.0, max_gap_ms=300.0,
+                 min_rms=100.0, peak_ratio_db=-35.0):
+    """Drop leading/trailing silence and shorten long pauses inside an utterance.
+
+    Works on int16 (or float32 scaled to int16 range) mono audio. A frame is
+    speech when its RMS is above the largest of `min_rms`, twice the
+    background level (10th percentile frame) and `peak_ratio_db` below the
+    loudest frame. `pad_ms` of context is kept before and after the speech and
+    every internal pause is shortened to at most `max_gap_ms` in total (the
+    silence kept on either side of it counts towards that). Returns a new array
+    of the same dtype (the input is returned untouched if it is all speech or
+    all silence).
+    """
+    frame_size = max(1, int(samplerate * frame_ms / 1000))
+    rms = frame_rms(audio, frame_size)
+    if len(rms) == 0:
+        return audio
+
+    background = np.percentile(rms, 10)
+    threshold = max(min_rms, background * 2, rms.max() * 10 ** (peak_ratio_db / 20))
+    active = rms > threshold
+    if not active.any() or active.all():
+        return audio
+
+    # Keep the padding at the outer ends; shorten internal pauses to max_gap,
+    # half taken from each end, which already gives the speech its context
+    pad = int(round(pad_ms / frame_ms))
+    max_gap = int(round(max_gap_ms / frame_ms))
+    keep = active.copy()
+    edges = np.diff(np.concatenate(([1], active.astype(np.int8), [1])))
+    gap_starts = np.flatnonzero(edges == -1)
+    gap_ends = np.flatnonzero(edges == 1)
+    for start, end in zip(gap_starts, gap_ends):
+        if start == 0:
+            keep[max(0, end - pad):end] = True
+        elif end == len(keep):
+            keep[start:start + pad] = True
+        elif end - start > max_gap:
+            head = max_gap // 2
+            keep[start:start + head] = True
+            keep[end - (max_gap - head):end] = True
+        else:
+            keep[start:end] = True
+
+    sample_mask = np.repeat(keep, frame_size)[:len(audio)]
+    return audio[sample_mask]
+
+
+def _lowpass_taps(up, down, half_len_per_phase=10, beta=5.0):
+    """Kaiser-windowed sinc anti-aliasing filter for rational resampling."""
+    max_rate = max(up, down)
+    half_len = half_len_per_phase * max_rate
+    n = np.arange(-half_len, half_len + 1)
+    taps = np.sinc(n / max_rate) * np.kaiser(len(n), beta) / max_rate
+    return (taps * up).astype(np.float32)
+
+
+def resample(audio, src_rate, dst_rate):
+    """Polyphase resampling by the rational factor dst_rate/src_rate.
+
+    Equivalent to zero-stuffing by `up`, low-pass filtering and keeping every
+    `down`-th sample, but only the kept output samples are computed: each one
+    is a dot product of the filter with a strided window over the stuffed
+    signal, evaluated for all outputs at once. Returns the input dtype.
+    """
+    if src_rate == dst_rate or len(audio) == 0:
+        return audio
+    g = gcd(src_rate, dst_rate)
+    up, down = dst_rate // g, src_rate // g
+    taps = _lowpass_taps(up, down)
+    half = len(taps) // 2
+
+    stuffed = np.zeros(len(audio) * up + 2 * half, dtype=np.float32)
+    stuffed[half:half + len(audio) * up:up] = audio
+    n_out = -(-len(audio) * up // down)
+    windows = np.lib.stride_tricks.sliding_window_view(stuffed, len(taps))[:n_out * down:down]
+    out = windows @ taps[::-1]
+
+    if np.issubdtype(audio.dtype, np.integer):
+        info = np.iinfo(audio.dtype)
+        return np.clip(np.round(out), info.min, info.max).astype(audio.dtype)
+    return out.astype(audio.dtype)
+
+
+def prepare_for_upload(audio, samplerate=24000, target_rate=16000, trim=True):
+    """Trim silence and resample a captured utterance before STT.
+
+    Returns (audio, sample_rate) to build an `AudioInput(buffer=..., frame_rate=...)` from.
+    """
+    if trim:
+        audio = trim_silence(audio, samplerate)
+    if target_rate and target_rate != samplerate:
+        audio = resample(audio, samplerate, target_rate)
+        samplerate = target_rate
+    return audio, samplerate
@@ -0,0 +1,251 @@
+import numpy as np
+
+
+class NoiseFloor:
+    """Running estimate of a background level, kept for the whole call.
+
+    The first `calibration_count` observations seed the estimate; after that
+    every non-speech observation nudges it (quickly downwards, slowly
+    upwards), so later turns start listening straight away instead of
+    recalibrating.
+    """
+
+    def __init__(self, calibration_count=10, rise_rate=0.01, fall_rate=0.2):
+        self.calibration_count = calibration_count
+        self.rise_rate = rise_rate
+        self.fall_rate = fall_rate
+        self._calibration = []
+        self.level = None
+
+    @property
+    def calibrated(self):
+        return self.level is not None
+
+    def calibrate(self, values):
+        """Feed one or more observations during calibration. Returns True once calibrated."""
+        self._calibration.extend(np.atleast_1d(values).tolist())
+        if len(self._calibration) >= self.calibration_count:
+            self.level = float(np.mean(self._calibration))
+            self._calibration = []
+        return self.calibrated
+
+    def update(self, value):
+        """Track the background from an observation known to be non-speech."""
+        rate = self.fall_rate if value < self.level else self.rise_rate
+        self.level += rate * (value - self.level)
+
+
+class VADEngine:
+    """Speech/non-speech decision for blocks of captured audio.
+
+    `process()` takes one flat float32 block and returns True while speech is
+    active, with the engine's own hysteresis and hangover already applied.
+    Engines keep their noise model across turns; `reset()` only clears the
+    per-utterance state.
+    """
+
+    name = "base"
+    # Silence the engine itself waits out before reporting the end of speech; callers
+    # subtract it from their own end-of-turn timeout
+    hangover_seconds = 0.0
+
+    def __init__(self, samplerate=24000):
+        self.samplerate = samplerate
+        self.speaking = False
+
+    @property
+    def ready(self):
+        """False while the engine is still calibrating its noise model."""
+        return True
+
+    def process(self, block):
+        raise NotImplementedError
+
+    def reset(self):
+        self.speaking = False
+
+    def start_speech(self):
+        """Enter the speech state directly (speech was already detected elsewhere)."""
+        self.speaking = True
+
+    def status(self):
+        """Short description of the current levels, for the capture status line."""
+        return ""
+
+
+class LevelVAD(VADEngine):
+    """Mean-absolute-level detector with an adaptive noise floor.
+
+    Speech starts above the speech threshold and ends below the silence
+    threshold (hysteresis between the two); both thresholds follow the noise
+    floor with fixed minimums.
+    """
+
+    name = "level"
+
+    def __init__(self, samplerate=24000, min_silence_threshold=0.01, min_speech_threshold=0.02,
+                 calibration_blocks=10):
+        super().__init__(samplerate)
+        self.min_silence_threshold = min_silence_threshold
+        self.min_speech_threshold = min_speech_threshold
+        self.noise = NoiseFloor(calibration_count=calibration_blocks)
+        self.level = 0.0
+
+    @property
+    def ready(self):
+        return self.noise.calibrated
+
+    @property
+    def floor(self):
+        return self.noise.level * 1.5
+
+    @property
+    def silence_threshold(self):
+        return max(self.min_silence_threshold, self.floor * 1.2)
+
+    @property
+    def speech_threshold(self):
+        return max(self.min_speech_threshold, self.floor * 2.5)
+
+    def process(self, block):
+        self.level = float(np.abs(block).mean())
+        if not self.noise.calibrated:
+            if self.noise.calibrate(self.level):
+                print(f"Calibrated noise floor: {self.floor:.6f}")
+                print(f"Adjusted silence threshold: {self.silence_threshold:.6f}")
+                print(f"Speech detection threshold: {self.speech_threshold:.6f}")
+            return False
+
+        if self.level < self.silence_threshold:
+            self.speaking = False
+            self.noise.update(self.level)
+        elif self.level > self.speech_threshold:
+            self.speaking = True
+        return self.speaking
+
+    def status(self):
+        if not self.ready:
+            return "calibrating"
+        return f"level {self.level:.6f} (noise floor {self.floor:.6f})"
+
+
+class EnergyZcrVAD(VADEngine):
+    """Frame-level detector combining energy, zero-crossing rate and speech-band energy.
+
+    Each block is split into short frames and all features are computed for
+    every frame at once with NumPy. A frame is voiced when it is loud enough
+    relative to the tracked noise floor, most of its energy falls in the
+    speech band, and its zero-crossing rate is not noise-like. Speech starts
+    after `onset_frames` consecutive voiced frames and ends `hangover_frames`
+    after the energy last exceeded the (lower) release margin.
+    """
+
+    name = "energy"
+
+    def __init__(self, samplerate=24000, frame_ms=10.0, onset_margin_db=12.0, release_margin_db=6.0,
+                 min_band_ratio=0.5, max_zcr=0.3, onset_frames=3, hangover_ms=200.0,
+                 band_hz=(300.0, 3400.0), calibration_frames=40, min_energy_db=-70.0):
+        super().__init__(samplerate)
+        self.frame_size = max(32, int(samplerate * frame_ms / 1000))
+        self.onset_margin_db = onset_margin_db
+        self.release_margin_db = release_margin_db
+        self.min_band_ratio = min_band_ratio
+        self.max_zcr = max_zcr
+        self.onset_frames = onset_frames
+        self.hangover_frames = max(1, int(hangover_ms / frame_ms))
+        self.hangover_seconds = self.hangover_frames * frame_ms / 1000
+        self.min_energy_db = min_energy_db
+        self.noise = NoiseFloor(calibration_count=calibration_frames, rise_rate=0.005, fall_rate=0.1)
+
+        self._window = np.hanning(self.frame_size).astype(np.float32)
+        freqs = np.fft.rfftfreq(self.frame_size, 1 / samplerate)
+        self._band = (freqs >= band_hz[0]) & (freqs <= band_hz[1])
+        self._voiced_run = 0
+        self._hangover = 0
+        self.energy_db = min_energy_db
+
+    @property
+    def ready(self):
+        return self.noise.calibrated
+
+    def features(self, block):
+        """Per-frame (energy_db, zcr, band_ratio) arrays for a block."""
+        n_frames = len(block) // self.frame_size
+        frames = block[:n_frames * self.frame_size].reshape(n_frames, self.frame_size)
+
+        energy = np.einsum("ij,ij->i", frames, frames) / self.frame_size
+        energy_db = 10 * np.log10(np.maximum(energy, 1e-12))
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_size - 1)
+        spectrum = np.abs(np.fft.rfft(frames * self._window, axis=1)) ** 2
+        band_ratio = spectrum[:, self._band].sum(axis=1) / np.maximum(spectrum.sum(axis=1), 1e-12)
+        return energy_db, zcr, band_ratio
+
+    def process(self, block):
+        energy_db, zcr, band_ratio = self.features(block)
+        if len(energy_db) == 0:
+            return self.speaking
+        self.energy_db = float(energy_db.max())
+
+        if not self.noise.calibrated:
+            if self.noise.calibrate(energy_db):
+                print(f"Calibrated noise floor: {self.noise.level:.1f} dB")
+            return False
+
+        floor = max(self.noise.level, self.min_energy_db)
+        voiced = ((energy_db > floor + self.onset_margin_db)
+                  & (band_ratio > self.min_band_ratio)
+                  & (zcr < self.max_zcr))
+        sustained = energy_db > floor + self.release_margin_db
+
+        # Hysteresis/hangover state machine; only a handful of frames per block
+        for i in range(len(voiced)):
+            if self.speaking:
+                if sustained[i]:
+                    self._hangover = self.hangover_frames
+                else:
+                    self._hangover -= 1
+                    if self._hangover <= 0:
+                        self.speaking = False
+                        self._voiced_run = 0
+            else:
+                self._voiced_run = self._voiced_run + 1 if voiced[i] else 0
+                if self._voiced_run >= self.onset_frames:
+                    self.speaking = True
+                    self._hangover = self.hangover_frames
+
+        if not self.speaking:
+            quiet = energy_db[~voiced]
+            if len(quiet):
+                self.noise.update(float(np.median(quiet)))
+        return self.speaking
+
+    def reset(self):
+        super().reset()
+        self._voiced_run = 0
+        self._hangover = 0
+
+    def start_speech(self):
+        super().start_speech()
+        self._hangover = self.hangover_frames
+
+    def status(self):
+        if not self.ready:
+            return "calibrating"
+        return f"energy {self.energy_db:.1f} dB (noise floor {self.noise.level:.1f} dB)"
+
+
+VAD_ENGINES = {
+    LevelVAD.name: LevelVAD,
+    EnergyZcrVAD.name: EnergyZcrVAD,
+}
+
+
+def make_vad(vad=None, samplerate=24000):
+    """Build a VAD engine from a name in VAD_ENGINES, or pass an engine instance through."""
+    if isinstance(vad, VADEngine):
+        return vad
+    name = vad or "level"
+    if name not in VAD_ENGINES:
+        raise ValueError(f"Unknown VAD engine '{name}'. Available: {', '.join(VAD_ENGINES)}")
+    return VAD_ENGINES[name](samplerate=samplerate)
@@ -0,0 +1,152 @@
+"""Customer lookup benchmark at scale: startup cost, memory and lookup latency of the SQLite store.
+
+Run from the repository root:
+
+    python -m bench.bench_customers                         # 1M customers
+    python -m bench.bench_customers --sizes 1000000 10000000
+    python -m bench.bench_customers --sizes 100000 --compare-json
+
+For each size a synthetic database is built once (kept under --dir, reused on
+later runs). Lookups are then measured in a fresh process, so "open" and
+"first lookup" are real cold-start costs and RSS is what a worker pays. For
+SQLite, RSS includes the memory-mapped pages the lookups touched; those are
+file-backed and shared by every process reading the same database.
+--compare-json runs the same measurement against the in-memory JSON
+directory for reference.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import tempfile
+import multiprocessing
+
+from tools.customer_store import CustomerStore
+
+
+def synthetic_customer(i):
+    # Every 3rd phone number is stored with separators, as customers.json has them
+    phone = f"{5550000000 + i}"
+    if i % 3 == 0:
+        phone = f"{phone[:3]}-{phone[3:6]}-{phone[6:]}"
+    return {"customer_id": f"{1000000 + i}", "full_name": f"Customer {i}", "phone_number": phone,
+            "email": f"customer{i}@example.com", "account_status": "active"}
+
+
+def synthetic_question(i):
+    return f"{1000000 + i}", {"question": "What is your favorite color?", "answer": random.choice(["red", "blue"])}
+
+
+def build_database(path, size):
+    if os.path.exists(path):
+        print(f"Reusing {path}", file=sys.stderr)
+        return None
+    store = CustomerStore(path=path, auto_import=False)
+    started = time.perf_counter()
+    store.import_records((synthetic_customer(i) for i in range(size)),
+                         (synthetic_question(i) for i in range(size)))
+    store._db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return time.perf_counter() - started
+
+
+def rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(backend, path, size, lookups, seed=0):
+    """Runs in a fresh process: open the backend, then time hits and misses."""
+    rng = random.Random(seed)
+    baseline_rss = rss_mb()
+    started = time.perf_counter()
+    if backend == "sqlite":
+        store = CustomerStore(path=path, auto_import=False)
+    else:
+        from tools.customer_directory import CustomerDirectory
+        store = CustomerDirectory(customers_path=path, security_questions_path=path + ".questions")
+    open_seconds = time.perf_counter() - started
+
+    probes = []
+    for _ in range(lookups):
+        i = rng.randrange(size * 2)  # about half are misses
+        customer = synthetic_customer(i)
+        probes.append((customer["phone_number"].replace("-", " "), customer["customer_id"], i < size))
+
+    latencies, wrong = [], 0
+    first_lookup = None
+    for phone, customer_id, expected in probes:
+        started = time.perf_counter()
+        record = store.lookup(phone, customer_id)
+        elapsed = time.perf_counter() - started
+        if first_lookup is None:
+            first_lookup = elapsed
+        latencies.append(elapsed)
+        wrong += (record is not None) != expected
+
+    latencies.sort()
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1e6
+
+    return {
+        "backend": backend,
+        "customers": size,
+        "open_ms": round(open_seconds * 1000, 2),
+        "first_lookup_ms": round(first_lookup * 1000, 2),
+        "p50_us": round(percentile(50), 1),
+        "p99_us": round(percentile(99), 1),
+        "lookups_per_s": round(len(latencies) / sum(latencies)),
+        "rss_mb": round(rss_mb() - baseline_rss, 1),
+        "wrong": wrong,
+    }
+
+
+def write_json(path, size):
+    if os.path.exists(path):
+        return
+    with open(path, "w") as f:
+        json.dump({"customers": [synthetic_customer(i) for i in range(size)]}, f)
+    with open(path + ".questions", "w") as f:
+        json.dump({"security_questions": dict(synthetic_question(i) for i in range(size))}, f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1_000_000])
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--dir", default=os.path.join(tempfile.gettempdir(), "customer_bench"))
+    parser.add_argument("--compare-json", action="store_true", help="also measure the in-memory JSON directory")
+    args = parser.parse_args(argv)
+    os.makedirs(args.dir, exist_ok=True)
+
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for size in args.sizes:
+        db_path = os.path.join(args.dir, f"customers_{size}.db")
+        build_seconds = build_database(db_path, size)
+        if build_seconds is not None:
+            print(f"Built {size:,} customers in {build_seconds:.1f}s "
+                  f"({os.path.getsize(db_path) / 1e6:.0f} MB)", file=sys.stderr)
+        runs = [("sqlite", db_path)]
+        if args.compare_json:
+            json_path = os.path.join(args.dir, f"customers_{size}.json")
+            write_json(json_path, size)
+            runs.append(("json", json_path))
+        for backend, path in runs:
+            with context.Pool(1) as pool:
+                results.append(pool.apply(measure, (backend, path, size, args.lookups)))
+
+    header = (f"{'backend':<8}{'customers':>12}{'open ms':>10}{'1st ms':>9}{'p50 us':>9}{'p99 us':>9}"
+              f"{'lookups/s':>11}{'RSS MB':>9}{'wrong':>7}")
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['backend']:<8}{r['customers']:>12,}{r['open_ms']:>10}{r['first_lookup_ms']:>9}{r['p50_us']:>9}"
+              f"{r['p99_us']:>9}{r['lookups_per_s']:>11,}{r['rss_mb']:>9}{r['wrong']:>7}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""Latency/throughput benchmark for the case tools against the local Salesforce/Nango stand-in.
+
+Run from the repository root:
+
+    python -m bench.bench_tools                       # all tools, sync + async
+    python -m bench.bench_tools --latency-ms 80 --jitter-ms 20 --error-rate 0.01 --concurrency 16
+    python -m bench.bench_tools --tools get_case --variants async --iterations 500
+
+Tools are called the way the agent calls them (`FunctionTool.on_invoke_tool`
+with JSON arguments). Async tools run as concurrent tasks on one loop and
+sync tools run on a thread pool, `--concurrency` at a time. The case cache
+is cleared before every call unless `--with-cache` is given.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+
+# Tool modules build an OpenAI client at import time; the benchmark never calls it
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("OPENAI_AGENTS_DISABLE_TRACING", "1")
+
+from bench.fake_salesforce import FakeSalesforce
+from tools.get_case import get_case, get_case_async
+from tools.create_case import create_case, create_case_async
+from tools.update_case import update_case, update_case_async
+from tools.salesforce_auth import salesforce_credentials
+from tools.case_cache import case_cache
+
+TOOLS = {
+    "get_case": (get_case, get_case_async),
+    "create_case": (create_case, create_case_async),
+    "update_case": (update_case, update_case_async),
+}
+
+
+class PlainHTTPAdapter(HTTPAdapter):
+    """simple_salesforce always builds https:// URLs; send them to the plain-HTTP stand-in instead."""
+
+    def send(self, request, **kwargs):
+        request.url = request.url.replace("https://", "http://", 1)
+        return super().send(request, **kwargs)
+
+
+def plain_http_session(pool_size):
+    session = requests.Session()
+    adapter = PlainHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def tool_arguments(tool_name, case_numbers, rng):
+    if tool_name == "get_case":
+        return {"case_number": rng.choice(case_numbers)}
+    if tool_name == "create_case":
+        return {
+            "subject": "Benchmark dispute",
+            "contact_phone": "555-0100",
+            "body": "I was charged twice for the same purchase.",
+            "disputed_amount": 42.5,
+            "description": "Duplicate charge",
+            "ai_summary_content": None,
+            "priority": "High",
+            "request_type": None,
+        }
+    return {
+        "case_number": rng.choice(case_numbers),
+        "ai_summary_content": None,
+        "comments": None,
+        "notes": f"Benchmark note {rng.random():.6f}",
+        "email_content": None,
+        "priority": rng.choice(["Low", "Medium", "High"]),
+        "request_type": None,
+    }
+
+
+def is_error(result):
+    return isinstance(result, str) and ("error" in result.lower() or "An error occurred" in result)
+
+
+def summarize(name, latencies, errors, wall_seconds):
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        if not ordered:
+            return float("nan")
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    return {
+        "tool": name,
+        "calls": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(50), 1),
+        "p95_ms": round(percentile(95), 1),
+        "p99_ms": round(percentile(99), 1),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 1) if ordered else float("nan"),
+        "throughput_per_s": round(len(latencies) / wall_seconds, 1) if wall_seconds else float("nan"),
+    }
+
+
+async def run_async(tool, tool_name, iterations, concurrency, case_numbers, rng, use_cache):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one():
+        nonlocal errors
+        arguments = json.dumps(tool_arguments(tool_name, case_numbers, rng))
+        async with semaphore:
+            if not use_cache:
+                case_cache.clear()
+            started = time.perf_counter()
+            result = await tool.on_invoke_tool(None, arguments)
+            latencies.append(time.perf_counter() - started)
+            errors += is_error(str(result))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(iterations)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def run_sync(tool, tool_name, iterations, concurrency, case_numbers, rng, use_cache):
+    latencies, errors = [], 0
+
+    def one(arguments):
+        # Sync function tools are coroutines that block while they run; give each thread its own loop
+        if not use_cache:
+            case_cache.clear()
+        started = time.perf_counter()
+        result = asyncio.run(tool.on_invoke_tool(None, arguments))
+        return time.perf_counter() - started, is_error(str(result))
+
+    all_arguments = [json.dumps(tool_arguments(tool_name, case_numbers, rng)) for _ in range(iterations)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for latency, failed in pool.map(one, all_arguments):
+            latencies.append(latency)
+            errors += failed
+    return latencies, errors, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tools", nargs="+", default=list(TOOLS), choices=list(TOOLS))
+    parser.add_argument("--variants", nargs="+", default=["sync", "async"], choices=["sync", "async"])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Salesforce latency per request")
+    parser.add_argument("--nango-latency-ms", type=float, default=None, help="Nango latency (default: same)")
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failing with 500")
+    parser.add_argument("--expire-rate", type=float, default=0.0, help="fraction of requests failing with 401")
+    parser.add_argument("--seed-cases", type=int, default=1000)
+    parser.add_argument("--with-cache", action="store_true", help="keep the case cache between calls")
+    parser.add_argument("--json", action="store_true", help="print results as JSON lines")
+    args = parser.parse_args(argv)
+
+    server = FakeSalesforce(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                            expire_rate=args.expire_rate, nango_latency_ms=args.nango_latency_ms, seed=1).start()
+    server.configure_environment()
+    salesforce_credentials.invalidate()
+    salesforce_credentials.session = plain_http_session(args.concurrency)
+    case_numbers = server.seed_cases(args.seed_cases)
+    rng = random.Random(7)
+
+    print(f"Fake Salesforce at {server.url}: latency {args.latency_ms}±{args.jitter_ms} ms, "
+          f"error rate {args.error_rate}, expire rate {args.expire_rate}, concurrency {args.concurrency}",
+          file=sys.stderr)
+
+    results = []
+    # Silence the tools' console logging while measuring
+    real_stdout = sys.stdout
+    try:
+        for tool_name in args.tools:
+            sync_tool, async_tool = TOOLS[tool_name]
+            for variant in args.variants:
+                sys.stdout = open(os.devnull, "w")
+                try:
+                    if variant == "async":
+                        latencies, errors, wall = asyncio.run(
+                            run_async(async_tool, tool_name, args.iterations, args.concurrency, case_numbers,
+                                      rng, args.with_cache))
+                    else:
+                        latencies, errors, wall = run_sync(sync_tool, tool_name, args.iterations,
+                                                           args.concurrency, case_numbers, rng, args.with_cache)
+                finally:
+                    sys.stdout.close()
+                    sys.stdout = real_stdout
+                results.append(summarize(f"{tool_name} ({variant})", latencies, errors, wall))
+    finally:
+        sys.stdout = real_stdout
+        server.stop()
+
+    if args.json:
+        for result in results:
+            print(json.dumps(result))
+    else:
+        header = f"{'tool':<24}{'calls':>7}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}"
+        print(header)
+        print("-" * len(header))
+        for r in results:
+            print(f"{r['tool']:<24}{r['calls']:>7}{r['errors']:>8}{r['p50_ms']:>9}{r['p95_ms']:>9}"
+                  f"{r['p99_ms']:>9}{r['throughput_per_s']:>9}")
+    print(f"Requests served: {server.requests}", file=sys.stderr)
+    return results
+
+
+if __name__ == "__main__":
+    main()
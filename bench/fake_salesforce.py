@@ -0,0 +1,285 @@
+"""In-process stand-in for the Nango and Salesforce endpoints the case tools use.
+
+Serves, over plain HTTP on localhost:
+- Nango     GET   /connection/{id}
+- Salesforce GET  /services/data/vXX/query/?q=SELECT ... FROM Case WHERE CaseNumber = '...' | CaseNumber IN (...) | Id IN (...)
+             GET/PATCH /services/data/vXX/sobjects/Case/{id}
+             POST  /services/data/vXX/sobjects/Case/
+             POST  /services/data/vXX/composite                 (with @{ref.id} / @{ref[i].id} references)
+             POST/PATCH /services/data/vXX/composite/sobjects   (sObject Collections)
+
+Every request can be delayed (`latency_ms` +/- `jitter_ms`) and can fail
+with a 500 (`error_rate`) or an expired-session 401 (`expire_rate`).
+
+    server = FakeSalesforce(latency_ms=80, error_rate=0.01).start()
+    server.configure_environment()   # points NANGO_BASE_URL / SALESFORCE_INSTANCE_URL here
+    ...
+    server.stop()
+"""
+import os
+import re
+import json
+import time
+import random
+import threading
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+_REFERENCE = re.compile(r"@\{(\w+)(?:\[(\d+)\])?\.(\w+)\}")
+_SELECT = re.compile(r"SELECT\s+(.+?)\s+FROM\s+Case\b(.*)", re.IGNORECASE | re.DOTALL)
+_EQUALS = re.compile(r"WHERE\s+(\w+)\s*=\s*'((?:[^'\\]|\\.)*)'", re.IGNORECASE)
+_IN = re.compile(r"WHERE\s+(\w+)\s+IN\s*\(([^)]*)\)", re.IGNORECASE)
+_LITERAL = re.compile(r"'((?:[^'\\]|\\.)*)'")
+
+
+class FakeSalesforce:
+    def __init__(self, host="127.0.0.1", port=0, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0,
+                 expire_rate=0.0, nango_latency_ms=None, seed=None):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.expire_rate = expire_rate
+        self.nango_latency_ms = latency_ms if nango_latency_ms is None else nango_latency_ms
+        self.random = random.Random(seed)
+
+        self.cases = {}
+        self.by_number = {}
+        self.requests = {}
+        self._next_number = 1
+        self._token_counter = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Server lifecycle
+    # ------------------------------------------------------------------
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self._server.server_address[1]}"
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; with Nagle on, the client's delayed ACK adds ~40 ms
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                status, payload = fake.handle(self.command, self.path, body)
+                data = b"" if payload is None else json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = _handle
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-salesforce", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def configure_environment(self):
+        os.environ["NANGO_BASE_URL"] = self.url
+        os.environ["NANGO_SECRET_KEY"] = "fake-secret"
+        os.environ["SALESFORCE_INSTANCE_URL"] = self.url
+        os.environ["SALESFORCE_CONNECTION_ID"] = "fake-connection"
+
+    # ------------------------------------------------------------------
+    # Data
+    # ------------------------------------------------------------------
+
+    def seed_cases(self, count):
+        """Create `count` cases directly in the store; returns their case numbers."""
+        return [self._insert({"Subject": f"Seeded case {i}", "Status": "New", "Priority": "Medium"})["CaseNumber"]
+                for i in range(count)]
+
+    def _insert(self, fields):
+        with self._lock:
+            number = f"{self._next_number:08d}"
+            self._next_number += 1
+            record_id = f"500FAKE{number}"
+            now = datetime.now(timezone.utc).isoformat()
+            record = {"Id": record_id, "CaseNumber": number, "CreatedDate": now, "LastModifiedDate": now, **fields}
+            self.cases[record_id] = record
+            self.by_number[number] = record
+            return record
+
+    # ------------------------------------------------------------------
+    # Request handling
+    # ------------------------------------------------------------------
+
+    def _delay(self, latency_ms):
+        delay = latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def _count(self, kind):
+        with self._lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+
+    def handle(self, method, raw_path, body):
+        split = urlsplit(raw_path)
+        path, query = split.path, parse_qs(split.query)
+
+        if path.startswith("/connection/"):
+            self._count("nango")
+            self._delay(self.nango_latency_ms)
+            with self._lock:
+                self._token_counter += 1
+                token = f"fake-token-{self._token_counter}"
+            return 200, {"credentials": {"type": "OAUTH2", "access_token": token}}
+
+        self._count("salesforce")
+        self._delay(self.latency_ms)
+        roll = self.random.random()
+        if roll < self.expire_rate:
+            return 401, [{"errorCode": "INVALID_SESSION_ID", "message": "Session expired or invalid"}]
+        if roll < self.expire_rate + self.error_rate:
+            return 500, [{"errorCode": "SERVER_UNAVAILABLE", "message": "Injected failure"}]
+        return self.dispatch(method, path, query, body)
+
+    def dispatch(self, method, path, query, body):
+        match = re.match(r"/services/data/v[\d.]+/(.*)", path)
+        if not match:
+            return 404, [{"errorCode": "NOT_FOUND", "message": path}]
+        resource = match.group(1).rstrip("/")
+
+        if resource == "query":
+            return self.query(query.get("q", [""])[0])
+        if resource == "composite":
+            return self.composite(body)
+        if resource == "composite/sobjects":
+            return self.collection(method, body)
+        if resource == "sobjects/Case" and method == "POST":
+            record = self._insert(dict(body))
+            return 201, {"id": record["Id"], "success": True, "errors": []}
+        case_match = re.fullmatch(r"sobjects/Case/(\w+)", resource)
+        if case_match:
+            record = self.cases.get(case_match.group(1))
+            if record is None:
+                return 404, [{"errorCode": "NOT_FOUND", "message": "The requested resource does not exist"}]
+            if method == "PATCH":
+                record.update(body)
+                record["LastModifiedDate"] = datetime.now(timezone.utc).isoformat()
+                return 204, None
+            fields = query.get("fields", [None])[0]
+            return 200, self._project(record, fields.split(",") if fields else None)
+        return 404, [{"errorCode": "NOT_FOUND", "message": resource}]
+
+    def _project(self, record, fields=None):
+        projected = {"attributes": {"type": "Case", "url": f"/sobjects/Case/{record['Id']}"}}
+        if fields is None:
+            projected.update(record)
+        else:
+            projected.update({field.strip(): record.get(field.strip()) for field in fields})
+        return projected
+
+    def query(self, soql):
+        select = _SELECT.match(soql.strip())
+        if not select:
+            return 400, [{"errorCode": "MALFORMED_QUERY", "message": soql}]
+        fields = [field.strip() for field in select.group(1).split(",")]
+        where = select.group(2)
+
+        if (match := _EQUALS.search(where)) is not None:
+            column, values = match.group(1), [match.group(2).replace("\\'", "'")]
+        elif (match := _IN.search(where)) is not None:
+            column, values = match.group(1), [v.replace("\\'", "'") for v in _LITERAL.findall(match.group(2))]
+        else:
+            column, values = None, None
+
+        if column is None:
+            records = list(self.cases.values())
+        elif column == "CaseNumber":
+            records = [self.by_number[v] for v in values if v in self.by_number]
+        elif column == "Id":
+            records = [self.cases[v] for v in values if v in self.cases]
+        else:
+            return 400, [{"errorCode": "INVALID_FIELD", "message": column}]
+
+        limit = re.search(r"LIMIT\s+(\d+)", where, re.IGNORECASE)
+        if limit:
+            records = records[:int(limit.group(1))]
+        return 200, {"totalSize": len(records), "done": True,
+                     "records": [self._project(record, fields) for record in records]}
+
+    def collection(self, method, body):
+        results = []
+        for item in body["records"]:
+            fields = {k: v for k, v in item.items() if k not in ("attributes", "id")}
+            if method == "POST":
+                if not fields.get("Subject"):
+                    results.append({"id": None, "success": False,
+                                    "errors": [{"statusCode": "REQUIRED_FIELD_MISSING", "message": "Subject"}]})
+                    continue
+                record = self._insert(fields)
+                results.append({"id": record["Id"], "success": True, "errors": []})
+            else:
+                record = self.cases.get(item.get("id"))
+                if record is None:
+                    results.append({"id": item.get("id"), "success": False,
+                                    "errors": [{"statusCode": "ENTITY_IS_DELETED", "message": "not found"}]})
+                    continue
+                record.update(fields)
+                results.append({"id": record["Id"], "success": True, "errors": []})
+        return 200, results
+
+    def composite(self, body):
+        results, outputs, failed = {}, [], False
+
+        def resolve(text):
+            def replace(match):
+                ref, index, attr = match.group(1), match.group(2), match.group(3)
+                value = results[ref]
+                if index is not None:
+                    value = value[int(index)]
+                resolved = value.get(attr)
+                if resolved is None:
+                    # Salesforce fails the subrequest rather than substituting a null
+                    raise LookupError(f"Invalid reference specified. No value for {match.group(0)[2:-1]} found.")
+                return str(resolved)
+            return _REFERENCE.sub(replace, text)
+
+        for sub in body["compositeRequest"]:
+            reference = sub["referenceId"]
+            if failed and body.get("allOrNone"):
+                outputs.append({"referenceId": reference, "httpStatusCode": 400, "httpHeaders": {},
+                                "body": [{"errorCode": "PROCESSING_HALTED",
+                                          "message": "The transaction was rolled back"}]})
+                continue
+            try:
+                url = resolve(sub["url"])
+                sub_body = json.loads(resolve(json.dumps(sub["body"]))) if "body" in sub else None
+            except (LookupError, AttributeError, TypeError) as e:
+                # A plain LookupError carries the null-reference message; the rest are malformed references
+                message = str(e) if type(e) is LookupError else "Invalid reference specified."
+                status, payload = 400, [{"errorCode": "PROCESSING_HALTED", "message": message}]
+            else:
+                split = urlsplit(url)
+                status, payload = self.dispatch(sub["method"], split.path, parse_qs(split.query), sub_body)
+            if status >= 300:
+                failed = True
+            else:
+                results[reference] = payload
+            outputs.append({"referenceId": reference, "httpStatusCode": status, "httpHeaders": {}, "body": payload})
+        return 200, {"compositeResponse": outputs}
@@ -0,0 +1,719 @@
+import os
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import sounddevice as sd
+from dotenv import load_dotenv
+from my_agents import support_agent
+from agents.voice import (
+    AudioInput,
+    StreamedAudioInput,
+    SingleAgentVoiceWorkflow,
+    VoicePipeline,
+    SingleAgentWorkflowCallbacks,
+    OpenAIVoiceModelProvider,
+    VoicePipelineConfig,
+    TTSModelSettings,
+    STTModelSettings
+)
+from agents.run import Runner
+from agents.voice.workflow import VoiceWorkflowHelper
+from audio.capture_session import CaptureSession
+from audio.playback import AudioPlayer
+from audio.preprocess import prepare_for_upload
+from audio.vad import make_vad
+load_dotenv()
+
+# Hard limit on a single caller utterance
+MAX_UTTERANCE_SECONDS = 30.0
+
+# Speech detector used for capture: "level" (mean-absolute level) or "energy" (energy + ZCR + band energy)
+VAD_ENGINE = os.getenv("VAD_ENGINE", "level")
+
+# Stream microphone audio to STT while the caller speaks instead of uploading whole utterances
+STREAMING_STT = os.getenv("STREAMING_STT", "false").lower() == "true"
+
+# Sample rate of buffered utterances sent to STT (captured at 24 kHz; 24000 disables resampling)
+STT_UPLOAD_RATE = int(os.getenv("STT_UPLOAD_RATE", "16000"))
+
+# Keep listening while a response plays and stop it when the caller talks over it
+BARGE_IN = os.getenv("BARGE_IN", "false").lower() == "true"
+
+TTS_INSTRUCTIONS = """Speak as a friendly, patient tech support agent with these qualities:
+                - Warm and reassuring tone that makes users feel at ease
+                - Clear articulation at a steady pace, avoiding technical jargon
+                - Encouraging and empathetic attitude, especially when users are confused
+                - Natural conversational style with a hint of a smile in your voice
+                """
+
+
+def get_input_device():
+    """Get the default input device with proper error handling."""
+    try:
+        devices = sd.query_devices()
+        default_input = sd.default.device[0]  # Get default input device ID
+
+        # If default device is not set, find the first input device
+        if default_input is None:
+            for device in devices:
+                if device['max_input_channels'] > 0:
+                    return device['index']
+            raise RuntimeError("No input devices found")
+
+        return default_input
+    except Exception as e:
+        print(f"Error getting input device: {e}")
+        # List all available devices for debugging
+        print("\nAvailable devices:")
+        print(sd.query_devices())
+        raise
+
+
+def cancel_turn(result):
+    """Cancel what is left of a pipeline turn: TTS, the event dispatcher and the agent run (and any tool call in it).
+
+    StreamedAudioResult has no public way to do this, so it uses the private
+    _cleanup_tasks() of openai-agents 0.0.14 (the version in uv.lock). Check
+    it still exists when upgrading.
+    """
+    result._cleanup_tasks()
+
+
+class WorkflowCallbacks(SingleAgentWorkflowCallbacks):
+    def __init__(self, session_id=None):
+        self.session_id = session_id
+
+    def on_run(self, workflow: SingleAgentVoiceWorkflow, transcription: str) -> None:
+        print("\n" + "-"*50)
+        print(f"[{self.session_id}] TRANSCRIPTION: {transcription}")
+        print("-"*50 + "\n")
+
+    def on_agent_response(self, workflow: SingleAgentVoiceWorkflow, response: str) -> None:
+        print("\n" + "-"*50)
+        print(f"[{self.session_id}] AGENT RESPONSE::: {response}")
+        print("-"*50 + "\n")
+
+    def on_error(self, workflow: SingleAgentVoiceWorkflow, error: Exception) -> None:
+        print(f"\n[{self.session_id}] ERROR in workflow: {error}\n")
+
+
+class StatefulWorkflow(SingleAgentVoiceWorkflow):
+    """Single-agent workflow that keeps the call's conversation history between turns."""
+
+    def __init__(self, agent, callbacks=None, conversation_history=None):
+        super().__init__(agent, callbacks)
+        self._agent = agent
+        self._conversation_history = conversation_history if conversation_history is not None else []
+
+
+    async def run(self, input_text):
+        # Add user message to history
+        self._conversation_history.append({"role": "user", "content": input_text})
+
+        # Print the updated conversation history
+        print("\n" + "="*30)
+        print("CONVERSATION HISTORY:")
+        for i, msg in enumerate(self._conversation_history):
+            print(f"{i+1}. {msg['role'].upper()}: {msg['content']}")
+        print("="*30 + "\n")
+
+        # Call callbacks
+        if self._callbacks and hasattr(self._callbacks, "on_run"):
+            self._callbacks.on_run(self, input_text)
+
+        # Add system message with customer state information
+        system_content = self._agent.instructions
+
+
+        # Create a custom input history with our state information
+        custom_input_history = [
+            {
+                "role": "system",
+                "content": system_content
+            }
+        ]
+
+        # Add conversation history (last 40 messages to avoid context limit)
+        custom_input_history.extend(self._conversation_history[-40:])
+
+        # Run the agent with our custom input history
+        result = Runner.run_streamed(self._current_agent, custom_input_history)
+
+        # Get the full response for state tracking
+        full_response = ""
+
+        # Stream the text from the result
+        try:
+            async for chunk in VoiceWorkflowHelper.stream_text_from(result):
+                full_response += chunk
+                yield chunk
+        except (asyncio.CancelledError, GeneratorExit):
+            # The caller interrupted: stop the agent run, but keep what was already said
+            result.cancel()
+            self._conversation_history.append(
+                {"role": "assistant", "content": f"{full_response} [interrupted by caller]"}
+            )
+            raise
+
+
+        # Add agent response to history
+        self._conversation_history.append({"role": "assistant", "content": full_response})
+
+        # Print the updated conversation history after agent response
+        print("\n" + "="*30)
+        print("UPDATED CONVERSATION HISTORY:")
+        for i, msg in enumerate(self._conversation_history):
+            print(f"{i+1}. {msg['role'].upper()}: {msg['content']}")
+        print("="*30 + "\n")
+
+        # Call callbacks
+        if self._callbacks and hasattr(self._callbacks, "on_agent_response"):
+            self._callbacks.on_agent_response(self, full_response)
+
+        # Update the input history and current agent
+        self._input_history = result.to_input_list()
+        self._current_agent = result.last_agent
+
+
+class CallSession:
+    """One voice call: its workflow, pipeline, audio devices, history and controls.
+
+    Everything that used to be module-global in main.py lives here, so any
+    number of calls can run side by side on one asyncio loop. Blocking
+    microphone reads run in the session's own worker threads.
+
+    Stopping a call cancels its conversation task. The cancellation reaches
+    whatever the call is awaiting (STT, the agent run and its tool calls, TTS
+    streaming); blocking reads notice `running` within one audio block, and
+    the devices are closed once they have returned.
+    """
+
+    def __init__(self, session_id=None, agent=support_agent, input_device=None, output_device=None,
+                 streaming=None, barge_in=None, vad=None, samplerate=24000):
+        self.session_id = session_id or uuid.uuid4().hex[:8]
+        self.agent = agent
+        self.input_device = input_device
+        self.output_device = output_device
+        self.streaming = STREAMING_STT if streaming is None else streaming
+        self.barge_in = BARGE_IN if barge_in is None else barge_in
+        self.vad = vad or VAD_ENGINE
+        self.samplerate = samplerate
+
+        self.running = False
+        self.microphone_muted = False
+        self.speaker_muted = False
+        self.bot_speaking = False
+        self.playback_interrupted = False
+
+        self.player = None
+        self.capture = None
+        self.task = None
+        self.teardown_seconds = None
+
+        self._executor = None
+        self._blocking = set()
+
+        # Initialize conversation history to maintain context between turns
+        self.conversation_history = []
+        self.workflow = StatefulWorkflow(
+            agent,
+            callbacks=WorkflowCallbacks(self.session_id),
+            conversation_history=self.conversation_history,
+        )
+        self.pipeline = VoicePipeline(
+            workflow=self.workflow,
+            config=VoicePipelineConfig(
+                model_provider=OpenAIVoiceModelProvider(),
+                tts_settings=TTSModelSettings(
+                    voice="alloy",
+                    instructions=TTS_INSTRUCTIONS
+                ),
+                stt_settings=STTModelSettings(
+                    language="en",
+                    temperature= 0.5,
+                    # Streaming STT ends a turn after the same 0.6s of silence the buffered capture uses
+                    turn_detection={"type": "server_vad", "silence_duration_ms": 600} if self.streaming else None,
+                ),
+            )
+        )
+
+    def __repr__(self):
+        return f"CallSession({self.session_id!r}, running={self.running})"
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the conversation as a task on the running event loop."""
+        if self.running:
+            print(f"[{self.session_id}] Conversation is already running")
+            return self.task
+        self.running = True
+        self.task = asyncio.get_running_loop().create_task(self.run())
+        print(f"[{self.session_id}] Conversation started")
+        return self.task
+
+    async def stop(self):
+        """Stop the conversation and return once its resources are released.
+
+        The time this takes is kept in `teardown_seconds`.
+        """
+        if self.task is None:
+            print(f"[{self.session_id}] Conversation is not running")
+            return True
+
+        print(f"[{self.session_id}] Stopping conversation...")
+        started = time.perf_counter()
+        # Blocking reads check the flag; everything awaited is cancelled
+        self.running = False
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+        self.task = None
+        self.teardown_seconds = time.perf_counter() - started
+        print(f"[{self.session_id}] Conversation stopped (teardown {self.teardown_seconds * 1000:.0f} ms)")
+        return True
+
+    async def run_blocking(self, func, *args):
+        """Run a blocking device call in the session's worker threads.
+
+        Cancelling the await doesn't stop the thread, so the call is tracked
+        until it returns and teardown waits for it before closing the devices.
+        """
+        future = self._executor.submit(func, *args)
+        self._blocking.add(future)
+        future.add_done_callback(self._blocking.discard)
+        return await asyncio.wrap_future(future)
+
+    async def wait_for_blocking(self, timeout=1.0):
+        """Wait for in-flight blocking calls (they exit within one block once `running` is False)."""
+        pending = [asyncio.wrap_future(future) for future in list(self._blocking)]
+        if not pending:
+            return
+        _, still_running = await asyncio.wait(pending, timeout=timeout)
+        if still_running:
+            # A read is stuck in the driver; closing the stream below unblocks it
+            print(f"[{self.session_id}] {len(still_running)} device call(s) still blocked, closing anyway")
+
+    def open_audio(self):
+        # Create a single audio player for the entire conversation
+        self.player = AudioPlayer(samplerate=self.samplerate, device=self.output_device)
+        self.player.start()
+
+        # Open the microphone once for the whole call; it stays open between turns
+        self.capture = CaptureSession(samplerate=self.samplerate, max_utterance_seconds=MAX_UTTERANCE_SECONDS,
+                                      vad=self.vad)
+        self.capture.open(self.input_device if self.input_device is not None else get_input_device())
+
+    def close_audio(self):
+        if self.player:
+            try:
+                self.player.stop()
+                self.player.close()
+                print("Audio output player stopped")
+            except Exception as e:
+                print(f"Error stopping output player: {e}")
+            self.player = None
+        if self.capture:
+            self.capture.close()
+            self.capture = None
+
+    # ------------------------------------------------------------------
+    # Mute controls
+    # ------------------------------------------------------------------
+
+    def mute_microphone(self):
+        """Mute the microphone input."""
+        # Any ongoing recording notices the flag on its next block; the input
+        # stream itself stays open so unmuting doesn't reopen the device.
+        self.microphone_muted = True
+        print(f"[{self.session_id}] Microphone muted")
+        return True
+
+    def unmute_microphone(self):
+        """Unmute the microphone input."""
+        self.microphone_muted = False
+        print(f"[{self.session_id}] Microphone unmuted")
+        return True
+
+    def mute_speaker(self):
+        """Mute the speaker output."""
+        self.speaker_muted = True
+        print(f"[{self.session_id}] Speaker muted")
+        return True
+
+    def unmute_speaker(self):
+        """Unmute the speaker output."""
+        self.speaker_muted = False
+        print(f"[{self.session_id}] Speaker unmuted")
+        return True
+
+    def toggle_microphone(self):
+        """Toggle microphone mute state."""
+        if self.microphone_muted:
+            return self.unmute_microphone()
+        else:
+            return self.mute_microphone()
+
+    def toggle_speaker(self):
+        """Toggle speaker mute state."""
+        if self.speaker_muted:
+            return self.unmute_speaker()
+        else:
+            return self.mute_speaker()
+
+    def get_mute_states(self):
+        """Get the current mute states."""
+        return {
+            "microphone_muted": self.microphone_muted,
+            "speaker_muted": self.speaker_muted
+        }
+
+    # ------------------------------------------------------------------
+    # Capture
+    # ------------------------------------------------------------------
+
+    def capture_audio_until_silence(self, silence_duration=0.6, vad=None):
+        """Capture audio until silence is detected for the specified duration.
+
+        Blocking; the conversation loop runs it in a worker thread. `vad` switches the
+        speech detector (a name from audio.vad.VAD_ENGINES or an engine instance).
+        Returns a zero-copy int16 view into the capture buffer, valid until the next capture.
+        """
+        session = self.capture
+        try:
+            # Check if conversation is still running before starting
+            if not self.running or session is None:
+                print("Conversation is not running, skipping audio capture")
+                return None
+
+            # If microphone is muted, return None
+            if self.microphone_muted:
+                print("Microphone is muted, skipping audio capture")
+                return None
+
+            if vad is not None and vad != session.vad.name:
+                session.vad = make_vad(vad, session.samplerate)
+
+            # Initialize counters
+            # After a barge-in the caller is already mid-utterance
+            has_speech = session.start_utterance()
+            capture_buffer = session.buffer
+            speech_detector = session.vad
+            silence_counter = 0
+
+            # Calculate how many blocks make up our desired silence duration; silence the engine's
+            # hangover already waited out counts towards it, so every engine ends turns equally fast
+            block_size = session.block_size
+            remaining_silence = max(0.0, silence_duration - speech_detector.hangover_seconds)
+            blocks_per_silence = max(1, int(session.samplerate * remaining_silence / block_size))
+
+            print(f"Listening... (speak now, will stop after {silence_duration} seconds of silence)")
+
+            # Main recording loop - continue until silence after speech detected
+            while True:
+                # Check if conversation is still running or if microphone was muted during recording
+                if not self.running or self.microphone_muted:
+                    print("Conversation stopped or microphone muted, ending audio capture")
+                    break
+
+                # Read audio data
+                try:
+                    flat_data = session.read_block()
+                except Exception as e:
+                    print(f"Error reading from stream: {e}")
+                    break
+
+                # Speech/silence decision (the engine calibrates itself on the first blocks of the call)
+                is_speech = speech_detector.process(flat_data)
+
+                # Print audio level with noise floor for reference
+                print(f"Current {speech_detector.status()}", end='\r')
+
+                if not has_speech:
+                    if not is_speech:
+                        session.push_preroll(flat_data)
+                        continue
+                    has_speech = True
+                    # Include the audio just before onset so the first syllable isn't clipped
+                    session.flush_preroll()
+
+                # Apply simple noise gate - only keep audio while the detector hears speech
+                if is_speech:
+                    silence_counter = 0
+                    buffer_ok = capture_buffer.append(flat_data)
+                else:
+                    silence_counter += 1
+                    # Add zeros instead to maintain timing
+                    buffer_ok = capture_buffer.append_silence(len(flat_data))
+
+                # If we've had enough silence blocks and we detected speech before, stop recording
+                if silence_counter >= blocks_per_silence:
+                    print(f"\nDetected {silence_duration} seconds of silence after speech, stopping...")
+                    break
+
+                if not buffer_ok:
+                    print(f"\nReached maximum utterance length of {MAX_UTTERANCE_SECONDS} seconds, stopping...")
+                    break
+
+            # Check if we stopped without detecting speech
+            if not has_speech:
+                print("\nNo speech detected")
+                return None
+
+            # Check if we have any audio data
+            if len(capture_buffer) == 0:
+                print("No audio data captured")
+                return None
+
+            # Samples were converted to int16 as they were captured
+            audio_data = capture_buffer.view()
+
+            print(f"Finished recording. Captured {len(audio_data)} samples")
+            return audio_data
+
+        except Exception as e:
+            print(f"Error in audio capture: {e}")
+            return None
+
+    # ------------------------------------------------------------------
+    # Playback
+    # ------------------------------------------------------------------
+
+    def flush_player(self):
+        """Drop any audio still queued for playback."""
+        if self.player is not None:
+            self.player.flush()
+
+    async def play_response(self, result):
+        """Play the audio events of a pipeline result through the player.
+
+        Handles every turn in the result, so it serves both the buffered mode (one turn per
+        result) and the streaming mode (one result for the whole conversation). Chunks are
+        only queued here; the player's callback prebuffers and plays them.
+        """
+        print("Processing response...")
+        # Process the audio stream
+        response_text = ""
+
+        try:
+            async for event in result.stream():
+                # Check if conversation was stopped during response
+                if not self.running:
+                    print("Conversation stopped during response")
+                    break
+
+                # Print event type for debugging
+                print(f"Event type: {event.type}")
+
+                if event.type == "voice_stream_event_audio":
+                    # The caller talked over this turn (streaming mode); drop the rest of its audio
+                    if not self.speaker_muted and not self.playback_interrupted:
+                        self.player.write(event.data)
+                    # Add audio data info for debugging
+                    if hasattr(event.data, 'shape'):
+                        print(f"Audio data shape: {event.data.shape}")
+                elif event.type == "raw_response_event" and event.data.type == "response.output_text.delta":
+                    # Collect the response text
+                    response_text += event.data.delta
+                    # Print the delta for real-time feedback
+                    print(event.data.delta, end="", flush=True)
+                elif event.type == "voice_stream_event_lifecycle":
+                    print(f"Lifecycle event: {event.__dict__ if hasattr(event, '__dict__') else event}")
+                    if event.event == "turn_started":
+                        self.bot_speaking = True
+                        self.playback_interrupted = False
+                    elif event.event in ("turn_ended", "session_ended"):
+                        # Let the queued audio play out before listening again
+                        self.player.end_turn()
+                        await self.player.drain()
+                        print(f"Playback stats: {self.player.stats()}")
+                        if response_text:
+                            print("\n" + "-"*50)
+                            print(f"COMPLETE RESPONSE: {response_text}")
+                            print("-"*50 + "\n")
+                            response_text = ""
+                        self.bot_speaking = False
+                        self.playback_interrupted = False
+                        if event.event == "session_ended":
+                            print("\nSession ended, ready for next turn...")
+                            break
+                else:
+                    # Print unknown event types for debugging
+                    print(f"Unknown event: {event.__dict__ if hasattr(event, '__dict__') else event}")
+        finally:
+            self.bot_speaking = False
+
+    async def play_with_barge_in(self, result):
+        """Play a response while listening for the caller talking over it.
+
+        On an interruption the output is flushed and the caller's speech becomes the start
+        of the next turn; the caller cancels the rest of the turn (cancel_turn) as usual.
+        Returns True if the response was interrupted.
+        """
+        stop_listening = threading.Event()
+        playback = asyncio.create_task(self.play_response(result))
+        listener = asyncio.create_task(self.run_blocking(self.capture.listen_for_barge_in, stop_listening))
+        try:
+            await asyncio.wait({playback, listener}, return_when=asyncio.FIRST_COMPLETED)
+            if listener.done() and listener.result():
+                print("\nCaller started speaking, interrupting response...")
+                playback.cancel()
+                self.flush_player()
+                return True
+            return False
+        finally:
+            stop_listening.set()
+            await asyncio.gather(listener, return_exceptions=True)
+            # Surfaces playback errors unless it was cancelled by the interruption
+            if playback.cancelled() or not playback.done():
+                playback.cancel()
+                await asyncio.gather(playback, return_exceptions=True)
+            else:
+                playback.result()
+
+    # ------------------------------------------------------------------
+    # Conversation loops
+    # ------------------------------------------------------------------
+
+    async def stream_microphone(self, streamed_input):
+        """Push microphone blocks into the streamed STT input as they are captured."""
+        session = self.capture
+        while self.running:
+            try:
+                flat_data = await self.run_blocking(session.read_block)
+            except Exception as e:
+                print(f"Error reading from stream: {e}")
+                break
+
+            if self.microphone_muted:
+                continue
+
+            # Don't feed our own TTS back into STT, unless the caller talks over it
+            if self.bot_speaking:
+                if not self.barge_in or not session.check_barge_in(flat_data):
+                    continue
+                print("\nCaller started speaking, interrupting response...")
+                self.playback_interrupted = True
+                self.bot_speaking = False
+                self.flush_player()
+                await streamed_input.add_audio(session.take_barge_in_audio())
+                continue
+
+            await streamed_input.add_audio((flat_data * 32767).astype(np.int16))
+
+        # A None on the queue ends the transcription session
+        await streamed_input.queue.put(None)
+
+    async def run_streaming_conversation(self):
+        """Streaming mode: STT transcribes while the caller is still speaking.
+
+        A single StreamedAudioInput is fed for the whole call; the transcription session
+        detects end of speech itself, so the transcript is ready as soon as the caller stops.
+        """
+        streamed_input = StreamedAudioInput()
+        result = await self.pipeline.run(streamed_input)
+
+        print("Listening... (streaming mode)")
+        feeder = asyncio.create_task(self.stream_microphone(streamed_input))
+        playback = asyncio.create_task(self.play_response(result))
+        try:
+            done, _ = await asyncio.wait({feeder, playback}, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        finally:
+            for task in (feeder, playback):
+                task.cancel()
+            await asyncio.gather(feeder, playback, return_exceptions=True)
+            cancel_turn(result)
+
+    async def run_buffered_conversation(self):
+        """Buffered mode: capture each utterance, then transcribe it as a whole."""
+        while self.running:
+            print("\n" + "="*50)
+            print(f"[{self.session_id}] NEW CONVERSATION TURN")
+            print("="*50)
+
+            # Capture audio until silence is detected
+            audio_data = await self.run_blocking(self.capture_audio_until_silence, 0.6)
+
+            # Check if conversation was stopped during audio capture
+            if not self.running:
+                print("Conversation stopped during audio capture")
+                break
+
+            if audio_data is None:
+                print("Failed to capture audio. Please check your microphone.")
+                await asyncio.sleep(1)
+                continue
+
+            # Check if audio has actual content
+            audio_level = np.abs(audio_data).mean()
+            print(f"Audio level: {audio_level}")
+
+            if audio_level < 5:
+                print("No significant audio detected. Please speak louder or check your microphone.")
+                continue
+
+            print("Running pipeline with existing workflow...")
+
+            # Trim silence and downsample before uploading to STT
+            upload_data, upload_rate = prepare_for_upload(audio_data, samplerate=self.samplerate,
+                                                          target_rate=STT_UPLOAD_RATE)
+            print(f"Uploading {len(upload_data) / upload_rate:.2f}s at {upload_rate} Hz "
+                  f"(captured {len(audio_data) / self.samplerate:.2f}s at {self.samplerate} Hz)")
+
+            # Create audio input from captured audio
+            audio_input = AudioInput(buffer=upload_data, frame_rate=upload_rate)
+
+            # Run the pipeline with the new audio input
+            result = await self.pipeline.run(audio_input)
+            print(f"--------------{result}-----------------")
+
+            try:
+                if self.barge_in:
+                    await self.play_with_barge_in(result)
+                else:
+                    await self.play_response(result)
+            finally:
+                # Once per turn: after a barge-in or a stop this cancels whatever is still running
+                cancel_turn(result)
+
+    async def run(self):
+        """Run a continuous voice conversation until stopped."""
+        self.running = True
+        print(f"[{self.session_id}] Starting continuous voice conversation "
+              f"({'streaming' if self.streaming else 'buffered'} STT)...")
+
+        # Blocking device reads: capture + barge-in listener at most at once
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"call-{self.session_id}")
+        try:
+            self.open_audio()
+
+            # Add a small delay after starting the player to ensure it's fully initialized
+            await asyncio.sleep(0.1)
+
+            if self.streaming:
+                await self.run_streaming_conversation()
+            else:
+                await self.run_buffered_conversation()
+
+        except asyncio.CancelledError:
+            print(f"\n[{self.session_id}] Conversation cancelled")
+            raise
+        except KeyboardInterrupt:
+            print("\nExiting voice conversation...")
+        except Exception as e:
+            print(f"\n[{self.session_id}] Error in voice conversation: {e}")
+            import traceback
+            traceback.print_exc()
+        finally:
+            # Clean up resources: let blocking reads return, then close the devices
+            self.running = False
+            await self.wait_for_blocking()
+            self.close_audio()
+            self._executor.shutdown(wait=False)
+            print(f"[{self.session_id}] Conversation ended")
@@ -0,0 +1,356 @@
+import os
+import time
+import queue
+import asyncio
+import threading
+import multiprocessing as mp
+
+# Worker processes are spawned (not forked) so each gets a clean interpreter,
+# event loop and audio backend
+_mp = mp.get_context("spawn")
+
+HEARTBEAT_INTERVAL = float(os.getenv("WORKER_HEARTBEAT_INTERVAL", "2.0"))
+MAX_SESSIONS_PER_WORKER = int(os.getenv("MAX_SESSIONS_PER_WORKER", "8"))
+# CallSession methods a "control" command may call
+CONTROL_METHODS = {
+    "mute_microphone", "unmute_microphone", "toggle_microphone",
+    "mute_speaker", "unmute_speaker", "toggle_speaker",
+    "flush_player",
+}
+
+
+# ----------------------------------------------------------------------
+# Worker process side
+# ----------------------------------------------------------------------
+
+def worker_main(worker_id, commands, events, heartbeat_interval=HEARTBEAT_INTERVAL):
+    """Entry point of a worker process: runs a SessionManager on its own event loop."""
+    try:
+        asyncio.run(_worker_loop(worker_id, commands, events, heartbeat_interval))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _worker_loop(worker_id, commands, events, heartbeat_interval):
+    # Imported here so the dispatcher process never loads the voice stack
+    from session_manager import SessionManager
+
+    manager = SessionManager()
+    manager.loop = asyncio.get_running_loop()
+    draining = False
+    loop_lag = 0.0
+
+    def report(kind, **data):
+        events.put({"type": kind, "worker_id": worker_id, "pid": os.getpid(), "time": time.time(), **data})
+
+    def on_session_done(session_id, task):
+        manager.sessions.pop(session_id, None)
+        report("session_ended", session_id=session_id)
+
+    async def heartbeat():
+        nonlocal loop_lag
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(heartbeat_interval)
+            # How late the loop woke us up: a saturated worker shows up here first
+            loop_lag = time.perf_counter() - started - heartbeat_interval
+            report("heartbeat", sessions=len(manager.sessions), loop_lag_ms=round(loop_lag * 1000, 1),
+                   cpu_seconds=round(time.process_time(), 2), draining=draining)
+
+    async def drain(timeout):
+        deadline = time.monotonic() + timeout
+        while manager.sessions and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        # Calls still up after the drain timeout are stopped
+        await manager.stop_all()
+        # Wakes the command loop, which is waiting on the queue
+        commands.put({"type": "drained"})
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    drain_task = None
+    report("ready")
+    try:
+        while True:
+            command = await asyncio.to_thread(commands.get)
+            kind = command["type"]
+
+            if kind == "start":
+                session_id = command["session_id"]
+                if draining:
+                    report("session_rejected", session_id=session_id, reason="draining")
+                    continue
+                try:
+                    session = await manager.start_session(session_id, **command.get("options", {}))
+                except Exception as e:
+                    report("session_rejected", session_id=session_id, reason=str(e))
+                    continue
+                session.task.add_done_callback(lambda task, sid=session_id: on_session_done(sid, task))
+                report("session_started", session_id=session_id)
+
+            elif kind == "stop":
+                await manager.stop_session(command["session_id"])
+
+            elif kind == "control":
+                method = command["method"]
+                if method not in CONTROL_METHODS:
+                    print(f"Worker {worker_id}: ignoring control method '{method}'")
+                    continue
+                session = manager.get(command["session_id"])
+                if session is not None:
+                    getattr(session, method)()
+
+            elif kind == "drain":
+                # Runs alongside the command loop, so stops and controls for the remaining calls still work
+                if drain_task is None:
+                    draining = True
+                    drain_task = asyncio.create_task(drain(command.get("timeout", 30.0)))
+
+            elif kind == "drained":
+                break
+
+            elif kind == "shutdown":
+                await manager.stop_all()
+                break
+    finally:
+        if drain_task is not None:
+            drain_task.cancel()
+        heartbeat_task.cancel()
+        report("exited")
+
+
+# ----------------------------------------------------------------------
+# Dispatcher side
+# ----------------------------------------------------------------------
+
+class WorkerHandle:
+    """Dispatcher-side view of one worker process."""
+
+    def __init__(self, worker_id, heartbeat_interval):
+        self.worker_id = worker_id
+        self.commands = _mp.Queue()
+        self.process = None
+        self.sessions = set()
+        self.ready = False
+        self.draining = False
+        self.last_heartbeat = None
+        self.heartbeat = {}
+        self.heartbeat_interval = heartbeat_interval
+
+    @property
+    def healthy(self):
+        if self.process is None or not self.process.is_alive() or not self.ready or self.draining:
+            return False
+        if self.last_heartbeat is None:
+            return True
+        return time.monotonic() - self.last_heartbeat < 3 * self.heartbeat_interval
+
+    @property
+    def load(self):
+        """Placement key: active calls first, then how far behind the worker's event loop is."""
+        return (len(self.sessions), self.heartbeat.get("loop_lag_ms", 0.0))
+
+    def send(self, command):
+        self.commands.put(command)
+
+    def status(self):
+        return {
+            "worker_id": self.worker_id,
+            "pid": self.process.pid if self.process else None,
+            "alive": bool(self.process and self.process.is_alive()),
+            "healthy": self.healthy,
+            "sessions": sorted(self.sessions),
+            "loop_lag_ms": self.heartbeat.get("loop_lag_ms"),
+            "cpu_seconds": self.heartbeat.get("cpu_seconds"),
+            "heartbeat_age": round(time.monotonic() - self.last_heartbeat, 1) if self.last_heartbeat else None,
+        }
+
+
+class Dispatcher:
+    """Spreads calls over a pool of worker processes, each running a SessionManager.
+
+    New calls go to the healthy worker with the fewest active calls (ties
+    broken by event-loop lag from its heartbeats). Workers report a heartbeat
+    every `heartbeat_interval` seconds; one that misses three, or whose
+    process died, gets no new calls. `shutdown()` drains: workers stop taking
+    calls, let the active ones finish (up to `drain_timeout`), then exit.
+    """
+
+    def __init__(self, num_workers=None, max_sessions_per_worker=MAX_SESSIONS_PER_WORKER,
+                 heartbeat_interval=HEARTBEAT_INTERVAL):
+        self.num_workers = num_workers or os.cpu_count() or 1
+        self.max_sessions_per_worker = max_sessions_per_worker
+        self.heartbeat_interval = heartbeat_interval
+        self.workers = {}
+        self.placements = {}
+        self.events = _mp.Queue()
+        self.accepting = False
+        self._lock = threading.Lock()
+        self._listener = None
+        self._session_counter = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self, wait_ready=True, timeout=30.0):
+        for worker_id in range(self.num_workers):
+            self._spawn(worker_id)
+        self._listener = threading.Thread(target=self._listen, name="dispatcher-events", daemon=True)
+        self._listener.start()
+        self.accepting = True
+        if wait_ready:
+            deadline = time.monotonic() + timeout
+            while not all(worker.ready for worker in self.workers.values()):
+                if time.monotonic() > deadline:
+                    raise TimeoutError("Workers did not start in time")
+                time.sleep(0.05)
+        print(f"Dispatcher started with {self.num_workers} worker(s)")
+        return self
+
+    def _spawn(self, worker_id):
+        worker = WorkerHandle(worker_id, self.heartbeat_interval)
+        worker.process = _mp.Process(
+            target=worker_main,
+            args=(worker_id, worker.commands, self.events, self.heartbeat_interval),
+            name=f"voice-worker-{worker_id}",
+            daemon=True,
+        )
+        worker.process.start()
+        self.workers[worker_id] = worker
+        return worker
+
+    def shutdown(self, drain=True, drain_timeout=30.0):
+        """Stop accepting calls and shut the workers down, draining active calls first by default."""
+        self.accepting = False
+        print("Dispatcher shutting down" + (" (draining active calls)" if drain else ""))
+        for worker in self.workers.values():
+            worker.draining = True
+            worker.send({"type": "drain", "timeout": drain_timeout} if drain else {"type": "shutdown"})
+
+        deadline = time.monotonic() + drain_timeout + 5.0
+        for worker in self.workers.values():
+            worker.process.join(max(0.0, deadline - time.monotonic()))
+            if worker.process.is_alive():
+                print(f"Worker {worker.worker_id} did not exit, terminating")
+                worker.process.terminate()
+                worker.process.join()
+        self.events.put(None)
+        if self._listener is not None:
+            self._listener.join()
+        print("Dispatcher stopped")
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    def pick_worker(self):
+        """Least-loaded healthy worker with spare capacity, or None."""
+        with self._lock:
+            candidates = [worker for worker in self.workers.values()
+                          if worker.healthy and len(worker.sessions) < self.max_sessions_per_worker]
+            if not candidates:
+                return None
+            return min(candidates, key=lambda worker: worker.load)
+
+    def assign_call(self, session_id=None, **session_options):
+        """Place a new call on a worker. Returns (session_id, worker_id) or None if at capacity."""
+        if not self.accepting:
+            print("Dispatcher is not accepting calls")
+            return None
+        worker = self.pick_worker()
+        if worker is None:
+            print("No worker has capacity for a new call")
+            return None
+        with self._lock:
+            if session_id is None:
+                self._session_counter += 1
+                session_id = f"call-{self._session_counter}"
+            # Count the call immediately so back-to-back placements spread out
+            worker.sessions.add(session_id)
+            self.placements[session_id] = worker.worker_id
+        worker.send({"type": "start", "session_id": session_id, "options": session_options})
+        print(f"Call {session_id} assigned to worker {worker.worker_id}")
+        return session_id, worker.worker_id
+
+    def stop_call(self, session_id):
+        worker_id = self.placements.get(session_id)
+        if worker_id is None:
+            print(f"No call {session_id}")
+            return False
+        self.workers[worker_id].send({"type": "stop", "session_id": session_id})
+        return True
+
+    def control(self, session_id, method):
+        """Forward a per-session control (one of CONTROL_METHODS, e.g. "toggle_speaker") to the call's worker."""
+        if method not in CONTROL_METHODS:
+            raise ValueError(f"Unknown control '{method}'. Available: {', '.join(sorted(CONTROL_METHODS))}")
+        worker_id = self.placements.get(session_id)
+        if worker_id is None:
+            print(f"No call {session_id}")
+            return False
+        self.workers[worker_id].send({"type": "control", "session_id": session_id, "method": method})
+        return True
+
+    # ------------------------------------------------------------------
+    # Health
+    # ------------------------------------------------------------------
+
+    def health(self):
+        with self._lock:
+            return [worker.status() for worker in self.workers.values()]
+
+    def _listen(self):
+        while True:
+            try:
+                event = self.events.get(timeout=self.heartbeat_interval)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            if event is None:
+                break
+            self._handle_event(event)
+            self._check_workers()
+
+    def _handle_event(self, event):
+        worker = self.workers.get(event["worker_id"])
+        if worker is None:
+            return
+        kind = event["type"]
+        with self._lock:
+            worker.last_heartbeat = time.monotonic()
+            if kind == "ready":
+                worker.ready = True
+            elif kind == "heartbeat":
+                worker.heartbeat = event
+            elif kind in ("session_ended", "session_rejected"):
+                worker.sessions.discard(event["session_id"])
+                self.placements.pop(event["session_id"], None)
+                if kind == "session_rejected":
+                    print(f"Worker {worker.worker_id} rejected call {event['session_id']}: {event['reason']}")
+            elif kind == "exited":
+                worker.ready = False
+
+    def _check_workers(self):
+        """Forget the calls of workers that died; respawn them while accepting calls."""
+        for worker_id, worker in list(self.workers.items()):
+            if worker.process.is_alive() or worker.draining:
+                continue
+            with self._lock:
+                lost = sorted(worker.sessions)
+                for session_id in lost:
+                    self.placements.pop(session_id, None)
+                worker.sessions.clear()
+            print(f"Worker {worker_id} died (exit code {worker.process.exitcode}); lost calls: {lost}")
+            if self.accepting:
+                self._spawn(worker_id)
+
+
+if __name__ == "__main__":
+    dispatcher = Dispatcher().start()
+    try:
+        while True:
+            time.sleep(HEARTBEAT_INTERVAL)
+            for status in dispatcher.health():
+                print(status)
+    except KeyboardInterrupt:
+        dispatcher.shutdown()
@@ -1,11 +1,21 @@
+import os
 from agents import Agent
 from tools.verification_tool import verification_tool
-from tools.create_case import create_case
-from tools.get_case import get_case
-from tools.classification import classify_email
-from tools.sentiment import analyze_sentiment_email
-from tools.ai_summary import generate_case_summary
-# from tools.update_case import update_case
+from tools.get_case import get_case, get_case_async
+from tools.triage import triage_and_create_case
+# from tools.update_case import update_case_queued as update_case  # writes through the case outbox
+
+
+# Async tools keep network calls off the event loop (audio and other calls keep running);
+# set ASYNC_TOOLS=false to fall back to the blocking versions.
+ASYNC_TOOLS = os.getenv("ASYNC_TOOLS", "true").lower() == "true"
+
+# Ticket creation is one triage_and_create_case call (async either way) instead of four separate
+# tool calls; the individual classify/sentiment/summary/create tools are still importable.
+if ASYNC_TOOLS:
+    AGENT_TOOLS = [verification_tool, get_case_async, triage_and_create_case]
+else:
+    AGENT_TOOLS = [verification_tool, get_case, triage_and_create_case]
 
 
 support_agent = Agent(
@@ -55,6 +65,11 @@ Your output will be delivered in an audio voice response, please ensure that eve
     * If `verification_step1.status` is `"customer_not_found"`:
         * Respond: "I'm sorry, I couldn't find an account associated with that phone number and customer ID. For security reasons, I need to verify your identity before proceeding. Please check your information and try again."
         * (END verification - FAILED) and start over again from the beginning.
+    * If `verification_step1.status` is `"possible_match"`:
+        * Let `field` = `verification_step1.field`.
+        * Respond: "I may have misheard your [phone number if `field` is `phone_number`, otherwise customer ID]. Could you please say it again, one digit at a time?"
+        * Confirm the repeated value with the user as above, set `phone_number` or `customer_id` (whichever `field` names) to it, and invoke `verification_tool` again with `phone_number` and `customer_id` (leave `answer` as None). Handle its response as `verification_step1`.
+        * Never guess, suggest or read out a value for the caller; only use what the caller says.
     * If `verification_step1.status` is `"no_security_question_configured"`:
         * Respond: "I found your account, but for your security, we need to ask a verification question, and it seems none is configured. Please contact customer support directly for assistance with this."
         * (END verification - FAILED) and start over again from the beginning.
@@ -107,19 +122,13 @@ Your output will be delivered in an audio voice response, please ensure that eve
             * Ask: "Is there anything else I can help you with?"
     * If no:
         * Tell the user: "I'll help you create a new ticket. Please hold on while I'm creating the ticket."
-        * Invoke the `classify_email` tool with the complete issue details provided by the user as `email_content`.
-        * Invoke the `analyze_sentiment_email` tool with the same `email_content`.
-        * Invoke the `generate_case_summary` tool, passing:
-            - The result from `analyze_sentiment_email` as `sentiment_analysis`.
-            - The result from `classify_email` as `classification`.
-            - The complete issue details provided by the user as `users_description`.
-        * Invoke the `create_case` tool, passing:
-            - Use the details provided by the user as the `subject` (create a subject of the ticket from users description) and `body` (create a body of the ticket from users description),
-            - Use the verified `contact_phone` (this is the `phone_number` collected during successful verification), and pass any mentioned monetary value as `disputed_amount` (as a number/double)
-            - The result from `generate_case_summary` as `ai_summary_content`.
-            - The priority from `classify_email` as `priority`
-            - Choose best tags from `classify_email` as `request_type`
-        * Inform the user: "I've created a new ticket for you." and tell them their ticket number, and ask: "Should I repeat the ticket number? Or is there anything else I can help you with?"
+        * Invoke the `triage_and_create_case` tool once, passing:
+            - `subject`: a short subject for the ticket, written from the user's description
+            - `issue_description`: the complete issue details provided by the user
+            - `contact_phone`: the verified `phone_number` collected during successful verification
+            - `disputed_amount`: any mentioned monetary value (as a number/double), otherwise None
+        * If the result has an `error`, say: "I'm sorry, I couldn't create the ticket right now. Please try again in a moment or call our customer service center." and ask if there is anything else you can help with.
+        * Otherwise inform the user: "I've created a new ticket for you." and tell them their ticket number (`case_number`), and ask: "Should I repeat the ticket number? Or is there anything else I can help you with?"
     """,
     model="gpt-4o",
-    tools=[verification_tool,create_case,get_case,classify_email,analyze_sentiment_email,generate_case_summary])
\ No newline at end of file
+    tools=AGENT_TOOLS)
\ No newline at end of file
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+from call_session import CallSession
+
+
+class SessionManager:
+    """Runs many CallSessions concurrently on a single asyncio loop.
+
+    Async callers use the coroutine methods directly on their own loop. Sync
+    callers (a UI thread, the module-level functions in main.py) call
+    `start_background()` once, which runs the loop in a daemon thread, and then
+    use `call()` to run a coroutine on it and wait for the result.
+    """
+
+    def __init__(self):
+        self.sessions = {}
+        self.loop = None
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Async API (run on the manager's loop)
+    # ------------------------------------------------------------------
+
+    async def start_session(self, session_id=None, **session_options):
+        """Create a CallSession and start its conversation. Returns the session."""
+        if session_id in self.sessions and self.sessions[session_id].running:
+            print(f"Session {session_id} is already running")
+            return self.sessions[session_id]
+        session = CallSession(session_id=session_id, **session_options)
+        self.sessions[session.session_id] = session
+        session.start()
+        return session
+
+    async def stop_session(self, session_id):
+        session = self.sessions.pop(session_id, None)
+        if session is None:
+            print(f"No session {session_id}")
+            return False
+        return await session.stop()
+
+    async def stop_all(self):
+        await asyncio.gather(*(self.stop_session(session_id) for session_id in list(self.sessions)))
+
+    def get(self, session_id):
+        return self.sessions.get(session_id)
+
+    def list_sessions(self):
+        return [
+            {"session_id": session.session_id, "running": session.running, **session.get_mute_states()}
+            for session in self.sessions.values()
+        ]
+
+    # ------------------------------------------------------------------
+    # Sync bridge
+    # ------------------------------------------------------------------
+
+    def start_background(self):
+        """Run the manager's event loop in a daemon thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return self.loop
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run_loop():
+            asyncio.set_event_loop(self.loop)
+            self.loop.call_soon(ready.set)
+            self.loop.run_forever()
+
+        self._thread = threading.Thread(target=run_loop, name="session-manager", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.loop
+
+    def call(self, coro, timeout=None):
+        """Run a coroutine on the background loop from another thread and return its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def call_soon(self, func, *args):
+        """Run a plain callable (e.g. a mute toggle) on the background loop and return its result."""
+        async def invoke():
+            return func(*args)
+        return self.call(invoke())
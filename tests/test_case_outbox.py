@@ -0,0 +1,66 @@
+from tools.case_outbox import CaseOutbox
+
+
+class FakeSalesforce:
+    """Just enough of simple_salesforce for the outbox: CaseNumber lookups and collection PATCHes."""
+
+    def __init__(self, case_numbers):
+        self.cases = {f"500{number}": {"CaseNumber": number} for number in case_numbers}
+
+    def query(self, soql):
+        return {"records": [{"Id": case_id, "CaseNumber": case["CaseNumber"]}
+                            for case_id, case in self.cases.items() if f"'{case['CaseNumber']}'" in soql]}
+
+    def restful(self, path, method, json):
+        results = []
+        for record in json["records"]:
+            self.cases[record["id"]].update({k: v for k, v in record.items() if k not in ("attributes", "id")})
+            results.append({"id": record["id"], "success": True, "errors": []})
+        return results
+
+
+class FakeCredentials:
+    def __init__(self, sf):
+        self.sf = sf
+
+    def call(self, func):
+        return func(self.sf)
+
+
+def make_outbox(tmp_path, sf):
+    return CaseOutbox(path=str(tmp_path / "outbox.db"), credentials=FakeCredentials(sf))
+
+
+def drain(outbox):
+    while outbox.drain_once():
+        pass
+
+
+def test_high_low_high_before_drain_ends_at_high(tmp_path):
+    sf = FakeSalesforce(["00001000"])
+    outbox = make_outbox(tmp_path, sf)
+
+    queued = [outbox.enqueue("00001000", {"Priority": priority})["queued"] for priority in ("High", "Low", "High")]
+    drain(outbox)
+
+    assert queued == [True, True, True]
+    assert sf.cases["50000001000"]["Priority"] == "High"
+
+
+def test_high_low_high_with_drains_between_ends_at_high(tmp_path):
+    sf = FakeSalesforce(["00001000"])
+    outbox = make_outbox(tmp_path, sf)
+
+    for priority in ("High", "Low", "High"):
+        assert outbox.enqueue("00001000", {"Priority": priority})["queued"]
+        drain(outbox)
+
+    assert sf.cases["50000001000"]["Priority"] == "High"
+
+
+def test_repeating_the_newest_pending_update_is_a_no_op(tmp_path):
+    outbox = make_outbox(tmp_path, FakeSalesforce(["00001000"]))
+
+    assert outbox.enqueue("00001000", {"Priority": "High"})["queued"]
+    assert not outbox.enqueue("00001000", {"Priority": "High"})["queued"]
+    assert outbox.stats()["depth"] == 1
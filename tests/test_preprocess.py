@@ -0,0 +1,42 @@
+import numpy as np
+from audio.preprocess import trim_silence
+
+SAMPLERATE = 24000
+
+
+def tone(seconds):
+    t = np.arange(int(SAMPLERATE * seconds)) / SAMPLERATE
+    return (np.sin(2 * np.pi * 440 * t) * 5000 + 7000).astype(np.int16)
+
+
+def silence(seconds):
+    return np.zeros(int(SAMPLERATE * seconds), dtype=np.int16)
+
+
+def silent_runs_ms(audio):
+    """Lengths (ms) of the runs of silent samples in `audio`."""
+    edges = np.diff(np.concatenate(([0], (audio == 0).astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    return [(end - start) * 1000 / SAMPLERATE for start, end in zip(starts, ends)]
+
+
+def test_long_pause_is_cut_to_max_gap_including_padding():
+    audio = np.concatenate([silence(1.0), tone(0.5), silence(2.0), tone(0.5), silence(1.0)])
+
+    trimmed = trim_silence(audio, SAMPLERATE, pad_ms=100.0, max_gap_ms=300.0)
+
+    assert silent_runs_ms(trimmed) == [100.0, 300.0, 100.0]
+
+
+def test_long_pause_with_default_settings():
+    audio = np.concatenate([tone(0.5), silence(2.0), tone(0.5)])
+
+    assert silent_runs_ms(trim_silence(audio, SAMPLERATE)) == [300.0]
+
+
+def test_short_pause_is_kept_whole():
+    audio = np.concatenate([tone(0.5), silence(0.2), tone(0.5)])
+
+    trimmed = trim_silence(audio, SAMPLERATE, pad_ms=150.0, max_gap_ms=300.0)
+
+    assert silent_runs_ms(trimmed) == [200.0]
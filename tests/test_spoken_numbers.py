@@ -0,0 +1,40 @@
+import pytest
+from tools.spoken_numbers import normalize_spoken, normalize_case_number
+
+
+@pytest.mark.parametrize("spoken, expected", [
+    ("nine eight seven, double six, five oh", "9876650"),
+    ("C dash one oh oh one", "c1001"),
+    ("twenty one", "21"),
+    ("one two three four", "1234"),
+])
+def test_digit_words(spoken, expected):
+    assert normalize_spoken(spoken) == expected
+
+
+@pytest.mark.parametrize("spoken, expected", [
+    ("one hundred twenty three", "123"),
+    ("two thousand five", "2005"),
+    ("five hundred and one", "501"),
+    ("one hundred oh five", "105"),
+    ("twenty five hundred", "2500"),
+    ("two thousand twenty five", "2025"),
+    ("hundred", "100"),
+    ("nine one hundred", "9100"),
+])
+def test_hundreds_and_thousands(spoken, expected):
+    assert normalize_spoken(spoken) == expected
+
+
+@pytest.mark.parametrize("spoken, expected", [
+    ("nine for two", "942"),
+    ("five to seven", "527"),
+    ("one too three", "123"),
+    ("call to talk about nine eight", "calltalkabout98"),
+])
+def test_digit_homophones(spoken, expected):
+    assert normalize_spoken(spoken) == expected
+
+
+def test_case_number_is_zero_padded():
+    assert normalize_case_number("one hundred twenty three") == "00000123"
@@ -2,40 +2,25 @@ from agents import function_tool
 import os
 import requests
 import traceback
+from tools.async_http import get_http_client
+from tools.result_cache import get_result_cache
 
-@function_tool(
-    name_override="generate_case_summary",
-    description_override="Generate a structured case summary from various inputs using Claude.",
-    strict_mode=True
-)
-def generate_case_summary(
-    sentiment_analysis: str,
-    classification: str,
-    users_description: str
-) -> str:
-    """
-    Generates a structured case summary using Claude API from provided inputs.
-    Args:
-        sentiment_analysis: String with tone and sentiment indicators.
-        classification: Categorization of request type and priority.
-        users_description: Text of customer's description of issue.
-    Returns:
-        A structured case summary string.
-    """
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    print(f"Anthropic API Key Loaded: {bool(api_key)}") # Check if API key is loaded
+CLAUDE_URL = "https://api.anthropic.com/v1/messages"
 
-    print("="*60)
-    print("::::[TOOL CALLED] GENERATE CASE SUMMARY::::")
-    print("="*60)
-    print("🎯 Sentiment Analysis Input:\n", sentiment_analysis)
-    print("📂 Classification Input:\n", classification)
-    print("📧 Customer Email Input:\n", users_description)
-    print("="*60)
-    
+# A summary is all free text about the caller's own details (amounts, dates), so only an
+# identical description + analysis reuses one
+summary_cache = get_result_cache("summary")
+
+
+def summary_cache_text(sentiment_analysis: str, classification: str, users_description: str) -> str:
+    return f"{sentiment_analysis}\n{classification}\n{users_description}"
+
+
+def build_summary_request(sentiment_analysis: str, classification: str, users_description: str):
+    """Return (url, headers, body) for the Claude summary request."""
     # Claude API details
     api_key = os.getenv("ANTHROPIC_API_KEY")
-    url = "https://api.anthropic.com/v1/messages"
+    url = CLAUDE_URL
     headers = {
         "x-api-key": api_key,
         "anthropic-version": "2023-06-01",
@@ -72,7 +57,47 @@ Use emojis and keep the language professional and clear.
             {"role": "user", "content": prompt}
         ]
     }
+    return url, headers, body
+
+
+@function_tool(
+    name_override="generate_case_summary",
+    description_override="Generate a structured case summary from various inputs using Claude.",
+    strict_mode=True
+)
+def generate_case_summary(
+    sentiment_analysis: str,
+    classification: str,
+    users_description: str
+) -> str:
+    """
+    Generates a structured case summary using Claude API from provided inputs.
+    Args:
+        sentiment_analysis: String with tone and sentiment indicators.
+        classification: Categorization of request type and priority.
+        users_description: Text of customer's description of issue.
+    Returns:
+        A structured case summary string.
+    """
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    print(f"Anthropic API Key Loaded: {bool(api_key)}") # Check if API key is loaded
+
+    print("="*60)
+    print("::::[TOOL CALLED] GENERATE CASE SUMMARY::::")
+    print("="*60)
+    print("🎯 Sentiment Analysis Input:\n", sentiment_analysis)
+    print("📂 Classification Input:\n", classification)
+    print("📧 Customer Email Input:\n", users_description)
+    print("="*60)
     
+    cache_text = summary_cache_text(sentiment_analysis, classification, users_description)
+    cached = summary_cache.get(cache_text)
+    if cached is not None:
+        print("✅ Case Summary Output (cached):\n", cached)
+        return cached
+
+    url, headers, body = build_summary_request(sentiment_analysis, classification, users_description)
+
     response = requests.post(url, headers=headers, json=body)
     if response.status_code != 200:
         print(f"❌ Claude API Error: {response.status_code}\n{response.text}")
@@ -82,8 +107,59 @@ Use emojis and keep the language professional and clear.
         response_data = response.json()
         summary_text = response_data["content"][0]["text"]
         print("✅ Case Summary Output:\n", summary_text)
+        summary_cache.put(cache_text, summary_text)
         return summary_text
     except Exception as e:
         print(f"❌ Failed to parse Claude response: {type(e).__name__} - {e}") # Print exception type and message
         traceback.print_exc() # Print full traceback
-        return {"error": f"Parsing Claude response failed: {e}"}
\ No newline at end of file
+        return {"error": f"Parsing Claude response failed: {e}"}
+
+
+async def agenerate_case_summary(
+    sentiment_analysis: str,
+    classification: str,
+    users_description: str
+) -> str:
+    """
+    Generates a structured case summary using Claude API from provided inputs.
+    Args:
+        sentiment_analysis: String with tone and sentiment indicators.
+        classification: Categorization of request type and priority.
+        users_description: Text of customer's description of issue.
+    Returns:
+        A structured case summary string.
+    """
+    print("="*60)
+    print("::::[TOOL CALLED] GENERATE CASE SUMMARY (async)::::")
+    print("="*60)
+
+    cache_text = summary_cache_text(sentiment_analysis, classification, users_description)
+    cached = summary_cache.get(cache_text)
+    if cached is not None:
+        print("✅ Case Summary Output (cached):\n", cached)
+        return cached
+
+    url, headers, body = build_summary_request(sentiment_analysis, classification, users_description)
+
+    response = await get_http_client().post(url, headers=headers, json=body, timeout=60.0)
+    if response.status_code != 200:
+        print(f"❌ Claude API Error: {response.status_code}\n{response.text}")
+        return {"error": f"Claude API error: {response.status_code}"}
+
+    try:
+        response_data = response.json()
+        summary_text = response_data["content"][0]["text"]
+        print("✅ Case Summary Output:\n", summary_text)
+        summary_cache.put(cache_text, summary_text)
+        return summary_text
+    except Exception as e:
+        print(f"❌ Failed to parse Claude response: {type(e).__name__} - {e}")
+        return {"error": f"Parsing Claude response failed: {e}"}
+
+
+generate_case_summary_async = function_tool(
+    agenerate_case_summary,
+    name_override="generate_case_summary",
+    description_override="Generate a structured case summary from various inputs using Claude.",
+    strict_mode=True
+)
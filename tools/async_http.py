@@ -0,0 +1,28 @@
+import asyncio
+import httpx
+
+# One pooled client per event loop: httpx connection pools can't be shared
+# between loops, and every call in a process normally runs on the same one.
+_clients = {}
+
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared AsyncClient for the running event loop (keep-alive connections are reused across tool calls)."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        # Forget clients of loops that have since been closed
+        for stale in [l for l in _clients if l.is_closed()]:
+            del _clients[stale]
+        client = httpx.AsyncClient(timeout=DEFAULT_TIMEOUT)
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client():
+    """Close the running loop's shared client (call on shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,93 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+
+# Fields the agent needs when reading a case back; one SOQL query returns all of them
+CASE_FIELDS = os.getenv(
+    "CASE_FIELDS",
+    "Id, CaseNumber, Subject, Description, Status, Priority, Origin, SuppliedPhone, CreatedDate, "
+    "LastModifiedDate, Request_Type__c, Request_Subject_Name__c, Disputed_Amount__c, "
+    "AI_Summary_Content__c, Comments_Notes__c, EmailContent__c, Assigned_To__c",
+)
+
+CASE_FIELD_NAMES = [field.strip() for field in CASE_FIELDS.split(",") if field.strip()]
+
+CASE_CACHE_SIZE = int(os.getenv("CASE_CACHE_SIZE", "256"))
+CASE_CACHE_TTL = float(os.getenv("CASE_CACHE_TTL", "300"))
+
+
+def soql_quote(value: str) -> str:
+    """Escape a value for use inside a single-quoted SOQL string literal."""
+    return str(value).replace("\\", "\\\\").replace("'", "\\'")
+
+
+def case_query(case_number: str) -> str:
+    # LIMIT 2 is enough to tell "one match" from "several"
+    return f"SELECT {CASE_FIELDS} FROM Case WHERE CaseNumber = '{soql_quote(case_number)}' LIMIT 2"
+
+
+def case_from_query(case_number: str, results: dict) -> dict:
+    """Turn the query result into the case record (without SOQL 'attributes'), or an error dict."""
+    if results["totalSize"] == 0:
+        return {"error": f"Case with CaseNumber '{case_number}' not found."}
+    elif results["totalSize"] > 1:
+        return {"error": f"Multiple cases found with CaseNumber '{case_number}'."}
+    record = dict(results["records"][0])
+    record.pop("attributes", None)
+    return record
+
+
+class CaseCache:
+    """Bounded LRU cache of case records keyed by case number, with a TTL.
+
+    Only successful lookups are stored. Our own writes keep it current:
+    update_case invalidates the entry and caches the record it reads back
+    after the write, create_case caches the new case. Edits made elsewhere
+    show up after `ttl` seconds at the latest.
+    """
+
+    def __init__(self, maxsize=CASE_CACHE_SIZE, ttl=CASE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, case_number):
+        with self._lock:
+            entry = self._entries.get(case_number)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[case_number]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(case_number)
+            self.hits += 1
+            # Copy so callers can't modify the cached record
+            return dict(entry[1])
+
+    def put(self, case_number, record):
+        if not case_number or "error" in record:
+            return
+        with self._lock:
+            self._entries[case_number] = (time.monotonic() + self.ttl, dict(record))
+            self._entries.move_to_end(case_number)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, case_number):
+        with self._lock:
+            self._entries.pop(case_number, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Shared by the sync and async case tools
+case_cache = CaseCache()
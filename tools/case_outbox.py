@@ -0,0 +1,279 @@
+import os
+import json
+import time
+import random
+import hashlib
+import sqlite3
+import threading
+from tools.salesforce_auth import salesforce_credentials
+from tools.case_cache import case_cache, soql_quote
+
+OUTBOX_PATH = os.getenv(
+    "CASE_OUTBOX_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "case_outbox.db"),
+)
+OUTBOX_BATCH_SIZE = int(os.getenv("CASE_OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("CASE_OUTBOX_POLL_INTERVAL", "1.0"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("CASE_OUTBOX_MAX_ATTEMPTS", "8"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS case_outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL,
+    case_number TEXT NOT NULL,
+    fields TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    sent_at REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS case_outbox_due ON case_outbox (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS case_outbox_case ON case_outbox (case_number, status);
+"""
+
+
+def idempotency_key(case_number: str, fields: dict) -> str:
+    """Same case + same field values -> same key, so a repeated update is recognised as a duplicate."""
+    canonical = json.dumps({"case_number": case_number, "fields": fields}, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CaseOutbox:
+    """Durable write-behind queue for Salesforce case updates.
+
+    `enqueue()` commits the update to a local SQLite table and returns
+    immediately. A background thread drains due rows in batches: it resolves
+    the case numbers to Ids with one query, then sends all updates in one
+    sObject Collections PATCH. Each row is marked sent or retried on its own,
+    with exponential backoff and jitter. After `max_attempts` a row is
+    parked as 'failed'.
+
+    Every row has an idempotency key. Re-enqueuing the update that is
+    already the newest pending one for its case is a no-op; anything else is
+    queued, so High -> Low -> High ends at High whether or not the worker
+    sent the earlier rows in between. A sent row can be re-sent only if the
+    process dies between the PATCH and the commit, which is harmless because
+    setting the same field values twice has the same result.
+    """
+
+    def __init__(self, path=OUTBOX_PATH, batch_size=OUTBOX_BATCH_SIZE, poll_interval=OUTBOX_POLL_INTERVAL,
+                 max_attempts=OUTBOX_MAX_ATTEMPTS, base_backoff=2.0, max_backoff=300.0, credentials=None):
+        self.path = path
+        self.batch_size = min(batch_size, 200)
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.credentials = credentials or salesforce_credentials
+
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.sent = 0
+        self.retries = 0
+        self.last_batch_seconds = None
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def enqueue(self, case_number: str, fields: dict, key: str | None = None) -> dict:
+        """Queue an update of `fields` on a case.
+
+        Returns {"idempotency_key", "queued"}; "queued" is False when the same
+        update is already the newest pending one for the case.
+        """
+        key = key or idempotency_key(case_number, fields)
+        now = time.time()
+        with self._lock:
+            newest = self._db.execute(
+                "SELECT idempotency_key FROM case_outbox WHERE case_number = ? AND status = 'pending' "
+                "ORDER BY id DESC LIMIT 1",
+                (case_number,),
+            ).fetchone()
+            queued = newest is None or newest[0] != key
+            if queued:
+                self._db.execute(
+                    "INSERT INTO case_outbox (idempotency_key, case_number, fields, next_attempt_at, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, case_number, json.dumps(fields, default=str), now, now),
+                )
+        if queued:
+            self._wake.set()
+        return {"idempotency_key": key, "queued": queued}
+
+    # ------------------------------------------------------------------
+    # Worker
+    # ------------------------------------------------------------------
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="case-outbox", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                sent = self.drain_once()
+            except Exception as e:
+                print(f"Case outbox worker error: {e}")
+                sent = 0
+            if not sent:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def _due_rows(self):
+        with self._lock:
+            return self._db.execute(
+                # Updates to one case go out in enqueue order: a row waits while an earlier
+                # update of the same case is backing off
+                "SELECT id, case_number, fields, attempts FROM case_outbox AS row "
+                "WHERE status = 'pending' AND next_attempt_at <= :now AND NOT EXISTS ("
+                "  SELECT 1 FROM case_outbox AS earlier WHERE earlier.case_number = row.case_number"
+                "  AND earlier.status = 'pending' AND earlier.id < row.id AND earlier.next_attempt_at > :now"
+                ") ORDER BY id LIMIT :limit",
+                {"now": time.time(), "limit": self.batch_size},
+            ).fetchall()
+
+    def _resolve_case_ids(self, sf, case_numbers):
+        ids = {}
+        missing = []
+        for case_number in case_numbers:
+            cached = case_cache.get(case_number)
+            if cached is not None and cached.get("Id"):
+                ids[case_number] = cached["Id"]
+            else:
+                missing.append(case_number)
+        if missing:
+            numbers = ",".join(f"'{soql_quote(case_number)}'" for case_number in missing)
+            result = sf.query(f"SELECT Id, CaseNumber FROM Case WHERE CaseNumber IN ({numbers})")
+            for record in result["records"]:
+                ids[record["CaseNumber"]] = record["Id"]
+        return ids
+
+    def drain_once(self) -> int:
+        """Send one batch of due updates. Returns the number of rows sent."""
+        rows = self._due_rows()
+        if not rows:
+            return 0
+        started = time.perf_counter()
+
+        def send(sf):
+            case_ids = self._resolve_case_ids(sf, sorted({row[1] for row in rows}))
+            records, sendable, not_found, seen = [], [], [], set()
+            for row in rows:
+                row_id, case_number, fields, attempts = row
+                # A collection can't hold the same record twice; later updates go in the next batch, in order
+                if case_number in seen:
+                    continue
+                seen.add(case_number)
+                case_id = case_ids.get(case_number)
+                if case_id is None:
+                    not_found.append(row)
+                    continue
+                records.append({"attributes": {"type": "Case"}, "id": case_id, **json.loads(fields)})
+                sendable.append(row)
+            results = []
+            if records:
+                results = sf.restful("composite/sobjects", method="PATCH",
+                                     json={"allOrNone": False, "records": records})
+            return list(zip(sendable, results)), not_found
+
+        try:
+            outcomes, not_found = self.credentials.call(send)
+        except Exception as e:
+            for row in rows:
+                self._retry(row, str(e))
+            return 0
+
+        for row in not_found:
+            self._retry(row, f"Case with CaseNumber '{row[1]}' not found.")
+
+        sent = 0
+        for row, result in outcomes:
+            if result.get("success"):
+                self._mark_sent(row)
+                case_cache.invalidate(row[1])
+                sent += 1
+            else:
+                errors = "; ".join(error.get("message", str(error)) for error in result.get("errors", []))
+                self._retry(row, errors or "update failed")
+        self.sent += sent
+        self.last_batch_seconds = time.perf_counter() - started
+        return sent
+
+    def _mark_sent(self, row):
+        with self._lock:
+            self._db.execute(
+                "UPDATE case_outbox SET status = 'sent', attempts = attempts + 1, sent_at = ?, last_error = NULL "
+                "WHERE id = ?",
+                (time.time(), row[0]),
+            )
+
+    def _retry(self, row, error):
+        row_id, case_number, _, attempts = row
+        attempts += 1
+        self.retries += 1
+        if attempts >= self.max_attempts:
+            status, next_attempt = "failed", time.time()
+            print(f"Case outbox: giving up on update {row_id} for case {case_number}: {error}")
+        else:
+            delay = min(self.max_backoff, self.base_backoff * 2 ** (attempts - 1))
+            status, next_attempt = "pending", time.time() + delay * random.uniform(0.8, 1.2)
+        with self._lock:
+            self._db.execute(
+                "UPDATE case_outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (status, attempts, next_attempt, error, row_id),
+            )
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        """Queue depth, lag of the oldest pending update, and worker counters."""
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM case_outbox GROUP BY status").fetchall())
+            oldest = self._db.execute(
+                "SELECT MIN(created_at) FROM case_outbox WHERE status = 'pending'"
+            ).fetchone()[0]
+        return {
+            "depth": counts.get("pending", 0),
+            "failed": counts.get("failed", 0),
+            "sent_total": counts.get("sent", 0),
+            "lag_seconds": round(time.time() - oldest, 1) if oldest else 0.0,
+            "sent_this_process": self.sent,
+            "retries": self.retries,
+            "last_batch_ms": round(self.last_batch_seconds * 1000) if self.last_batch_seconds else None,
+        }
+
+
+_outbox = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> CaseOutbox:
+    """The process-wide outbox, with its worker started on first use."""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = CaseOutbox().start()
+        return _outbox
@@ -1,10 +1,55 @@
 from agents import function_tool
 import os
 import requests
-from simple_salesforce import Salesforce
 import base64
 from urllib.parse import urlparse
 from datetime import datetime
+from tools.salesforce_async import connect_salesforce
+from tools.salesforce_auth import salesforce_credentials
+from tools.case_cache import case_cache
+from tools.salesforce_composite import (
+    MAX_COLLECTION_SIZE,
+    create_case_request,
+    parse_create_case_response,
+    create_cases_request,
+    parse_create_cases_response,
+    cases_by_id_query,
+    fill_missing,
+)
+
+
+def format_internal_comments(subject: str, body: str) -> str:
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return f"""
+Original Complaint (Received through Voicebot: {timestamp})
+----------------------------------------
+Subject: {subject}
+{body}
+"""
+
+
+def build_case_data(subject, contact_phone, body, disputed_amount=None, description=None,
+                    ai_summary_content=None, priority=None, request_type=None) -> dict:
+    """Case fields sent to Salesforce for a new case."""
+    case_data = {
+        "Subject": subject,
+        "Description": description,
+        "SuppliedPhone": contact_phone,
+        "Origin": "Web",
+        "Status": "Pending",
+        "Request_Subject_Name__c": subject,
+        "Disputed_Amount__c": str(disputed_amount) if disputed_amount else None,
+        "Comments": format_internal_comments(subject,body),
+        "Assigned_To__c": "005dM00000BANfRQAX",
+    }
+
+    if ai_summary_content is not None:
+        case_data["AI_Summary_Content__c"] = ai_summary_content
+    if priority is not None:
+        case_data["Priority"] = priority
+    if request_type is not None:
+        case_data["Request_Type__c"] = request_type
+    return case_data
 
 @function_tool(
     name_override="create_case",
@@ -43,65 +88,26 @@ def create_case(
     print(f"Request Type: {request_type}")
     print("="*50)
 
-    def get_connection_credentials(connection_id: str, providerConfigKey: str):
-        base_url = os.getenv("NANGO_BASE_URL")
-        secret_key = os.getenv("NANGO_SECRET_KEY")
-        url = f"{base_url}/connection/{connection_id}"
-        params = {
-            "provider_config_key": providerConfigKey,
-            "refresh_token": "true",
-        }
-        headers = {"Authorization": f"Bearer {secret_key}"}
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
-
-    def format_internal_comments(subject: str, body: str) -> str:
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        return f"""
-Original Complaint (Received through Voicebot: {timestamp})
-----------------------------------------
-Subject: {subject}
-{body}
-"""
-
-    # Authenticate with Salesforce
-    instance_url = os.getenv("SALESFORCE_INSTANCE_URL")
-    salesforce_connection_id = os.getenv("SALESFORCE_CONNECTION_ID")
-    credentials = get_connection_credentials(salesforce_connection_id, "salesforce")
-    access_token = credentials["credentials"]["access_token"]
-    sf = Salesforce(instance_url=instance_url, session_id=access_token)
-
     # Prepare case data
-    case_data = {
-        "Subject": subject,
-        "Description": description,
-        "SuppliedPhone": contact_phone,
-        "Origin": "Web",
-        "Status": "Pending",
-        "Request_Subject_Name__c": subject,
-        "Disputed_Amount__c": str(disputed_amount) if disputed_amount else None,
-        "Comments": format_internal_comments(subject,body),
-        "Assigned_To__c": "005dM00000BANfRQAX",
-    }
-    
-    if ai_summary_content is not None:
-        case_data["AI_Summary_Content__c"] = ai_summary_content
-    if priority is not None:
-        case_data["Priority"] = priority
-    if request_type is not None:
-        case_data["Request_Type__c"] = request_type
+    case_data = build_case_data(subject, contact_phone, body, disputed_amount, description,
+                                ai_summary_content, priority, request_type)
 
-    # Create the case
-    response = sf.Case.create(case_data)
-    case_id = response["id"]
-    case_data_res = dict(sf.Case.get(case_id))
+    # Create the case and read back its CaseNumber/Status/Priority in one composite request
+    # on the shared, cached Salesforce session
+    response = salesforce_credentials.call(
+        lambda sf: sf.restful("composite", method="POST", json=create_case_request(case_data, sf.sf_version))
+    )
+    case_data_res = parse_create_case_response(response)
+    case_id = case_data_res["Id"]
+    # Callers usually read the new case back right away; serve that from the cache
+    case_cache.put(case_data_res.get("CaseNumber"), case_data_res)
 
     print(f"Case created successfully with ID: {case_id}")
 
     # Placeholder for attachments
     attachment_files = []
     if attachment_files:
+        sf = salesforce_credentials.get_salesforce()
         for attachment_url in attachment_files:
             try:
                 response = requests.get(attachment_url, stream=True)
@@ -123,3 +129,99 @@ Subject: {subject}
                 print(f"Attachment error: {e}")
 
     return case_data_res
+
+
+async def acreate_case(
+    subject: str,
+    contact_phone: str,
+    body: str,
+    disputed_amount: float | None = None,
+    description: str | None = None,
+    ai_summary_content: str | None = None,
+    priority: str | None = None,
+    request_type: str | None = None,
+) -> dict:
+    """
+    Creates a case record based on the provided details.
+
+    Args:
+        subject: The subject of the case.
+        contact_phone: The phone number of the customer.
+        body: The body of the email.
+        disputed_amount: Optional disputed amount in numbers only (no currency symbol).
+        description: Optional detailed case description.
+    """
+    print("="*50)
+    print("::::[TOOL CALLED] CREATE CASE (async)::::")
+    print(f"Subject: {subject}")
+    print(f"Contact Phone: {contact_phone}")
+    print(f"Disputed Amount: {disputed_amount}")
+    print(f"Priority: {priority}")
+    print(f"Request Type: {request_type}")
+    print("="*50)
+
+    # Shared async Salesforce client (cached token)
+    sf = await connect_salesforce()
+
+    case_data = build_case_data(subject, contact_phone, body, disputed_amount, description,
+                                ai_summary_content, priority, request_type)
+
+    # Create the case and read it back in one composite request
+    response = await sf.restful("composite", method="POST", json=create_case_request(case_data, sf.version))
+    case_data_res = parse_create_case_response(response)
+    case_id = case_data_res["Id"]
+    case_cache.put(case_data_res.get("CaseNumber"), case_data_res)
+
+    print(f"Case created successfully with ID: {case_id}")
+    return case_data_res
+
+
+create_case_async = function_tool(
+    acreate_case,
+    name_override="create_case",
+    description_override="Create a Salesforce case with provided subject, phone number, body, disputed amount, and description.",
+    strict_mode=True
+)
+
+
+def create_cases(cases: list[dict]) -> list[dict]:
+    """Create many cases with one composite request per 200 cases (not an agent tool).
+
+    Each item holds create_case's arguments (subject, contact_phone, body, ...).
+    Returns one result per item, in order: the created case's fields or {"error": ...}.
+    """
+    results = []
+    for start in range(0, len(cases), MAX_COLLECTION_SIZE):
+        batch = [build_case_data(**case) for case in cases[start:start + MAX_COLLECTION_SIZE]]
+        response = salesforce_credentials.call(
+            lambda sf: sf.restful("composite", method="POST", json=create_cases_request(batch, sf.sf_version))
+        )
+        batch_results, missing_ids = parse_create_cases_response(response)
+        if missing_ids:
+            # Some records in the batch failed, so the in-request read-back couldn't run
+            query_result = salesforce_credentials.call(lambda sf: sf.query(cases_by_id_query(missing_ids)))
+            batch_results = fill_missing(batch_results, query_result)
+        results.extend(batch_results)
+
+    for result in results:
+        case_cache.put(result.get("CaseNumber"), result)
+    print(f"Bulk created {sum('error' not in result for result in results)} of {len(cases)} cases")
+    return results
+
+
+async def acreate_cases(cases: list[dict]) -> list[dict]:
+    """Async create_cases."""
+    sf = await connect_salesforce()
+    results = []
+    for start in range(0, len(cases), MAX_COLLECTION_SIZE):
+        batch = [build_case_data(**case) for case in cases[start:start + MAX_COLLECTION_SIZE]]
+        response = await sf.restful("composite", method="POST", json=create_cases_request(batch, sf.version))
+        batch_results, missing_ids = parse_create_cases_response(response)
+        if missing_ids:
+            batch_results = fill_missing(batch_results, await sf.query(cases_by_id_query(missing_ids)))
+        results.extend(batch_results)
+
+    for result in results:
+        case_cache.put(result.get("CaseNumber"), result)
+    print(f"Bulk created {sum('error' not in result for result in results)} of {len(cases)} cases")
+    return results
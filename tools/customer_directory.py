@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import threading
+from tools.spoken_numbers import edit_distance
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+CUSTOMERS_PATH = os.path.join(ASSETS_DIR, "customers.json")
+SECURITY_QUESTIONS_PATH = os.path.join(ASSETS_DIR, "security_questions.json")
+
+# How often (seconds) lookups stat the files to pick up edits
+DIRECTORY_CHECK_INTERVAL = float(os.getenv("CUSTOMER_DIRECTORY_CHECK_INTERVAL", "1.0"))
+# Largest edit distance a possible match may have in the field that didn't match exactly
+FUZZY_MAX_DISTANCE = int(os.getenv("CUSTOMER_FUZZY_MAX_DISTANCE", "2"))
+
+
+def clean_string(input_str):
+    """Normalize phone numbers, customer IDs and answers: no spaces/dashes/underscores, lower case."""
+    if not isinstance(input_str, str):
+        input_str = str(input_str)  # Ensure it's a string
+    cleaned = input_str.replace(' ', '').replace('-', '').replace('_', '')
+    return cleaned.lower().strip()
+
+
+def closest_match(phone_key, customer_key, by_phone, by_customer, max_distance=FUZZY_MAX_DISTANCE):
+    """Pick the one customer that matches one field exactly and the other within `max_distance` edits.
+
+    `by_phone` are records whose phone matched exactly, `by_customer` those whose customer ID did.
+    Returns (record, field_that_differs) or None when nothing is close enough or the nearest is a tie.
+    """
+    scored = []
+    for record in by_phone:
+        distance = edit_distance(customer_key, clean_string(record.get("customer_id", "")), max_distance)
+        scored.append((distance, "customer_id", record))
+    for record in by_customer:
+        distance = edit_distance(phone_key, clean_string(record.get("phone_number", "")), max_distance)
+        scored.append((distance, "phone_number", record))
+    scored = [candidate for candidate in scored if candidate[0] <= max_distance]
+    if not scored:
+        return None
+    scored.sort(key=lambda candidate: candidate[0])
+    best = scored[0]
+    if len(scored) > 1 and scored[1][0] == best[0] and scored[1][2]["customer_id"] != best[2]["customer_id"]:
+        return None
+    return dict(best[2]), best[1]
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+class CustomerDirectory:
+    """customers.json and security_questions.json, loaded once and indexed in memory.
+
+    Customers are indexed by normalized (phone_number, customer_id), so a
+    lookup is one dict access. Lookups re-stat the files at most every
+    `check_interval` seconds and reload them when their mtime has changed.
+    """
+
+    def __init__(self, customers_path=CUSTOMERS_PATH, security_questions_path=SECURITY_QUESTIONS_PATH,
+                 check_interval=DIRECTORY_CHECK_INTERVAL):
+        self.customers_path = customers_path
+        self.security_questions_path = security_questions_path
+        self.check_interval = check_interval
+
+        self.customers = []
+        self.security_questions = {}
+        self._index = {}
+        self._by_phone = {}
+        self._by_customer = {}
+        self._mtimes = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        mtimes = (_mtime(self.customers_path), _mtime(self.security_questions_path))
+        with open(self.customers_path, 'r') as f:
+            customers = json.load(f).get('customers', [])
+        with open(self.security_questions_path, 'r') as f:
+            security_questions = json.load(f).get('security_questions', {})
+
+        index, by_phone, by_customer = {}, {}, {}
+        for record in customers:
+            key = (clean_string(record.get("phone_number", "")), clean_string(record.get("customer_id", "")))
+            # First match wins, as with the old linear scan
+            index.setdefault(key, record)
+            by_phone.setdefault(key[0], []).append(record)
+            by_customer.setdefault(key[1], []).append(record)
+
+        self.customers = customers
+        self.security_questions = security_questions
+        self._index = index
+        self._by_phone = by_phone
+        self._by_customer = by_customer
+        self._mtimes = mtimes
+        print(f"Customer directory loaded: {len(customers)} customers, {len(security_questions)} security questions")
+
+    def refresh(self, force=False):
+        """Reload the files if they changed since the last load (or if `force`)."""
+        now = time.monotonic()
+        if not force and self._mtimes is not None and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            current = (_mtime(self.customers_path), _mtime(self.security_questions_path))
+            if force or current != self._mtimes:
+                self._load()
+
+    def lookup(self, phone_number, customer_id):
+        """The customer record matching both values (after normalization), or None."""
+        self.refresh()
+        record = self._index.get((clean_string(phone_number), clean_string(customer_id)))
+        return dict(record) if record is not None else None
+
+    def closest(self, phone_number, customer_id, max_distance=FUZZY_MAX_DISTANCE):
+        """Near match for a failed lookup: (record, field_that_differs) or None. See closest_match."""
+        self.refresh()
+        phone_key, customer_key = clean_string(phone_number), clean_string(customer_id)
+        return closest_match(phone_key, customer_key, self._by_phone.get(phone_key, []),
+                             self._by_customer.get(customer_key, []), max_distance)
+
+    def security_question(self, customer_id):
+        """{"question", "answer"} for the customer, or None if none is configured."""
+        self.refresh()
+        return self.security_questions.get(customer_id)
+
+    def set_account_status(self, customer_id, status):
+        """Change a customer's account_status and write customers.json back.
+
+        Only safe within one process; use the SQLite store (tools.customer_store) when several
+        processes verify callers.
+        """
+        self.refresh()
+        with self._lock:
+            for record in self.customers:
+                if record["customer_id"] == customer_id:
+                    record["account_status"] = status
+            # Write a temp file and rename it over the original, so readers never see a partial file
+            tmp_path = f"{self.customers_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({"customers": self.customers}, f, indent=4)
+            os.replace(tmp_path, self.customers_path)
+            # Our own write shouldn't trigger a reload
+            self._mtimes = (_mtime(self.customers_path), self._mtimes[1])
+
+
+# Shared by every verification_tool call in the process
+customer_directory = CustomerDirectory()
@@ -0,0 +1,214 @@
+import os
+import sys
+import json
+import sqlite3
+import threading
+from tools.customer_directory import (
+    customer_directory, clean_string, closest_match, CUSTOMERS_PATH, SECURITY_QUESTIONS_PATH,
+    FUZZY_MAX_DISTANCE,
+)
+
+# "sqlite" (default) or "json" (customers.json via CustomerDirectory)
+CUSTOMER_BACKEND = os.getenv("CUSTOMER_BACKEND", "sqlite")
+CUSTOMER_DB_PATH = os.getenv(
+    "CUSTOMER_DB_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "customers.db"),
+)
+# Bytes of the database file to memory-map; pages are then shared across processes via the page cache
+CUSTOMER_DB_MMAP_SIZE = int(os.getenv("CUSTOMER_DB_MMAP_SIZE", str(1 << 30)))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    customer_id TEXT PRIMARY KEY,
+    full_name TEXT,
+    phone_number TEXT,
+    email TEXT,
+    account_status TEXT NOT NULL DEFAULT 'active',
+    phone_key TEXT NOT NULL,
+    customer_key TEXT NOT NULL,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS customers_lookup ON customers (phone_key, customer_key);
+CREATE INDEX IF NOT EXISTS customers_by_id ON customers (customer_key);
+CREATE TABLE IF NOT EXISTS security_questions (
+    customer_id TEXT PRIMARY KEY,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL
+);
+"""
+
+CUSTOMER_COLUMNS = ("customer_id", "full_name", "phone_number", "email", "account_status")
+
+
+class CustomerStore:
+    """Customers, account status and security questions in SQLite.
+
+    Lookups go through an index on the normalized (phone, customer ID) pair.
+    Status changes are single-row UPDATEs, so two calls freezing different
+    accounts at the same time can't overwrite each other. WAL mode lets
+    other processes read while one writes. An empty database is filled from
+    the JSON files on first open.
+
+    Nothing is loaded up front: the database is opened on the first lookup,
+    and each lookup reads only the few index and table pages it needs. Pages
+    are memory-mapped (`mmap_size`), so worker processes on the same host
+    share them through the OS page cache and don't each keep a copy. Every
+    thread gets its own connection, so lookups don't queue behind each other.
+    """
+
+    def __init__(self, path=CUSTOMER_DB_PATH, customers_path=CUSTOMERS_PATH,
+                 security_questions_path=SECURITY_QUESTIONS_PATH, auto_import=True, mmap_size=CUSTOMER_DB_MMAP_SIZE):
+        self.path = path
+        self.customers_path = customers_path
+        self.security_questions_path = security_questions_path
+        self.auto_import = auto_import
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, isolation_level=None, timeout=10)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        return db
+
+    @property
+    def _db(self):
+        """This thread's connection; the first one also creates the schema and runs the initial import."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = self._connect()
+            if not self._initialized:
+                # Other threads wait here until the import has committed, so none of them reads
+                # a half-filled database; this thread's own calls below already have `db`
+                with self._init_lock:
+                    if not self._initialized:
+                        db.executescript(SCHEMA)
+                        if (self.auto_import and self.is_empty()
+                                and os.path.exists(self.customers_path)):
+                            self.import_json(self.customers_path, self.security_questions_path)
+                        self._initialized = True
+        return db
+
+    def is_empty(self):
+        return self._db.execute("SELECT 1 FROM customers LIMIT 1").fetchone() is None
+
+    def count(self):
+        return self._db.execute("SELECT COUNT(*) FROM customers").fetchone()[0]
+
+    def import_json(self, customers_path=CUSTOMERS_PATH, security_questions_path=SECURITY_QUESTIONS_PATH):
+        """Upsert every customer and security question from the JSON files, in one transaction."""
+        with open(customers_path, 'r') as f:
+            customers = json.load(f).get('customers', [])
+        security_questions = {}
+        if security_questions_path and os.path.exists(security_questions_path):
+            with open(security_questions_path, 'r') as f:
+                security_questions = json.load(f).get('security_questions', {})
+
+        return self.import_records(customers, security_questions.items())
+
+    def import_records(self, customers, security_questions=()):
+        """Upsert customer dicts and (customer_id, {"question", "answer"}) pairs in one transaction.
+
+        Both can be generators, so large imports are streamed instead of held in memory.
+        """
+        counts = {"customers": 0, "questions": 0}
+
+        def customer_rows():
+            for c in customers:
+                counts["customers"] += 1
+                yield (str(c["customer_id"]), c.get("full_name"), c.get("phone_number"), c.get("email"),
+                       c.get("account_status", "active"), clean_string(c.get("phone_number", "")),
+                       clean_string(c["customer_id"]))
+
+        def question_rows():
+            for customer_id, q in security_questions:
+                counts["questions"] += 1
+                yield str(customer_id), q["question"], q["answer"]
+
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.executemany(
+                "INSERT INTO customers (customer_id, full_name, phone_number, email, account_status, "
+                "phone_key, customer_key) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (customer_id) DO UPDATE SET full_name = excluded.full_name, "
+                "phone_number = excluded.phone_number, email = excluded.email, "
+                "account_status = excluded.account_status, phone_key = excluded.phone_key, "
+                "customer_key = excluded.customer_key, updated_at = CURRENT_TIMESTAMP",
+                customer_rows(),
+            )
+            db.executemany(
+                "INSERT OR REPLACE INTO security_questions (customer_id, question, answer) VALUES (?, ?, ?)",
+                question_rows(),
+            )
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        print(f"Imported {counts['customers']} customers and {counts['questions']} security questions into {self.path}")
+        return counts["customers"], counts["questions"]
+
+    def lookup(self, phone_number, customer_id):
+        """The customer record matching both values (after normalization), or None."""
+        row = self._db.execute(
+            f"SELECT {', '.join(CUSTOMER_COLUMNS)} FROM customers "
+            "WHERE phone_key = ? AND customer_key = ? ORDER BY rowid LIMIT 1",
+            (clean_string(phone_number), clean_string(customer_id)),
+        ).fetchone()
+        return dict(zip(CUSTOMER_COLUMNS, row)) if row is not None else None
+
+    def closest(self, phone_number, customer_id, max_distance=FUZZY_MAX_DISTANCE):
+        """Near match for a failed lookup: (record, field_that_differs) or None. See closest_match.
+
+        Only rows sharing the exact phone or the exact customer ID are compared, both through an index.
+        """
+        phone_key, customer_key = clean_string(phone_number), clean_string(customer_id)
+        columns = ', '.join(CUSTOMER_COLUMNS)
+        db = self._db
+        by_phone = db.execute(f"SELECT {columns} FROM customers WHERE phone_key = ? LIMIT 50", (phone_key,)).fetchall()
+        by_customer = db.execute(
+            f"SELECT {columns} FROM customers WHERE customer_key = ? LIMIT 50", (customer_key,)
+        ).fetchall()
+        return closest_match(phone_key, customer_key, [dict(zip(CUSTOMER_COLUMNS, row)) for row in by_phone],
+                             [dict(zip(CUSTOMER_COLUMNS, row)) for row in by_customer], max_distance)
+
+    def security_question(self, customer_id):
+        """{"question", "answer"} for the customer, or None if none is configured."""
+        row = self._db.execute(
+            "SELECT question, answer FROM security_questions WHERE customer_id = ?", (customer_id,)
+        ).fetchone()
+        return {"question": row[0], "answer": row[1]} if row is not None else None
+
+    def set_account_status(self, customer_id, status):
+        """Change one customer's account_status. Returns True if the customer exists."""
+        cursor = self._db.execute(
+            "UPDATE customers SET account_status = ?, updated_at = CURRENT_TIMESTAMP WHERE customer_id = ?",
+            (status, customer_id),
+        )
+        return cursor.rowcount == 1
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_customer_store():
+    """The process-wide customer backend chosen by CUSTOMER_BACKEND."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            if CUSTOMER_BACKEND == "json":
+                _store = customer_directory
+            elif CUSTOMER_BACKEND == "sqlite":
+                _store = CustomerStore()
+            else:
+                raise ValueError(f"Unknown CUSTOMER_BACKEND '{CUSTOMER_BACKEND}' (expected 'sqlite' or 'json')")
+        return _store
+
+
+if __name__ == "__main__":
+    # python -m tools.customer_store [customers.json] [security_questions.json]
+    CustomerStore(auto_import=False).import_json(*sys.argv[1:3])
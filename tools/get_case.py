@@ -1,11 +1,34 @@
-import os
-import requests
-from simple_salesforce import Salesforce
 from agents import function_tool
+from tools.salesforce_async import connect_salesforce
+from tools.salesforce_auth import salesforce_credentials
+from tools.case_cache import case_cache, case_query, case_from_query
+from tools.spoken_numbers import normalize_case_number
+
+def _normalize_and_check_cache(case_number: str, label: str = "") -> tuple[str, dict | None]:
+    """Print the tool banner; return the normalized case number and its cached record, if any."""
+    print("=" * 50)
+    print(f"::::[TOOL CALLED] GET CASE BY NUMBER{label}::::")
+    print(f"Case Number:: {case_number}")
+    # "one two three" / "123" -> "00000123", as Salesforce numbers cases
+    case_number = normalize_case_number(case_number)
+    print("=" * 50)
+
+    cached = case_cache.get(case_number)
+    if cached is not None:
+        print(f"GET CASE (cached):: {cached.get('Id')}")
+    return case_number, cached
+
+
+def _case_result(case_number: str, results: dict) -> dict:
+    print(f"GET CASE Results:: {results}")
+    case = case_from_query(case_number, results)
+    case_cache.put(case_number, case)
+    return case
+
 
 @function_tool(
     name_override="get_case_by_number",
-    description_override="Retrieve a Salesforce case by its case number.",
+    description_override="Retrieve a Salesforce case by its case number (spoken digits and missing leading zeros are fine).",
     strict_mode=True
 )
 def get_case(case_number: str) -> dict:
@@ -18,42 +41,39 @@ def get_case(case_number: str) -> dict:
     Returns:
         A dictionary containing case details or an error message.
     """
+    case_number, cached = _normalize_and_check_cache(case_number)
+    if cached is not None:
+        return cached
 
-    print("=" * 50)
-    print("::::[TOOL CALLED] GET CASE BY NUMBER::::")
-    print(f"Case Number:: {case_number}")
-    print("=" * 50)
+    try:
+        # One query returns the fields we need; no separate Case.get round trip.
+        # Shared, cached Salesforce session; an expired token is refreshed and the query retried
+        return _case_result(case_number, salesforce_credentials.call(lambda sf: sf.query(case_query(case_number))))
+    except Exception as e:
+        return {"error": str(e)}
 
-    def get_connection_credentials(connection_id: str, providerConfigKey: str):
-        base_url = os.getenv("NANGO_BASE_URL")
-        secret_key = os.getenv("NANGO_SECRET_KEY")
-        url = f"{base_url}/connection/{connection_id}"
-        params = {
-            "provider_config_key": providerConfigKey,
-            "refresh_token": "true",
-        }
-        headers = {"Authorization": f"Bearer {secret_key}"}
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
 
-    try:
-        instance_url = os.getenv("SALESFORCE_INSTANCE_URL")
-        salesforce_connection_id = os.getenv("SALESFORCE_CONNECTION_ID")
-        credentials = get_connection_credentials(salesforce_connection_id, "salesforce")
-        access_token = credentials["credentials"]["access_token"]
-        sf = Salesforce(instance_url=instance_url, session_id=access_token)
-        query = f"SELECT Id FROM Case WHERE CaseNumber = '{case_number}'"
-        results = sf.query(query)
-        print(f"GET CASE Results:: {results}")
-        if results["totalSize"] == 0:
-            return {"error": f"Case with CaseNumber '{case_number}' not found."}
-        elif results["totalSize"] > 1:
-            return {"error": f"Multiple cases found with CaseNumber '{case_number}'."}
-
-        case_id = results["records"][0]["Id"]
-        case_data = sf.Case.get(case_id)
-        return dict(case_data)
+async def aget_case(case_number: str) -> dict:
+    """
+    Async get_case.
+
+    Args:
+        case_number: The case number to retrieve.
+    """
+    case_number, cached = _normalize_and_check_cache(case_number, " (async)")
+    if cached is not None:
+        return cached
 
+    try:
+        sf = await connect_salesforce()
+        return _case_result(case_number, await sf.query(case_query(case_number)))
     except Exception as e:
         return {"error": str(e)}
+
+
+get_case_async = function_tool(
+    aget_case,
+    name_override="get_case_by_number",
+    description_override="Retrieve a Salesforce case by its case number (spoken digits and missing leading zeros are fine).",
+    strict_mode=True
+)
@@ -0,0 +1,99 @@
+import re
+from collections import deque
+
+_WHITESPACE = re.compile(r"\s+")
+_CLAUSE_BREAK = re.compile(r"[.,;:!?]| but | and ")
+_WORD = re.compile(r"[a-z']+")
+
+NEGATIONS = {"not", "no", "never", "dont", "don't", "didnt", "didn't", "isnt", "isn't", "wasnt", "wasn't",
+             "cant", "can't", "cannot", "wont", "won't", "nothing", "neither", "nor", "hardly", "without"}
+
+
+def normalize_text(text: str) -> str:
+    """Lower-case, straight quotes, single spaces: the form keywords and input are matched in."""
+    text = str(text).lower().replace("’", "'").replace("‘", "'")
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def negated(text: str, start: int, window: int = 3) -> bool:
+    """Whether a negation is among the `window` words before `start` in normalized text, within the same clause."""
+    clause = _CLAUSE_BREAK.split(text[:start])[-1]
+    return any(word in NEGATIONS for word in _WORD.findall(clause)[-window:])
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over a fixed set of phrases.
+
+    `add(phrase, value)` registers a phrase with any payload; after `build()`,
+    `find(text)` reports every occurrence of every phrase in one pass over the
+    text, whatever the number of phrases. Matches must start and end on a word
+    boundary, so "dispute" doesn't match inside "undisputed". With `suffixes`,
+    a phrase also matches when one of them follows it ("transaction" matches
+    "transactions" with suffixes=("s",)).
+    """
+
+    def __init__(self, suffixes=()):
+        self.suffixes = tuple(suffixes)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._built = False
+
+    def add(self, phrase: str, value=None):
+        phrase = normalize_text(phrase)
+        if not phrase:
+            return
+        node = 0
+        for char in phrase:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((phrase, value))
+        self._built = False
+
+    def build(self):
+        queue = deque(self._goto[0].values())
+        for child in queue:
+            self._fail[child] = 0
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+        self._built = True
+        return self
+
+    def find(self, text: str):
+        """[(phrase, value, start)] for every whole-word occurrence, in order of their end position."""
+        if not self._built:
+            self.build()
+        text = normalize_text(text)
+        matches = []
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for phrase, value in self._out[node]:
+                start = end - len(phrase)
+                if (start == 0 or not text[start - 1].isalnum()) and self._word_end(text, end):
+                    matches.append((phrase, value, start))
+        return matches
+
+    def _word_end(self, text, end):
+        if end == len(text) or not text[end].isalnum():
+            return True
+        for suffix in self.suffixes:
+            stop = end + len(suffix)
+            if text.startswith(suffix, end) and (stop == len(text) or not text[stop].isalnum()):
+                return True
+        return False
@@ -0,0 +1,164 @@
+import os
+import re
+import math
+from tools.classification_prompt import Classification, prompt
+from tools.keyword_matcher import KeywordMatcher, negated, normalize_text
+
+# Local results at or above this confidence skip the gpt-4o call. 0.8 takes two distinct keywords
+# for one priority level and none for another or negated; one keyword alone (0.63) isn't enough.
+# About three in four of the sample complaints in tests/test_local_classifier.py are handled locally
+# ("my payment was declined and I see a double charge"); vaguer ones go to gpt-4o.
+LOCAL_CLASSIFIER_THRESHOLD = float(os.getenv("LOCAL_CLASSIFIER_THRESHOLD", "0.8"))
+# Plurals and past tenses of the prompt's keywords ("unauthorized transactions", "card declined")
+KEYWORD_SUFFIXES = ("s", "es", "d", "ed", "ing")
+# "payment declined" is usually said "payment was declined"
+AUXILIARIES = ("was", "is", "were", "are", "got", "has been", "have been", "been")
+
+PRIORITIES = ["Urgent", "High", "Medium", "Low"]
+
+# Tag categories, most critical first (the primary tag is the most critical one matched)
+TAGS = [
+    "Fraud Alert/Report", "Dispute Related", "Compliance/Regulatory", "Transaction Issues",
+    "Technical Support", "Account Services", "Loan Related", "General Inquiry",
+]
+
+# Keyword groups in the classification prompt -> the tag their keywords indicate
+GROUP_TAGS = {
+    "Fraud Related": "Fraud Alert/Report",
+    "Security Related": "Fraud Alert/Report",
+    "System Critical": "Technical Support",
+    "Regulatory/Legal": "Compliance/Regulatory",
+    "Account Issues": "Account Services",
+    "Transaction Problems": "Transaction Issues",
+    "Dispute Related": "Dispute Related",
+    "Service Issues": "Technical Support",
+    "Account Related": "Account Services",
+    "Transaction Status": "Transaction Issues",
+    "Loan/Financial": "Loan Related",
+    "Service Requests": "Account Services",
+    "Information Needs": "General Inquiry",
+    "General Information": "General Inquiry",
+    "Documentation": "General Inquiry",
+    "Product/Service Info": "General Inquiry",
+    "Educational": "General Inquiry",
+    "Feedback": "General Inquiry",
+}
+
+_PRIORITY_HEADER = re.compile(r"^(Urgent|High|Medium|Low) Priority:\s*$")
+_GROUP_HEADER = re.compile(r"^\s*\*\s*(.+?):\s*$")
+_QUOTED = re.compile(r'"([^"]+)"')
+_TAG_LINE = re.compile(r"^- ([^:]+): (.+)$")
+
+
+def parse_prompt_keywords(text=prompt):
+    """Keywords from the classification prompt: [(keyword, priority or None, tag or None)].
+
+    Priority keywords come from the quoted "Keywords/Indicators" lists, tagged by
+    their group heading (GROUP_TAGS). The tag category descriptions add tag-only
+    keywords ("suspicious activities" -> Fraud Alert/Report).
+    """
+    keywords = []
+    priority, group = None, None
+    in_tags = False
+    for line in text.splitlines():
+        if (match := _PRIORITY_HEADER.match(line)) is not None:
+            priority, group, in_tags = match.group(1), None, False
+            continue
+        if "tag categories" in line:
+            priority, group, in_tags = None, None, True
+            continue
+        if in_tags:
+            match = _TAG_LINE.match(line.strip())
+            if match is None:
+                if line.strip():
+                    in_tags = False
+                continue
+            tag = match.group(1).strip()
+            if tag in TAGS:
+                keywords += [(phrase.strip(), None, tag) for phrase in match.group(2).split(",")]
+            continue
+        if priority is None:
+            continue
+        if (match := _GROUP_HEADER.match(line)) is not None and '"' not in line:
+            group = match.group(1).strip()
+            continue
+        for phrase in _QUOTED.findall(line):
+            keywords.append((phrase, priority, GROUP_TAGS.get(group)))
+    return keywords
+
+
+def keyword_variants(keyword):
+    """The keyword, plus "<noun> was <participle>" forms for "<noun> <participle>" keywords."""
+    words = keyword.split()
+    if len(words) == 2 and (words[1].endswith(("ed", "en")) or words[1] == "down"):
+        return [keyword] + [f"{words[0]} {aux} {words[1]}" for aux in AUXILIARIES]
+    return [keyword]
+
+
+def _build_matcher():
+    matcher = KeywordMatcher(suffixes=KEYWORD_SUFFIXES)
+    for keyword, priority, tag in parse_prompt_keywords():
+        for variant in keyword_variants(keyword):
+            # Reported under the keyword itself, so variants don't count as extra support
+            matcher.add(variant, (keyword, priority, tag))
+    return matcher.build()
+
+
+_matcher = _build_matcher()
+
+
+def classify_locally(text: str) -> Classification:
+    """Classify from the prompt's keyword lists alone, in one pass over the text.
+
+    Priority is the most severe level with a keyword hit (as the prompt says,
+    err on the side of higher priority). Confidence grows with the number of
+    distinct keywords supporting that level and shrinks with hits for other
+    levels; no hits gives confidence 0. Negated keywords ("not a fraud
+    alert") don't count, and each one halves the confidence, since the
+    keyword lists can't tell what the caller does mean.
+    """
+    normalized = normalize_text(text)
+    priority_hits = {priority: set() for priority in PRIORITIES}
+    tag_hits = {}
+    negated_hits = set()
+    for _, (phrase, priority, tag), start in _matcher.find(normalized):
+        if negated(normalized, start):
+            negated_hits.add(phrase)
+            continue
+        if priority is not None:
+            priority_hits[priority].add(phrase)
+        if tag is not None:
+            tag_hits.setdefault(tag, set()).add(phrase)
+
+    chosen = next((priority for priority in PRIORITIES if priority_hits[priority]), None)
+    if chosen is None:
+        return Classification(
+            priority="Medium",
+            tags=sorted(tag_hits, key=TAGS.index) or ["General Inquiry"],
+            justification="Local keyword match: no priority keywords found.",
+            confidence_score=0.0,
+        )
+
+    support = len(priority_hits[chosen])
+    others = sum(len(hits) for priority, hits in priority_hits.items() if priority != chosen)
+    confidence = (1 - math.exp(-support)) * support / (support + others) * 0.5 ** len(negated_hits)
+    tags = sorted(tag_hits, key=TAGS.index) or ["General Inquiry"]
+    matched = ", ".join(f"'{phrase}'" for phrase in sorted(priority_hits[chosen]))
+    justification = f"Local keyword match: {matched} indicate {chosen} priority."
+    if negated_hits:
+        justification += f" Negated: {', '.join(sorted(negated_hits))}."
+    return Classification(
+        priority=chosen,
+        tags=tags,
+        justification=justification,
+        confidence_score=round(confidence, 2),
+    )
+
+
+def confident_local_classification(text: str, threshold: float | None = None) -> dict | None:
+    """The local classification as a dict if its confidence reaches the threshold, else None."""
+    threshold = LOCAL_CLASSIFIER_THRESHOLD if threshold is None else threshold
+    result = classify_locally(text)
+    if result.confidence_score >= threshold:
+        return result.model_dump()
+    return None
@@ -0,0 +1,195 @@
+import re
+import math
+from tools.keyword_matcher import KeywordMatcher, NEGATIONS, normalize_text
+
+# Valence of words and phrases, -3 (very negative) to +3 (very positive), tuned for banking complaints
+LEXICON = {
+    # Money and security
+    "fraud": -2.5, "fraudulent": -2.5, "scam": -2.5, "scammed": -3.0, "stolen": -3.0, "stole": -3.0,
+    "unauthorized": -2.0, "suspicious": -1.5, "hacked": -2.5, "compromised": -2.5, "identity theft": -3.0,
+    "phishing": -2.0, "lost money": -2.5, "overcharged": -2.0, "double charged": -2.0, "charged twice": -2.0,
+    "wrong amount": -1.5, "hidden fees": -2.0, "fees": -0.5, "penalty": -1.0, "declined": -1.0,
+    "rejected": -1.5, "failed": -1.5, "missing": -1.5, "locked": -1.0, "frozen": -1.5, "blocked": -1.5,
+    "error": -1.0, "errors": -1.0, "not working": -1.5, "doesn't work": -1.5, "broken": -1.5, "down": -0.5,
+    "outage": -1.5, "delay": -1.0, "delayed": -1.0, "overdraft": -1.0, "dispute": -1.0,
+    # Emotions
+    "angry": -2.5, "furious": -3.0, "outraged": -3.0, "livid": -3.0, "mad": -2.0, "annoyed": -1.5,
+    "frustrated": -2.0, "frustrating": -2.0, "fed up": -2.5, "sick of": -2.5, "tired of": -2.0,
+    "disappointed": -2.0, "upset": -2.0, "unhappy": -2.0, "worried": -1.5, "concerned": -1.0,
+    "anxious": -1.5, "scared": -2.0, "confused": -1.0, "stressed": -1.5, "unacceptable": -3.0,
+    "ridiculous": -2.5, "terrible": -3.0, "horrible": -3.0, "awful": -3.0, "worst": -3.0, "bad": -1.5,
+    "poor": -1.5, "useless": -2.5, "incompetent": -2.5, "nightmare": -2.5, "disgrace": -3.0,
+    "rude": -2.0, "ignored": -2.0, "waste": -2.0, "problem": -1.0, "issue": -0.5, "urgent": -0.5,
+    "help": 0.0, "okay": 0.5, "ok": 0.5, "fine": 0.5, "good": 1.5, "great": 2.0, "excellent": 3.0,
+    "amazing": 3.0, "wonderful": 3.0, "fantastic": 3.0, "happy": 2.0, "pleased": 2.0, "glad": 1.5,
+    "satisfied": 2.0, "love": 2.5, "helpful": 2.0, "quick": 1.0, "fast": 1.0, "easy": 1.5,
+    "resolved": 1.5, "fixed": 1.5, "sorted": 1.0, "thank": 2.0, "thanks": 2.0, "thank you": 2.0,
+    "appreciate": 2.5, "appreciated": 2.5, "grateful": 2.5, "impressed": 2.5, "recommend": 2.0,
+}
+
+# Words that scale the valence of the next sentiment word
+INTENSIFIERS = {
+    "very": 1.3, "really": 1.3, "so": 1.3, "extremely": 1.6, "absolutely": 1.6, "totally": 1.5,
+    "completely": 1.5, "incredibly": 1.6, "super": 1.4, "highly": 1.4, "beyond": 1.5,
+    "slightly": 0.6, "somewhat": 0.7, "a bit": 0.7, "a little": 0.7, "kind of": 0.7,
+}
+NEGATION_SCALE = -0.74
+# Words that may stand between a negation and the word it negates ("not very happy", "not a good")
+NEGATION_GAP = {"a", "an", "the", "that", "too", "at", "all"}
+
+# Behavioral signals from the sentiment prompt
+ESCALATION = ["close my account", "closing my account", "switch banks", "switching banks", "another bank",
+              "take my business", "leave", "leaving", "lawyer", "legal action", "sue", "complaint",
+              "report you", "ombudsman", "regulator", "social media", "cancel my account"]
+REPETITION = ["again", "still", "already", "second time", "third time", "multiple times", "several times",
+              "many times", "called twice", "keep getting", "keeps happening", "for days", "for weeks",
+              "for months", "days now", "weeks now", "nobody", "no one", "no response", "waiting"]
+URGENCY = ["immediately", "right now", "asap", "as soon as possible", "today"]
+SECURITY = ["fraud", "fraudulent", "stolen", "unauthorized", "suspicious", "hacked", "compromised",
+            "identity theft", "phishing", "scam", "scammed"]
+GRATITUDE = ["thank", "thanks", "thank you", "appreciate", "appreciated", "grateful"]
+ANGER = ["angry", "furious", "outraged", "livid", "mad", "ridiculous", "disgrace"]
+
+_WORD = re.compile(r"[a-z']+")
+_CLAUSE_BREAK = re.compile(r"[.,;:!?]")
+
+
+def _build_matcher():
+    matcher = KeywordMatcher()
+    for phrase, valence in LEXICON.items():
+        matcher.add(phrase, ("lexicon", valence))
+    for kind, phrases in (("escalation", ESCALATION), ("repetition", REPETITION), ("urgency", URGENCY)):
+        for phrase in phrases:
+            matcher.add(phrase, (kind, None))
+    return matcher.build()
+
+
+_matcher = _build_matcher()
+
+
+def _modifiers(words_before):
+    """Intensity and negation from the words right before a sentiment word, in the same clause.
+
+    A negation only counts directly before the word or with just intensifiers
+    and articles between ("not happy", "not very happy"), so "can't believe
+    how terrible" stays negative.
+    """
+    scale = 1.0
+    if words_before:
+        scale *= INTENSIFIERS.get(words_before[-1], 1.0)
+        if len(words_before) > 1:
+            scale *= INTENSIFIERS.get(" ".join(words_before[-2:]), 1.0)
+    i = len(words_before) - 1
+    while i >= 0 and (words_before[i] in INTENSIFIERS or words_before[i] in NEGATION_GAP):
+        i -= 1
+    if i >= 0 and words_before[i] in NEGATIONS:
+        scale *= NEGATION_SCALE
+    return scale
+
+
+def score_sentiment(text: str) -> dict:
+    """SentimentAnalysis fields from a lexicon, the way the sentiment prompt describes the analysis.
+
+    Each lexicon hit contributes its valence, scaled by a preceding intensifier
+    ("very", "extremely"), flipped and damped by a negation right before it
+    ("not happy", "not very happy"), and boosted when written in CAPS. Exclamation marks
+    amplify the total. The sum is squashed into [-1, 1]. Escalation threats,
+    repeated attempts and security words drive the tone and emotional indicators.
+    """
+    normalized = normalize_text(text)
+    caps_words = {word.lower() for word in re.findall(r"\b[A-Z]{2,}\b", str(text))}
+
+    total, positive, negative = 0.0, 0.0, 0.0
+    hits, signals = [], {"escalation": [], "repetition": [], "urgency": []}
+    covered_until = -1
+    # Longest match first at each position, so "thank you" isn't also counted as "thank"
+    for phrase, (kind, valence), start in sorted(_matcher.find(normalized), key=lambda m: (m[2], -len(m[0]))):
+        if kind != "lexicon":
+            signals[kind].append(phrase)
+            continue
+        if valence == 0 or start < covered_until:
+            continue
+        covered_until = start + len(phrase)
+        clause = _CLAUSE_BREAK.split(normalized[max(0, start - 60):start])[-1]
+        value = valence * _modifiers(_WORD.findall(clause)[-4:])
+        if phrase in caps_words:
+            value *= 1.3
+        hits.append(phrase)
+        total += value
+        if value > 0:
+            positive += value
+        else:
+            negative += value
+
+    exclamations = min(str(text).count("!"), 4)
+    if total:
+        total += math.copysign(0.3 * exclamations, total)
+    score = round(total / math.sqrt(total * total + 15), 2)
+
+    security = [hit for hit in hits if hit in SECURITY]
+    gratitude = [hit for hit in hits if hit in GRATITUDE]
+    anger = [hit for hit in hits if hit in ANGER]
+    escalation, repetition = signals["escalation"], signals["repetition"]
+    shouting = bool(caps_words & set(LEXICON)) or exclamations >= 2
+
+    mixed = positive >= 1.5 and negative <= -1.5 and min(positive, -negative) / max(positive, -negative) > 0.5
+    if mixed and not escalation:
+        tone = "Mixed"
+    elif score <= -0.6 and (escalation or anger or shouting):
+        tone = "Angry"
+    elif score < -0.3 and repetition:
+        tone = "Frustrated"
+    elif score < -0.1 and security:
+        tone = "Concerned"
+    elif score < -0.3:
+        tone = "Frustrated"
+    elif score < -0.1:
+        tone = "Concerned"
+    elif score >= 0.3 and gratitude:
+        tone = "Appreciative"
+    elif score >= 0.3:
+        tone = "Satisfied"
+    else:
+        tone = "Neutral"
+
+    frustration_points = (-score * 3 if score < 0 else 0) + len(repetition) + 2 * bool(escalation) + shouting
+    if frustration_points >= 3.5:
+        frustration = "High"
+    elif frustration_points >= 2:
+        frustration = "Medium"
+    elif frustration_points > 0.5:
+        frustration = "Low"
+    else:
+        frustration = "None"
+
+    if escalation:
+        satisfaction = "Very Low"
+    elif mixed:
+        satisfaction = "Mixed"
+    elif score <= -0.3:
+        satisfaction = "Low"
+    elif score >= 0.7:
+        satisfaction = "Very High"
+    elif score >= 0.3:
+        satisfaction = "High"
+    else:
+        satisfaction = "Neutral"
+
+    notes = [f"Local lexicon analysis; matched: {', '.join(hits) or 'nothing'}."]
+    if repetition:
+        notes.append(f"Repeated attempts or waiting ({', '.join(repetition)}).")
+    if escalation:
+        notes.append(f"Escalation risk ({', '.join(escalation)}).")
+    if security:
+        notes.append("Security or fraud concern.")
+    if signals["urgency"]:
+        notes.append("Demands immediate action.")
+    if shouting:
+        notes.append("Emphatic writing (caps or exclamation marks).")
+
+    return {
+        "sentiment_score": score,
+        "primary_tone": tone,
+        "emotional_indicators": {"frustration_level": frustration, "satisfaction": satisfaction},
+        "context_notes": " ".join(notes),
+    }
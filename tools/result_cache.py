@@ -0,0 +1,231 @@
+import os
+import copy
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+import numpy as np
+from tools.keyword_matcher import normalize_text
+
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "512"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "3600"))
+# Share of the 64 SimHash bits that must agree: 1.0 = only identical (normalized) text; 0.9 = up to
+# 6 bits may differ, about a reworded phrase in a two-sentence complaint
+RESULT_CACHE_SIMILARITY = float(os.getenv("RESULT_CACHE_SIMILARITY", "0.9"))
+# SQLite file to keep cached results across restarts; unset = memory only
+RESULT_CACHE_PATH = os.getenv("RESULT_CACHE_PATH")
+
+SIMHASH_BITS = 64
+# Stands in for another caller's free text on a near hit
+NEAR_HIT_NOTE = "Reused from a near-identical earlier request; no details were carried over."
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS result_cache (
+    cache TEXT NOT NULL,
+    key TEXT NOT NULL,
+    simhash TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (cache, key)
+);
+"""
+
+
+SHINGLE_SIZE = 3
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over character 3-grams; texts that differ in a few words differ in few bits."""
+    normalized = normalize_text(text)
+    shingles = [normalized[i:i + SHINGLE_SIZE] for i in range(max(1, len(normalized) - SHINGLE_SIZE + 1))]
+    digests = b"".join(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest() for shingle in shingles)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1)
+    # A bit is set when most shingles' hashes have it set
+    majority = bits.sum(axis=0) * 2 > len(shingles)
+    return int.from_bytes(np.packbits(majority).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class NearDuplicateCache:
+    """Bounded LRU + TTL cache of tool results, keyed by text, that also answers for near-duplicate text.
+
+    An exact hit is a lookup on the normalized text's hash. Otherwise the
+    text's SimHash is compared with cached entries that share at least one of
+    its bands. The hash is split into (max distance + 1) bands, so every entry
+    within the distance shares a band with it. The closest entry within the
+    distance is returned. Only successful results (no "error" key) should be
+    put in.
+
+    A near hit is another caller's result, so the `free_text` fields (dotted
+    paths into a dict value, e.g. "sentiment.context_notes") are replaced
+    with NEAR_HIT_NOTE. Only the labels are reused. A cache without
+    `free_text` fields, or whose values aren't dicts, only serves exact hits.
+    Every hit returns a copy, so callers can't change the cached value.
+
+    With `path`, entries are also written to SQLite and the unexpired ones
+    are loaded again on start.
+    """
+
+    def __init__(self, name, maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL, similarity=RESULT_CACHE_SIMILARITY,
+                 path=RESULT_CACHE_PATH, free_text=()):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.free_text = tuple(free_text)
+        if not self.free_text:
+            similarity = 1.0
+        self.max_distance = max(0, int((1.0 - similarity) * SIMHASH_BITS + 1e-9))
+        self.bands = self.max_distance + 1
+        self.band_bits = -(-SIMHASH_BITS // self.bands)
+
+        self._entries = OrderedDict()  # key -> (simhash, value, expires_at)
+        self._band_index = [dict() for _ in range(self.bands)]  # band value -> set of keys
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+            self._load()
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+    def _bands_of(self, fingerprint):
+        mask = (1 << self.band_bits) - 1
+        return [(fingerprint >> (i * self.band_bits)) & mask for i in range(self.bands)]
+
+    def _insert(self, key, fingerprint, value, expires_at):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (fingerprint, value, expires_at)
+        for i, band in enumerate(self._bands_of(fingerprint)):
+            self._band_index[i].setdefault(band, set()).add(key)
+        evicted = []
+        while len(self._entries) > self.maxsize:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            evicted.append(oldest)
+        return evicted
+
+    def _remove(self, key):
+        fingerprint, _, _ = self._entries.pop(key)
+        for i, band in enumerate(self._bands_of(fingerprint)):
+            keys = self._band_index[i].get(band)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._band_index[i][band]
+
+    def get(self, text: str):
+        """Cached value for `text` or a near-duplicate of it, or None."""
+        key = self.key(text)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+
+            fingerprint = simhash(text)
+            best, best_distance = None, None
+            if self.max_distance:
+                candidates = set()
+                for i, band in enumerate(self._bands_of(fingerprint)):
+                    candidates |= self._band_index[i].get(band, set())
+                for candidate in candidates:
+                    candidate_fingerprint, value, expires_at = self._entries[candidate]
+                    if expires_at <= now or not isinstance(value, dict):
+                        continue
+                    distance = hamming(fingerprint, candidate_fingerprint)
+                    if distance <= self.max_distance and (best_distance is None or distance < best_distance):
+                        best, best_distance = candidate, distance
+            if best is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best)
+            self.near_hits += 1
+            return self._labels_only(self._entries[best][1])
+
+    def _labels_only(self, value):
+        value = copy.deepcopy(value)
+        for path in self.free_text:
+            *parents, field = path.split(".")
+            target = value
+            for part in parents:
+                target = target.get(part) if isinstance(target, dict) else None
+            if isinstance(target, dict) and field in target:
+                target[field] = NEAR_HIT_NOTE
+        return value
+
+    def put(self, text: str, value):
+        if value is None or (isinstance(value, dict) and "error" in value):
+            return
+        key = self.key(text)
+        fingerprint = simhash(text)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            evicted = self._insert(key, fingerprint, value, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO result_cache (cache, key, simhash, value, expires_at) VALUES (?, ?, ?, ?, ?)",
+                    (self.name, key, str(fingerprint), json.dumps(value), expires_at),
+                )
+                if evicted:
+                    self._db.executemany("DELETE FROM result_cache WHERE cache = ? AND key = ?",
+                                         [(self.name, old) for old in evicted])
+
+    def _load(self):
+        now = time.time()
+        self._db.execute("DELETE FROM result_cache WHERE expires_at <= ?", (now,))
+        rows = self._db.execute(
+            "SELECT key, simhash, value, expires_at FROM result_cache WHERE cache = ? ORDER BY expires_at DESC LIMIT ?",
+            (self.name, self.maxsize),
+        ).fetchall()
+        # Oldest first, so LRU order matches expiry order
+        for key, fingerprint, value, expires_at in reversed(rows):
+            self._insert(key, int(fingerprint), json.loads(value), expires_at)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._band_index = [dict() for _ in range(self.bands)]
+            if self._db is not None:
+                self._db.execute("DELETE FROM result_cache WHERE cache = ?", (self.name,))
+
+    def stats(self):
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.near_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_result_cache(name, **options) -> NearDuplicateCache:
+    """The process-wide cache for one tool (created with `options` on first use)."""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = NearDuplicateCache(name, **options)
+        return _caches[name]
+
+
+def result_cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in _caches.items()}
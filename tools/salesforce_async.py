@@ -0,0 +1,80 @@
+import os
+from simple_salesforce.util import exception_handler
+from tools.async_http import get_http_client
+from tools.salesforce_auth import salesforce_credentials
+
+SALESFORCE_API_VERSION = os.getenv("SALESFORCE_API_VERSION", "59.0")
+
+
+class AsyncSalesforce:
+    """Minimal async Salesforce REST client covering what the case tools use.
+
+    The access token comes from the shared SalesforceCredentials cache; a 401
+    refreshes it and retries the request once. Errors are raised as the same
+    simple_salesforce exceptions the sync tools see (SalesforceExpiredSession
+    on 401, SalesforceResourceNotFound on 404, ...).
+    """
+
+    def __init__(self, instance_url=None, credentials=salesforce_credentials, version=SALESFORCE_API_VERSION):
+        self.instance_url = instance_url
+        self.credentials = credentials
+        self.version = version
+
+    @property
+    def base_url(self):
+        instance_url = (self.instance_url or os.getenv("SALESFORCE_INSTANCE_URL")).rstrip("/")
+        # simple_salesforce accepts a bare hostname; so do we
+        if "://" not in instance_url:
+            instance_url = f"https://{instance_url}"
+        return f"{instance_url}/services/data/v{self.version}/"
+
+    async def request(self, method, path, name="", **kwargs):
+        url = self.base_url + path
+        token = await self.credentials.aget_token()
+        for attempt in range(2):
+            headers = {
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json",
+            }
+            response = await get_http_client().request(method, url, headers=headers, **kwargs)
+            if response.status_code == 401 and attempt == 0:
+                print("Salesforce session expired, refreshing token")
+                token = await self.credentials.arefresh(force=True)
+                continue
+            if response.status_code >= 300:
+                exception_handler(response, name)
+            return response
+
+    async def restful(self, path, method="GET", **kwargs):
+        """Direct REST call relative to the versioned base URL (e.g. "composite"); returns the JSON body."""
+        response = await self.request(method, path, name=path, **kwargs)
+        if response.status_code == 204:
+            return None
+        return response.json()
+
+    async def query(self, soql):
+        response = await self.request("GET", "query/", params={"q": soql}, name="query")
+        return response.json()
+
+    async def get(self, sobject, record_id):
+        response = await self.request("GET", f"sobjects/{sobject}/{record_id}", name=sobject)
+        return response.json()
+
+    async def create(self, sobject, data):
+        response = await self.request("POST", f"sobjects/{sobject}/", json=data, name=sobject)
+        return response.json()
+
+    async def update(self, sobject, record_id, data):
+        """Returns the HTTP status code (204 on success), like simple_salesforce."""
+        response = await self.request("PATCH", f"sobjects/{sobject}/{record_id}", json=data, name=sobject)
+        return response.status_code
+
+
+# One client for every async case tool; it only holds configuration, the
+# connection pool and token live in async_http / salesforce_auth
+_shared_client = AsyncSalesforce()
+
+
+async def connect_salesforce():
+    """Return the shared AsyncSalesforce client (the token is fetched and cached on first request)."""
+    return _shared_client
@@ -0,0 +1,211 @@
+import os
+import time
+import asyncio
+import threading
+from datetime import datetime
+import requests
+from simple_salesforce import Salesforce
+from simple_salesforce.exceptions import SalesforceExpiredSession
+from tools.async_http import get_http_client
+
+# Tokens without an expires_at from Nango are reused for this long (a 401 still forces a refresh)
+DEFAULT_TOKEN_TTL = float(os.getenv("SALESFORCE_TOKEN_TTL", "1800"))
+
+# Refresh in the background once a token is this close to expiring
+REFRESH_MARGIN = float(os.getenv("SALESFORCE_REFRESH_MARGIN", "300"))
+
+# Nango may hand back the same token while it's still valid; wait this long before asking again
+MIN_REFRESH_INTERVAL = float(os.getenv("SALESFORCE_MIN_REFRESH_INTERVAL", "30"))
+
+
+def _connection_request(connection_id, provider_config_key, force_refresh):
+    base_url = os.getenv("NANGO_BASE_URL")
+    secret_key = os.getenv("NANGO_SECRET_KEY")
+    url = f"{base_url}/connection/{connection_id}"
+    params = {"provider_config_key": provider_config_key}
+    # Nango hands back a valid token on its own; only force a refresh when Salesforce rejected ours
+    if force_refresh:
+        params["refresh_token"] = "true"
+    headers = {"Authorization": f"Bearer {secret_key}"}
+    return url, params, headers
+
+
+def get_connection_credentials(connection_id: str, providerConfigKey: str, force_refresh: bool = False):
+    """Fetch a connection's credentials from Nango."""
+    url, params, headers = _connection_request(connection_id, providerConfigKey, force_refresh)
+    response = requests.get(url, headers=headers, params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+async def aget_connection_credentials(connection_id: str, providerConfigKey: str, force_refresh: bool = False):
+    """Fetch a connection's credentials from Nango (async)."""
+    url, params, headers = _connection_request(connection_id, providerConfigKey, force_refresh)
+    response = await get_http_client().get(url, headers=headers, params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+def _token_expiry(credentials):
+    """Epoch seconds when the token in a Nango response expires."""
+    expires_at = credentials["credentials"].get("expires_at")
+    if expires_at:
+        try:
+            return datetime.fromisoformat(expires_at).timestamp()
+        except ValueError:
+            pass
+    return time.time() + DEFAULT_TOKEN_TTL
+
+
+class SalesforceCredentials:
+    """Caches the Salesforce access token from Nango and shares one session between the case tools.
+
+    The token is kept until it expires. Once it is within `refresh_margin`
+    of expiring, callers get the current token while a refresh runs in the
+    background. A 401 from Salesforce forces an immediate refresh and the
+    request is retried once. Concurrent callers wait for a single refresh
+    (per thread pool for the sync API, per event loop for the async one).
+    Background refreshes are at least `min_refresh_interval` apart, so a
+    refresh that returns the same expiry isn't repeated on every call.
+    """
+
+    def __init__(self, connection_id=None, provider_config_key="salesforce", instance_url=None,
+                 refresh_margin=REFRESH_MARGIN, session=None, min_refresh_interval=MIN_REFRESH_INTERVAL):
+        self.connection_id = connection_id
+        self.provider_config_key = provider_config_key
+        self.instance_url = instance_url
+        self.refresh_margin = refresh_margin
+        self.min_refresh_interval = min_refresh_interval
+        # requests.Session shared by every simple_salesforce client built here
+        self.session = session
+
+        self.access_token = None
+        self.expires_at = 0.0
+        self.refreshes = 0
+        self._next_refresh_at = 0.0
+        self._lock = threading.Lock()
+        self._async_locks = {}
+        self._background = None
+        self._background_task = None
+        self._sf = None
+
+    def _connection_id(self):
+        return self.connection_id or os.getenv("SALESFORCE_CONNECTION_ID")
+
+    def _instance_url(self):
+        return self.instance_url or os.getenv("SALESFORCE_INSTANCE_URL")
+
+    def _store(self, credentials):
+        self.access_token = credentials["credentials"]["access_token"]
+        self.expires_at = _token_expiry(credentials)
+        self.refreshes += 1
+        self._next_refresh_at = time.time() + self.min_refresh_interval
+
+    def _fresh(self):
+        return self.access_token is not None and time.time() < self.expires_at
+
+    def _due_for_refresh(self):
+        now = time.time()
+        return now >= self.expires_at - self.refresh_margin and now >= self._next_refresh_at
+
+    def invalidate(self):
+        """Forget the cached token and client (e.g. after pointing the environment at another org)."""
+        self.access_token = None
+        self.expires_at = 0.0
+        self._next_refresh_at = 0.0
+        self._sf = None
+
+    # ------------------------------------------------------------------
+    # Sync
+    # ------------------------------------------------------------------
+
+    def refresh(self, force=False):
+        """Fetch a new token (unless another caller just did). Returns the token."""
+        stale_token = self.access_token
+        with self._lock:
+            # Someone else refreshed while we waited for the lock
+            if self.access_token != stale_token and self._fresh():
+                return self.access_token
+            if not force and self._fresh() and not self._due_for_refresh():
+                return self.access_token
+            self._store(get_connection_credentials(self._connection_id(), self.provider_config_key, force))
+            return self.access_token
+
+    def _refresh_in_background(self):
+        if self._background is not None and self._background.is_alive():
+            return
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Background Salesforce token refresh failed: {e}")
+
+        self._background = threading.Thread(target=run, name="salesforce-token-refresh", daemon=True)
+        self._background.start()
+
+    def get_token(self):
+        if not self._fresh():
+            return self.refresh()
+        if self._due_for_refresh():
+            self._refresh_in_background()
+        return self.access_token
+
+    def get_salesforce(self) -> Salesforce:
+        """Shared simple_salesforce client (one pooled requests session), rebuilt when the token changes."""
+        token = self.get_token()
+        sf = self._sf
+        if sf is None or sf.session_id != token:
+            if self.session is None:
+                self.session = requests.Session()
+            session = self.session
+            sf = Salesforce(instance_url=self._instance_url(), session_id=token, session=session)
+            self._sf = sf
+        return sf
+
+    def call(self, func):
+        """Run func(sf) with the shared client, refreshing the token and retrying once on a 401."""
+        try:
+            return func(self.get_salesforce())
+        except SalesforceExpiredSession:
+            print("Salesforce session expired, refreshing token")
+            self.refresh(force=True)
+            return func(self.get_salesforce())
+
+    # ------------------------------------------------------------------
+    # Async
+    # ------------------------------------------------------------------
+
+    def _async_lock(self):
+        loop = asyncio.get_running_loop()
+        lock = self._async_locks.get(loop)
+        if lock is None:
+            lock = self._async_locks[loop] = asyncio.Lock()
+        return lock
+
+    async def arefresh(self, force=False):
+        stale_token = self.access_token
+        async with self._async_lock():
+            if self.access_token != stale_token and self._fresh():
+                return self.access_token
+            if not force and self._fresh() and not self._due_for_refresh():
+                return self.access_token
+            self._store(await aget_connection_credentials(self._connection_id(), self.provider_config_key, force))
+            return self.access_token
+
+    async def _arefresh_in_background(self):
+        try:
+            await self.arefresh()
+        except Exception as e:
+            print(f"Background Salesforce token refresh failed: {e}")
+
+    async def aget_token(self):
+        if not self._fresh():
+            return await self.arefresh()
+        if self._due_for_refresh() and (self._background_task is None or self._background_task.done()):
+            self._background_task = asyncio.create_task(self._arefresh_in_background())
+        return self.access_token
+
+
+# Shared by every case tool in the process
+salesforce_credentials = SalesforceCredentials()
@@ -0,0 +1,136 @@
+from tools.case_cache import CASE_FIELDS, CASE_FIELD_NAMES
+
+# sObject Collections accept at most 200 records per request
+MAX_COLLECTION_SIZE = 200
+
+
+class CompositeError(Exception):
+    """A composite subrequest failed; `errors` holds Salesforce's error list."""
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors or []
+
+
+def _strip(record):
+    record = dict(record)
+    record.pop("attributes", None)
+    return record
+
+
+def _subrequest_errors(subresponse):
+    body = subresponse.get("body")
+    if isinstance(body, list):
+        return body
+    return [body] if body else []
+
+
+def create_case_request(case_data: dict, version: str) -> dict:
+    """Composite request that creates a case and reads it back in the same round trip."""
+    base = f"/services/data/v{version}"
+    return {
+        "allOrNone": True,
+        "compositeRequest": [
+            {
+                "method": "POST",
+                "url": f"{base}/sobjects/Case",
+                "referenceId": "newCase",
+                "body": case_data,
+            },
+            {
+                "method": "GET",
+                "url": f"{base}/sobjects/Case/@{{newCase.id}}?fields={','.join(CASE_FIELD_NAMES)}",
+                "referenceId": "createdCase",
+            },
+        ],
+    }
+
+
+def parse_create_case_response(response: dict) -> dict:
+    """The created case's fields from a create_case_request response."""
+    results = {sub["referenceId"]: sub for sub in response["compositeResponse"]}
+    # With allOrNone a failed create also fails the read; report the create's own error first
+    for reference in ("newCase", "createdCase"):
+        subresponse = results.get(reference)
+        if subresponse is not None and subresponse["httpStatusCode"] >= 300:
+            errors = _subrequest_errors(subresponse)
+            message = "; ".join(error.get("message", str(error)) for error in errors) or "Case creation failed"
+            raise CompositeError(message, errors)
+    return _strip(results["createdCase"]["body"])
+
+
+def create_cases_request(cases: list[dict], version: str, all_or_none: bool = False) -> dict:
+    """Composite request that creates up to 200 cases with one sObject Collection call and queries them back.
+
+    The query references every created id, so it only succeeds if every
+    record was created; see parse_create_cases_response for the fallback.
+    """
+    if len(cases) > MAX_COLLECTION_SIZE:
+        raise ValueError(f"At most {MAX_COLLECTION_SIZE} cases per request, got {len(cases)}")
+    base = f"/services/data/v{version}"
+    ids = ",".join(f"'@{{created[{i}].id}}'" for i in range(len(cases)))
+    query = f"SELECT {CASE_FIELDS} FROM Case WHERE Id IN ({ids})".replace(" ", "+")
+    return {
+        "allOrNone": False,
+        "compositeRequest": [
+            {
+                "method": "POST",
+                "url": f"{base}/composite/sobjects",
+                "referenceId": "created",
+                "body": {
+                    "allOrNone": all_or_none,
+                    "records": [{"attributes": {"type": "Case"}, **case} for case in cases],
+                },
+            },
+            {
+                "method": "GET",
+                "url": f"{base}/query/?q={query}",
+                "referenceId": "createdCases",
+            },
+        ],
+    }
+
+
+def parse_create_cases_response(response: dict):
+    """Per-input results of a create_cases_request response, in input order.
+
+    Returns (results, missing_ids). Each result is the created case's fields,
+    an {"id": ...} placeholder when the read-back query failed (some record
+    in the batch wasn't created), or {"error": ...}. `missing_ids` lists the
+    created ids that still need to be read back.
+    """
+    results = {sub["referenceId"]: sub for sub in response["compositeResponse"]}
+    created = results["created"]
+    if created["httpStatusCode"] >= 300:
+        errors = _subrequest_errors(created)
+        message = "; ".join(error.get("message", str(error)) for error in errors) or "Case creation failed"
+        raise CompositeError(message, errors)
+
+    queried = results.get("createdCases")
+    records = {}
+    if queried is not None and queried["httpStatusCode"] < 300:
+        records = {record["Id"]: _strip(record) for record in queried["body"]["records"]}
+
+    output, missing_ids = [], []
+    for item in created["body"]:
+        if not item.get("success"):
+            errors = item.get("errors", [])
+            output.append({"error": "; ".join(error.get("message", str(error)) for error in errors)})
+            continue
+        record = records.get(item["id"])
+        if record is None:
+            missing_ids.append(item["id"])
+            record = {"id": item["id"]}
+        output.append(record)
+    return output, missing_ids
+
+
+def cases_by_id_query(ids: list[str]) -> str:
+    id_list = ",".join(f"'{record_id}'" for record_id in ids)
+    return f"SELECT {CASE_FIELDS} FROM Case WHERE Id IN ({id_list})"
+
+
+def fill_missing(results: list[dict], query_result: dict) -> list[dict]:
+    """Replace {"id": ...} placeholders with records from a cases_by_id_query result."""
+    records = {record["Id"]: _strip(record) for record in query_result["records"]}
+    return [records.get(result["id"], result) if set(result) == {"id"} else result for result in results]
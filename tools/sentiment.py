@@ -1,12 +1,25 @@
 import os
 import openai
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from pydantic import BaseModel
 from agents import function_tool
+from tools.local_sentiment import score_sentiment
+from tools.result_cache import get_result_cache
 
 
 # Initialize OpenAI client
 client = OpenAI()
+async_client = AsyncOpenAI()
+
+# "llm": gpt-4o only (default). "local": lexicon scorer only.
+# "local_first": the lexicon scorer when its result is clear-cut, gpt-4o otherwise.
+SENTIMENT_MODE = os.getenv("SENTIMENT_MODE", "llm").lower()
+if SENTIMENT_MODE not in ("llm", "local", "local_first"):
+    raise ValueError(f"Unknown SENTIMENT_MODE '{SENTIMENT_MODE}' (expected 'llm', 'local' or 'local_first')")
+# In local_first mode, local results at least this far from neutral (and not Mixed) skip gpt-4o
+LOCAL_SENTIMENT_MIN_SCORE = float(os.getenv("LOCAL_SENTIMENT_MIN_SCORE", "0.4"))
+# gpt-4o results for the same text, or the labels for nearly the same text
+sentiment_cache = get_result_cache("sentiment", free_text=("context_notes",))
 
 # Prompt for the system
 system_prompt = """
@@ -140,6 +153,97 @@ class SentimentAnalysis(BaseModel):
     emotional_indicators: EmotionalIndicators
     context_notes: str
 
+
+def local_sentiment(email_text: str) -> dict:
+    result = SentimentAnalysis.model_validate(score_sentiment(email_text))
+    print(f"Local sentiment result: {result}")
+    return result.model_dump()
+
+
+def local_sentiment_for_mode(email_text: str) -> dict | None:
+    """The lexicon result if SENTIMENT_MODE lets it stand for this text, else None (ask gpt-4o)."""
+    if SENTIMENT_MODE == "llm":
+        return None
+    result = local_sentiment(email_text)
+    if SENTIMENT_MODE == "local":
+        return result
+    if abs(result["sentiment_score"]) >= LOCAL_SENTIMENT_MIN_SCORE and result["primary_tone"] != "Mixed":
+        return result
+    print("Local sentiment not clear-cut; asking gpt-4o")
+    return None
+
+
+def _sentiment_request(email_text: str) -> dict:
+    """Chat completion arguments for analyzing one email."""
+    return dict(
+        model="gpt-4o",
+        temperature=0.8,
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": email_text}
+        ]
+    )
+
+
+def _cached_sentiment(email_text: str) -> dict | None:
+    cached = sentiment_cache.get(email_text)
+    if cached is not None:
+        print(f"Cached sentiment: {cached}")
+    return cached
+
+
+def _sentiment_result(email_text: str, response) -> dict:
+    """Validate the model's JSON answer and cache it."""
+    content = response.choices[0].message.content # Correct way to get content
+    print("Model Response:", content)
+
+    # Parse JSON result from model response
+    result = SentimentAnalysis.model_validate_json(content)
+    print(f"Analyzed Result from sentiment tool: {result}")
+    sentiment_cache.put(email_text, result.model_dump())
+    return result.model_dump()
+
+
+def _sentiment_error(e: Exception) -> dict:
+    print(f"Error during sentiment analysis: {type(e).__name__} - {e}") # Print exception type and message
+    import traceback
+    traceback.print_exc() # Print full traceback
+    return {"error": str(e)}
+
+
+def llm_sentiment(email_text: str) -> dict:
+    cached = _cached_sentiment(email_text)
+    if cached is not None:
+        return cached
+
+    try:
+        response = client.chat.completions.create(**_sentiment_request(email_text))
+        return _sentiment_result(email_text, response)
+    except Exception as e:
+        return _sentiment_error(e)
+
+
+async def allm_sentiment(email_text: str) -> dict:
+    cached = _cached_sentiment(email_text)
+    if cached is not None:
+        return cached
+
+    try:
+        response = await async_client.chat.completions.create(**_sentiment_request(email_text))
+        return _sentiment_result(email_text, response)
+    except Exception as e:
+        return _sentiment_error(e)
+
+
+def _quick_sentiment(email_text: str, label: str = "") -> dict | None:
+    """Print the tool banner; return the local result if SENTIMENT_MODE lets it stand, else None."""
+    print("=" * 50)
+    print(f"::::[TOOL CALLED] ANALYZE EMAIL SENTIMENT ({label}{SENTIMENT_MODE})::::")
+    print(f"Email Text:: {email_text}")
+    print("=" * 50)
+    return local_sentiment_for_mode(email_text)
+
+
 @function_tool(
     name_override="analyze_sentiment_email",
     description_override="Analyze the sentiment of a customer banking email and return emotional indicators.",
@@ -156,31 +260,28 @@ def analyze_sentiment_email(email_text: str) -> dict:
         Dictionary with sentiment analysis including score, tone, and emotional indicators.
     """
     print(f"OpenAI API Key Loaded: {bool(client.api_key)}") # Check if API key is perceived by the client
-    print("=" * 50)
-    print("::::[TOOL CALLED] ANALYZE EMAIL SENTIMENT::::")
-    print(f"Email Text:: {email_text}")
-    print("=" * 50)
+    local = _quick_sentiment(email_text)
+    if local is not None:
+        return local
+    return llm_sentiment(email_text)
 
-    try:
-        response = client.chat.completions.create( 
-            model="gpt-4o",
-            temperature=0.8,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": email_text}
-            ]
-        )
-
-        content = response.choices[0].message.content # Correct way to get content
-        print("Model Response:", content)
-
-        # Parse JSON result from model response
-        result = SentimentAnalysis.model_validate_json(content)
-        print(f"Analyzed Result from sentiment tool: {result}") 
-        return result.model_dump()
 
-    except Exception as e:
-        print(f"Error during sentiment analysis: {type(e).__name__} - {e}") # Print exception type and message
-        import traceback
-        traceback.print_exc() # Print full traceback
-        return {"error": str(e)}
+async def aanalyze_sentiment_email(email_text: str) -> dict:
+    """
+    Async analyze_sentiment_email.
+
+    Args:
+        email_text: The raw text of the customer email.
+    """
+    local = _quick_sentiment(email_text, "async, ")
+    if local is not None:
+        return local
+    return await allm_sentiment(email_text)
+
+
+analyze_sentiment_email_async = function_tool(
+    aanalyze_sentiment_email,
+    name_override="analyze_sentiment_email",
+    description_override="Analyze the sentiment of a customer banking email and return emotional indicators.",
+    strict_mode=True
+)
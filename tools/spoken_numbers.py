@@ -0,0 +1,187 @@
+import os
+import re
+
+# Salesforce case numbers are auto-numbered with leading zeros
+CASE_NUMBER_DIGITS = int(os.getenv("CASE_NUMBER_DIGITS", "8"))
+
+DIGITS = {
+    "zero": "0", "oh": "0", "nought": "0", "nil": "0",
+    "one": "1", "two": "2", "three": "3", "four": "4", "five": "5",
+    "six": "6", "seven": "7", "eight": "8", "nine": "9", "niner": "9",
+}
+TEENS = {
+    "ten": "10", "eleven": "11", "twelve": "12", "thirteen": "13", "fourteen": "14",
+    "fifteen": "15", "sixteen": "16", "seventeen": "17", "eighteen": "18", "nineteen": "19",
+}
+TENS = {
+    "twenty": "2", "thirty": "3", "forty": "4", "fifty": "5",
+    "sixty": "6", "seventy": "7", "eighty": "8", "ninety": "9",
+}
+REPEATS = {"double": 2, "triple": 3}
+NATO = {
+    "alpha": "a", "alfa": "a", "bravo": "b", "charlie": "c", "delta": "d", "echo": "e", "foxtrot": "f",
+    "golf": "g", "hotel": "h", "india": "i", "juliet": "j", "juliett": "j", "kilo": "k", "lima": "l",
+    "mike": "m", "november": "n", "oscar": "o", "papa": "p", "quebec": "q", "romeo": "r", "sierra": "s",
+    "tango": "t", "uniform": "u", "victor": "v", "whiskey": "w", "whisky": "w", "xray": "x", "yankee": "y",
+    "zulu": "z",
+}
+# Words people put around an identifier that aren't part of it
+FILLER = {
+    "uh", "um", "er", "erm", "and", "is", "it", "its", "my", "the", "number", "id", "case", "customer",
+    "phone", "dash", "hyphen", "space", "dot", "point", "then", "as", "in",
+}
+# How transcribers often spell a spoken digit; only a digit when next to other digit words
+HOMOPHONES = {"for": "4", "to": "2", "too": "2"}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(text):
+    # "x-ray" and "it's" are single words when spoken
+    text = str(text).lower().replace("x-ray", "xray").replace("'", "")
+    return _TOKEN.findall(text)
+
+
+def _is_digit_word(token):
+    return token.isdigit() or token in DIGITS or token in TEENS or token in TENS or token in REPEATS
+
+
+def _next_to_digit(tokens, index):
+    return ((index > 0 and _is_digit_word(tokens[index - 1]))
+            or (index + 1 < len(tokens) and _is_digit_word(tokens[index + 1])))
+
+
+def _small_number(token):
+    """Value of a word that can be part of a spoken cardinal below 100, or None."""
+    if token in DIGITS:
+        return int(DIGITS[token])
+    if token in TEENS:
+        return int(TEENS[token])
+    if token in TENS:
+        return int(TENS[token]) * 10
+    if token.isdigit() and len(token) <= 2:
+        return int(token)
+    return None
+
+
+def _read_cardinal(tokens, start):
+    """A cardinal with "hundred"/"thousand" starting at tokens[start], as (digits, next index), or None.
+
+    "one hundred twenty three" -> "123", "two thousand five" -> "2005",
+    "five hundred and one" -> "501". Reading stops at the first word that
+    can't continue the number, so "nine one hundred" reads only "one hundred".
+    """
+    total, current = 0, 0
+    room = 100  # additions to `current` must stay below this
+    scaled = False
+    i = start
+    while i < len(tokens):
+        token = tokens[i]
+        if token == "hundred" and current < 100 and (current or i == start):
+            current, room, scaled = (current or 1) * 100, 100, True
+        elif token == "thousand" and total == 0 and (current or i == start):
+            total, current, room, scaled = (current or 1) * 1000, 0, 100, True
+        elif token == "and" and scaled and room == 100 and i + 1 < len(tokens) and _small_number(tokens[i + 1]):
+            pass
+        elif token in DIGITS and DIGITS[token] == "0" and scaled and room == 100 and current % 100 == 0:
+            # "one hundred oh five" -> 105
+            room = 10
+        else:
+            value = _small_number(token)
+            if not value or value >= room:
+                break
+            current += value
+            room = 10 if value >= 20 and value % 10 == 0 else 0
+            i += 1
+            # "twenty five hundred" -> 2500: a number below 100 can still be scaled
+            if room == 0 and (i >= len(tokens) or tokens[i] not in ("hundred", "thousand")):
+                break
+            continue
+        i += 1
+    if not scaled:
+        return None
+    return str(total + current), i
+
+
+def normalize_spoken(text) -> str:
+    """Canonical identifier from transcribed speech: lower-case letters and digits only.
+
+    Handles digit words ("nine eight seven"), "oh" for zero, "double five",
+    "triple oh", teens and tens ("twenty one"), cardinals with "hundred" and
+    "thousand" ("one hundred twenty three"), "for"/"to"/"too" between digit
+    words, NATO letters ("bravo") and digits the transcriber already wrote as
+    numerals. Single letters and other alphanumeric words are kept as they are.
+
+        normalize_spoken("nine eight seven, double six, five oh")  -> "9876650"
+        normalize_spoken("C dash one oh oh one")                   -> "c1001"
+        normalize_spoken("nine for two")                           -> "942"
+    """
+    out = []
+    repeat = 1
+    tokens = _tokens(text)
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        i += 1
+        if token in REPEATS:
+            repeat = REPEATS[token]
+            continue
+        if token in FILLER:
+            continue
+        if token in HOMOPHONES and not _next_to_digit(tokens, i - 1):
+            continue
+
+        cardinal = _read_cardinal(tokens, i - 1)
+        if cardinal is not None:
+            value, i = cardinal
+        elif token in HOMOPHONES:
+            value = HOMOPHONES[token]
+        elif token in DIGITS:
+            value = DIGITS[token]
+        elif token in TEENS:
+            value = TEENS[token]
+        elif token in TENS:
+            value = TENS[token]
+            # "twenty one" -> 21, "twenty" -> 20
+            if i < len(tokens) and tokens[i] in DIGITS and DIGITS[tokens[i]] != "0":
+                value += DIGITS[tokens[i]]
+                i += 1
+            else:
+                value += "0"
+        elif token == "o" and _next_to_digit(tokens, i - 1):
+            # Transcribers write a spoken "oh" as "o"; between digits it's a zero, elsewhere the letter
+            value = "0"
+        elif token in NATO:
+            value = NATO[token]
+        else:
+            value = token
+        out.append(value * repeat)
+        repeat = 1
+    return "".join(out)
+
+
+def normalize_case_number(text) -> str:
+    """A spoken or typed case number as Salesforce stores it: digits, zero-padded ("one two three" -> "00000123")."""
+    normalized = normalize_spoken(text)
+    if normalized.isdigit() and len(normalized) < CASE_NUMBER_DIGITS:
+        return normalized.zfill(CASE_NUMBER_DIGITS)
+    return normalized
+
+
+def edit_distance(a: str, b: str, max_distance: int | None = None) -> int:
+    """Levenshtein distance. With `max_distance`, stops early and returns max_distance + 1 once it's exceeded."""
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
@@ -0,0 +1,127 @@
+import json
+import time
+import asyncio
+from agents import function_tool
+from tools.classification import aclassify_email
+from tools.sentiment import allm_sentiment, local_sentiment_for_mode
+from tools.ai_summary import agenerate_case_summary
+from tools.triage_analysis import aanalyze_issue
+from tools.local_classifier import confident_local_classification
+from tools.create_case import acreate_case
+
+
+def _ms(started):
+    return round((time.perf_counter() - started) * 1000)
+
+
+async def atriage_and_create_case(
+    subject: str,
+    issue_description: str,
+    contact_phone: str,
+    disputed_amount: float | None = None,
+) -> dict:
+    """
+    Classifies, analyzes and summarizes the caller's issue, then creates the Salesforce case.
+
+    Classification comes from the local keyword classifier when it is confident,
+    and sentiment from the lexicon scorer when SENTIMENT_MODE allows it. Whatever
+    is left comes from gpt-4o: both from one structured-output request (or two
+    concurrent requests if that fails), or the missing one alone. The summary needs both,
+    and the case needs the summary. A failed classification, sentiment or summary step
+    doesn't stop the case from being created, it just leaves those fields empty.
+
+    Args:
+        subject: Short subject line for the ticket, written from the caller's description.
+        issue_description: The caller's complete description of the issue.
+        contact_phone: The verified phone number of the caller.
+        disputed_amount: Optional disputed amount in numbers only (no currency symbol).
+
+    Returns:
+        The case number and Id, the priority and request type used, and per-stage timings in ms.
+    """
+    print("=" * 50)
+    print("::::[TOOL CALLED] TRIAGE AND CREATE CASE::::")
+    print(f"Subject: {subject}")
+    print(f"Contact Phone: {contact_phone}")
+    print("=" * 50)
+
+    timings = {}
+    started = time.perf_counter()
+
+    stage = time.perf_counter()
+    # Local results where they can be trusted; the model only for what's left, with one
+    # structured-output request when it's both and the separate calls as the fallback
+    classification = confident_local_classification(issue_description)
+    sentiment = local_sentiment_for_mode(issue_description)
+    if classification is not None:
+        print(f"Local classification (confidence {classification['confidence_score']})")
+    if classification is not None and sentiment is None:
+        sentiment = await allm_sentiment(issue_description)
+    elif classification is None and sentiment is not None:
+        classification = await aclassify_email(issue_description)
+    elif classification is None:
+        analysis = await aanalyze_issue(issue_description)
+        if "error" in analysis:
+            print(f"Combined analysis failed, falling back to separate calls: {analysis['error']}")
+            classification, sentiment = await asyncio.gather(
+                aclassify_email(issue_description),
+                allm_sentiment(issue_description),
+            )
+        else:
+            classification, sentiment = analysis["classification"], analysis["sentiment"]
+    timings["classification_and_sentiment_ms"] = _ms(stage)
+
+    stage = time.perf_counter()
+    try:
+        summary = await agenerate_case_summary(json.dumps(sentiment), json.dumps(classification), issue_description)
+    except Exception as e:
+        summary = {"error": str(e)}
+    timings["summary_ms"] = _ms(stage)
+    if not isinstance(summary, str):
+        print(f"Summary failed, creating the case without it: {summary}")
+        summary = None
+
+    priority, request_type = None, None
+    if "error" not in classification:
+        priority = classification.get("priority")
+        tags = classification.get("tags") or []
+        request_type = tags[0] if tags else None
+
+    stage = time.perf_counter()
+    try:
+        case = await acreate_case(
+            subject=subject,
+            contact_phone=contact_phone,
+            body=issue_description,
+            disputed_amount=disputed_amount,
+            description=issue_description,
+            ai_summary_content=summary,
+            priority=priority,
+            request_type=request_type,
+        )
+    except Exception as e:
+        timings["create_case_ms"] = _ms(stage)
+        timings["total_ms"] = _ms(started)
+        print(f"Error creating case: {e}")
+        return {"error": str(e), "timings": timings}
+    timings["create_case_ms"] = _ms(stage)
+    timings["total_ms"] = _ms(started)
+
+    result = {
+        "case_number": case.get("CaseNumber"),
+        "case_id": case.get("Id"),
+        "priority": priority,
+        "request_type": request_type,
+        "timings": timings,
+    }
+    print(f"Triage result: {result}")
+    return result
+
+
+triage_and_create_case = function_tool(
+    atriage_and_create_case,
+    name_override="triage_and_create_case",
+    description_override="Create a support ticket in one step: classifies priority and tags, analyzes sentiment, "
+                         "writes the AI case summary and creates the Salesforce case. Returns the case number.",
+    strict_mode=True
+)
@@ -0,0 +1,125 @@
+from openai import OpenAI, AsyncOpenAI
+from pydantic import BaseModel
+from dotenv import load_dotenv
+from agents import function_tool
+from tools.classification_prompt import Classification, prompt as classification_prompt
+from tools.sentiment import SentimentAnalysis, system_prompt as sentiment_prompt
+from tools.result_cache import get_result_cache
+
+load_dotenv()
+client = OpenAI()
+async_client = AsyncOpenAI()
+analysis_cache = get_result_cache(
+    "triage_analysis", free_text=("classification.justification", "sentiment.context_notes")
+)
+
+
+class TriageAnalysis(BaseModel):
+    classification: Classification
+    sentiment: SentimentAnalysis
+
+
+# The criteria sections of both prompts; the response-format sections are replaced by the enforced schema
+triage_prompt = f"""
+You are an AI assistant that triages customer issues for a financial institution. For the customer
+message you receive, produce both a priority/tag classification and a sentiment analysis, following
+the two guides below. Your answer is returned as structured data with a `classification` and a
+`sentiment` object.
+
+# PART 1: CLASSIFICATION GUIDE
+{classification_prompt.split("4. Provide your classification")[0].strip()}
+
+# PART 2: SENTIMENT GUIDE
+{sentiment_prompt.split("3. RESPONSE FORMAT")[0].strip()}
+"""
+
+
+def _request(issue_text: str) -> dict:
+    """Structured-output request arguments for one issue."""
+    return dict(
+        model="gpt-4o",
+        temperature=0.8,
+        messages=[
+            {"role": "system", "content": triage_prompt},
+            {"role": "user", "content": issue_text},
+        ],
+        response_format=TriageAnalysis,
+    )
+
+
+def _cached(issue_text: str, label: str = "") -> dict | None:
+    """Print the tool banner and return the cached analysis, if any."""
+    print("=" * 50)
+    print(f"::::[TOOL CALLED] ANALYZE ISSUE (classification + sentiment{label})::::")
+    print(f"Issue Text:\n{issue_text}")
+    print("=" * 50)
+
+    cached = analysis_cache.get(issue_text)
+    if cached is not None:
+        print(f"Cached triage analysis: {cached}")
+    return cached
+
+
+def _result(issue_text: str, response) -> dict:
+    message = response.choices[0].message
+    if message.parsed is None:
+        return {"error": message.refusal or "No structured output returned."}
+    result = message.parsed.model_dump()
+    print(f"Analyzed Result from triage analysis: {result}")
+    analysis_cache.put(issue_text, result)
+    return result
+
+
+def _error(e: Exception) -> dict:
+    print(f"Error during triage analysis: {type(e).__name__} - {e}")
+    return {"error": str(e)}
+
+
+@function_tool(
+    name_override="analyze_issue",
+    description_override="Classify priority and tags and analyze the sentiment of a customer's issue in one step.",
+    strict_mode=True
+)
+def analyze_issue(issue_text: str) -> dict:
+    """
+    Classify a customer issue and analyze its sentiment with one structured-output request.
+
+    Args:
+        issue_text: The customer's description of the issue.
+
+    Returns:
+        dict: {"classification": {...}, "sentiment": {...}} or {"error": ...}.
+    """
+    cached = _cached(issue_text)
+    if cached is not None:
+        return cached
+
+    try:
+        return _result(issue_text, client.beta.chat.completions.parse(**_request(issue_text)))
+    except Exception as e:
+        return _error(e)
+
+
+async def aanalyze_issue(issue_text: str) -> dict:
+    """
+    Async analyze_issue.
+
+    Args:
+        issue_text: The customer's description of the issue.
+    """
+    cached = _cached(issue_text, ", async")
+    if cached is not None:
+        return cached
+
+    try:
+        return _result(issue_text, await async_client.beta.chat.completions.parse(**_request(issue_text)))
+    except Exception as e:
+        return _error(e)
+
+
+analyze_issue_async = function_tool(
+    aanalyze_issue,
+    name_override="analyze_issue",
+    description_override="Classify priority and tags and analyze the sentiment of a customer's issue in one step.",
+    strict_mode=True
+)
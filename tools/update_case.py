@@ -1,8 +1,9 @@
 from agents import function_tool
 from pydantic import BaseModel
-import os
-import requests
-from simple_salesforce import Salesforce
+from tools.salesforce_async import connect_salesforce
+from tools.salesforce_auth import salesforce_credentials
+from tools.case_cache import case_cache, case_query, case_from_query
+from tools.case_outbox import get_outbox
 
 class EmailContentModel(BaseModel):
     subject: str | None = None
@@ -13,6 +14,52 @@ class EmailContentModel(BaseModel):
         "extra": "forbid"  # This ensures additionalProperties: false in the JSON schema
     }
 
+
+def build_update_data(ai_summary_content=None, comments=None, notes=None, email_content=None, priority=None,
+                      request_type=None) -> dict:
+    """Salesforce field values for the provided (non-None) update arguments."""
+    update_data = {}
+    if ai_summary_content is not None:
+        update_data["AI_Summary_Content__c"] = ai_summary_content
+    if notes is not None:
+        update_data["Comments_Notes__c"] = notes
+    if comments is not None:
+        update_data["Comments"] = comments
+    if priority is not None:
+        update_data["Priority"] = priority
+    if request_type is not None:
+        update_data["Request_Type__c"] = request_type
+    if email_content is not None:
+        update_data["EmailContent__c"] = email_content.model_dump_json()
+    return update_data
+
+def _update_data(title: str, case_number: str, **fields) -> dict:
+    """Print the tool banner and return the Salesforce field values to write."""
+    update_data = build_update_data(**fields)
+    print("=" * 50)
+    print(f"::::[TOOL CALLED] {title}::::")
+    print(f"Case Number: {case_number}")
+    for field, value in update_data.items():
+        print(f"{field}: {value}")
+    print("=" * 50)
+    return update_data
+
+
+def _updated_case(case_number: str, case_id: str, results: dict) -> dict:
+    """Cache and return the record read back after a successful write."""
+    print(f"Case {case_number} (ID: {case_id}) updated successfully.")
+    # Our write made the cached copy stale; replace it with the fresh record
+    case_cache.invalidate(case_number)
+    updated_case = case_from_query(case_number, results)
+    case_cache.put(case_number, updated_case)
+    return updated_case
+
+
+def _update_error(e: Exception) -> dict:
+    print(f"An error occurred during case update: {e}")
+    return {"error": f"An error occurred: {str(e)}"}
+
+
 @function_tool(
     name_override="update_salesforce_case",
     description_override="Update a Salesforce case by its case number. Only the provided fields will be updated.",
@@ -44,81 +91,125 @@ def update_case(
     Returns:
         A dictionary containing updated case data, or an error message.
     """
+    update_data = _update_data("UPDATE SALESFORCE CASE", case_number, ai_summary_content=ai_summary_content,
+                               comments=comments, notes=notes, email_content=email_content, priority=priority,
+                               request_type=request_type)
+    if not update_data:
+        return {"error": "No fields provided to update."}
 
-    print("=" * 50)
-    print("::::[TOOL CALLED] UPDATE SALESFORCE CASE::::")
-    print(f"Case Number: {case_number}"),
-    print(f"ai_summary_content: {ai_summary_content}")
-    print(f"comments: {comments}")
-    print(f"notes: {notes}")
-    print(f"email_content: {email_content}")
-    print(f"priority: {priority}")
-    print(f"request_type: {request_type}")
-    print("=" * 50)
+    try:
+        def update(sf):
+            # Find the case ID (a cached read of this case already has it)
+            case = case_cache.get(case_number) or case_from_query(case_number, sf.query(case_query(case_number)))
+            if "error" in case:
+                return case
+
+            update_response = sf.Case.update(case["Id"], update_data)
+            if update_response != 204:
+                return {"error": f"Failed to update case. Status code: {update_response}"}
+            return _updated_case(case_number, case["Id"], sf.query(case_query(case_number)))
+
+        # Shared, cached Salesforce session; an expired token is refreshed and the update retried
+        return salesforce_credentials.call(update)
+
+    except Exception as e:
+        return _update_error(e)
+
+
+async def aupdate_case(
+    case_number: str,
+    ai_summary_content: str | None = None,
+    comments: str | None = None,
+    notes: str | None = None,
+    email_content: EmailContentModel | None = None,
+    priority: str | None = None,
+    request_type: str | None = None,
+) -> dict:
+    """
+    Async update_case.
 
-    def get_connection_credentials(connection_id: str, providerConfigKey: str):
-        base_url = os.getenv("NANGO_BASE_URL")
-        secret_key = os.getenv("NANGO_SECRET_KEY")
-        url = f"{base_url}/connection/{connection_id}"
-        params = {
-            "provider_config_key": providerConfigKey,
-            "refresh_token": "true",
-        }
-        headers = {"Authorization": f"Bearer {secret_key}"}
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
+    Args:
+        case_number: The CaseNumber field of the case to update.
+        ai_summary_content: New AI-generated summary content.
+        comments: Additional comments for the case.
+        notes: Notes for the case.
+        email_content: Email content as a structured EmailContentModel (will be JSON stringified).
+        priority: Case priority (e.g., Low, Medium, High).
+        request_type: Request type field to update.
+    """
+    update_data = _update_data("UPDATE SALESFORCE CASE (async)", case_number, ai_summary_content=ai_summary_content,
+                               comments=comments, notes=notes, email_content=email_content, priority=priority,
+                               request_type=request_type)
+    if not update_data:
+        return {"error": "No fields provided to update."}
 
     try:
-        instance_url = os.getenv("SALESFORCE_INSTANCE_URL")
-        salesforce_connection_id = os.getenv("SALESFORCE_CONNECTION_ID")
-        credentials = get_connection_credentials(salesforce_connection_id, "salesforce")
-        access_token = credentials["credentials"]["access_token"]
-        sf = Salesforce(instance_url=instance_url, session_id=access_token)
-
-        # Step 1: Find Case ID
-        query = f"SELECT Id FROM Case WHERE CaseNumber = '{case_number}'"
-        results = sf.query(query)
-
-        if results["totalSize"] == 0:
-            return {"error": f"Case with CaseNumber '{case_number}' not found."}
-        elif results["totalSize"] > 1:
-            return {"error": f"Multiple cases found with CaseNumber '{case_number}'."}
-
-        case_id = results["records"][0]["Id"]
-
-        # Step 2: Prepare update fields
-        update_data = {}
-        if ai_summary_content is not None:
-            update_data["AI_Summary_Content__c"] = ai_summary_content
-        if notes is not None:
-            update_data["Comments_Notes__c"] = notes
-        if comments is not None:
-            update_data["Comments"] = comments
-        if priority is not None:
-            update_data["Priority"] = priority
-        if request_type is not None:
-            update_data["Request_Type__c"] = request_type
-        if email_content is not None:
-            try:
-                update_data["EmailContent__c"] = email_content.model_dump_json()
-            except TypeError as e:
-                print(f"Error serializing EmailContentModel: {e}") 
-                return {"error": f"Failed to serialize email_content to JSON: {e}"}
-
-        if not update_data:
-            return {"error": "No fields provided to update."}
-
-        # Step 3: Perform update
-        update_response = sf.Case.update(case_id, update_data)
-
-        if update_response == 204:
-            print(f"Case {case_number} (ID: {case_id}) updated successfully.")
-            updated_case_data = sf.Case.get(case_id)
-            return dict(updated_case_data)
-        else:
+        sf = await connect_salesforce()
+
+        # Find the case ID (a cached read of this case already has it)
+        case = case_cache.get(case_number) or case_from_query(case_number, await sf.query(case_query(case_number)))
+        if "error" in case:
+            return case
+
+        update_response = await sf.update("Case", case["Id"], update_data)
+        if update_response != 204:
             return {"error": f"Failed to update case. Status code: {update_response}"}
+        return _updated_case(case_number, case["Id"], await sf.query(case_query(case_number)))
 
     except Exception as e:
-        print(f"An error occurred during case update: {e}")
-        return {"error": f"An error occurred: {str(e)}"}
+        return _update_error(e)
+
+
+update_case_async = function_tool(
+    aupdate_case,
+    name_override="update_salesforce_case",
+    description_override="Update a Salesforce case by its case number. Only the provided fields will be updated.",
+    strict_mode=True
+)
+
+
+def queue_case_update(
+    case_number: str,
+    ai_summary_content: str | None = None,
+    comments: str | None = None,
+    notes: str | None = None,
+    email_content: EmailContentModel | None = None,
+    priority: str | None = None,
+    request_type: str | None = None,
+) -> dict:
+    """
+    Queues an update of an existing Salesforce case; it is written in the background.
+
+    Only provided (non-None) fields will be updated.
+
+    Args:
+        case_number: The CaseNumber field of the case to update.
+        ai_summary_content: New AI-generated summary content.
+        comments: Additional comments for the case.
+        notes: Notes for the case.
+        email_content: Email content as a structured EmailContentModel (will be JSON stringified).
+        priority: Case priority (e.g., Low, Medium, High).
+        request_type: Request type field to update.
+
+    Returns:
+        A dictionary with the queued status and the update's idempotency key, or an error message.
+    """
+    update_data = _update_data("QUEUE SALESFORCE CASE UPDATE", case_number, ai_summary_content=ai_summary_content,
+                               comments=comments, notes=notes, email_content=email_content, priority=priority,
+                               request_type=request_type)
+    if not update_data:
+        return {"error": "No fields provided to update."}
+
+    # Committed locally before returning; the outbox worker sends it to Salesforce with retries
+    result = get_outbox().enqueue(case_number, update_data)
+    return {"status": "queued" if result["queued"] else "already_queued", "case_number": case_number,
+            "idempotency_key": result["idempotency_key"]}
+
+
+update_case_queued = function_tool(
+    queue_case_update,
+    name_override="update_salesforce_case",
+    description_override="Update a Salesforce case by its case number. Only the provided fields will be updated. "
+                         "The update is saved immediately and written to Salesforce in the background.",
+    strict_mode=True
+)
@@ -1,6 +1,7 @@
-import os
-import json
 from agents import function_tool
+from tools.customer_directory import clean_string
+from tools.customer_store import get_customer_store
+from tools.spoken_numbers import normalize_spoken
 
 @function_tool(
     name_override="verification_tool",
@@ -8,6 +9,9 @@ from agents import function_tool
                          "1. Initial call with 'phone_number' and 'customer_id': Returns security question if customer exists. "
                          "2. Subsequent call with 'phone_number', 'customer_id', and 'answer': Validates answer. "
                          "If correct, returns 'verified' status. "
+                         "Spoken digits and letters (e.g. 'nine eight seven', 'double five', 'oh') are accepted as given. "
+                         "If no customer matches exactly but one field matches and the other is off by a digit or two, "
+                         "returns 'possible_match' with the 'field' the caller should repeat. "
                          "Returns 'customer_not_found', 'verification_failed', or 'no_security_question_configured' as appropriate.",
     strict_mode=True
 )
@@ -39,43 +43,33 @@ def verification_tool(phone_number: str, customer_id: str | None = None, answer:
         return result
 
     # --- Input Cleaning --- 
-    def clean_string(input_str):
-        if not isinstance(input_str, str):
-            input_str = str(input_str) # Ensure it's a string
-        cleaned = input_str.replace(' ', '').replace('-', '').replace('_', '')
-        return cleaned.lower().strip()
-    
-    cleaned_phone_number = clean_string(phone_number)
-    cleaned_customer_id = clean_string(customer_id)
+    # Transcripts like "nine eight seven double six" or "C one oh oh one" become "98766" / "c1001"
+    phone_number = normalize_spoken(phone_number)
+    customer_id = normalize_spoken(customer_id)
     cleaned_answer = None
     if answer is not None:
         cleaned_answer = clean_string(answer)
     # ----------------------
 
-    # Get the directory of the current script
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    
-    # Load security questions from JSON file
-    security_questions_path = os.path.join(base_dir, 'assets', 'security_questions.json')
-    with open(security_questions_path, 'r') as f:
-        security_questions_data = json.load(f)
-        security_questions = security_questions_data.get('security_questions', {})
-    
-    # Load customers from JSON file
-    customers_path = os.path.join(base_dir, 'assets', 'customers.json')
-    with open(customers_path, 'r') as f:
-        customers_data = json.load(f)
-        customers = customers_data.get('customers', [])
-        
-    print(f"Successfully loaded data from JSON files")
-
     # Find the customer by phone number and customer ID
-    found_customer_record = None
-    for cust_data in customers:
-        if (cleaned_phone_number == clean_string(cust_data.get("phone_number", "")) and
-            cleaned_customer_id == clean_string(cust_data.get("customer_id", ""))):
-            found_customer_record = cust_data
-            break
+    customer_store = get_customer_store()
+    found_customer_record = customer_store.lookup(phone_number, customer_id)
+
+    if not found_customer_record and answer is None:
+        # One field matches exactly and the other is off by a digit or two: likely a mis-heard digit.
+        # Only the field is returned; the stored value must never reach an unverified caller
+        near_match = customer_store.closest(phone_number, customer_id)
+        if near_match is not None:
+            _, field = near_match
+            print(f"--- LOOKUP RESULT (POSSIBLE MATCH ON {field.upper()}) ---")
+            result = {
+                "status": "possible_match",
+                "field": field,
+                "message": f"No exact match. The {field.replace('_', ' ')} may have been misheard; "
+                           f"ask the caller to repeat it and call again."
+            }
+            print(f"Returning: {result}")
+            return result
 
     if not found_customer_record:
         print("--- LOOKUP RESULT (CUSTOMER NOT FOUND) ---")
@@ -103,7 +97,8 @@ def verification_tool(phone_number: str, customer_id: str | None = None, answer:
     customer_id = found_customer_record["customer_id"]
     
     # Check if security question exists for this customer
-    if customer_id not in security_questions:
+    security_question_record = customer_store.security_question(customer_id)
+    if security_question_record is None:
         print("--- RESULT: NO SECURITY QUESTION CONFIGURED ---")
         result = {
             "status": "no_security_question_configured",
@@ -115,7 +110,7 @@ def verification_tool(phone_number: str, customer_id: str | None = None, answer:
     # Case 1: Initial call (phone_number and customer_id provided, no answer)
     if answer is None:
         print("--- MODE: INITIAL LOOKUP - PROVIDE SECURITY QUESTION ---")
-        security_question = security_questions[customer_id]["question"]
+        security_question = security_question_record["question"]
         
         print("--- RESULT: SECURITY QUESTION FOUND ---")
         result = {
@@ -128,7 +123,7 @@ def verification_tool(phone_number: str, customer_id: str | None = None, answer:
     # Case 2: Answering the question (phone_number, customer_id, and answer provided)
     else:
         print("--- MODE: VALIDATE ANSWER ---")
-        stored_answer = security_questions[customer_id]["answer"]
+        stored_answer = security_question_record["answer"]
         stored_answer_cleaned = clean_string(stored_answer)
         
         if cleaned_answer == stored_answer_cleaned:
@@ -146,17 +141,9 @@ def verification_tool(phone_number: str, customer_id: str | None = None, answer:
             # Update account status to 'freezed' in memory
             found_customer_record["account_status"] = "freezed"
             
-            # Update the account status in the JSON file
-            for i, customer in enumerate(customers):
-                if customer["customer_id"] == found_customer_record["customer_id"]:
-                    customers[i]["account_status"] = "freezed"
-                    break
-            
-            # Write the updated data back to the JSON file
+            # Update the account status in the customer store
             try:
-                customers_path = os.path.join(base_dir, 'assets', 'customers.json')
-                with open(customers_path, 'w') as f:
-                    json.dump({"customers": customers}, f, indent=4)
+                customer_store.set_account_status(customer_id, "freezed")
                 print("--- ACCOUNT STATUS UPDATED TO 'freezed' IN DATABASE ---")
             except Exception as e:
                 print(f"--- ERROR UPDATING ACCOUNT STATUS: {e} ---")